@@ -0,0 +1,111 @@
+"""
+Per-query latency of "eimm q": fuzzywuzzy's extractBests() over every name (the old way) against utils.search's
+trigram-filtered SearchIndex, on synthetic template names.
+
+    python benchmarks/bench_eimm_search.py [--names 4000] [--queries 200] [--seed 1]
+
+The default of 4000 names is about ten times the template sheet (abilities, keywords and passives together).
+Queries are real names with a typo or two, or a single word from one, which is what people actually type.
+"""
+import argparse
+import random
+import statistics
+import string
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from fuzzywuzzy import process
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.search import SearchIndex  # noqa: E402
+
+PREFIXES = (
+    "Full Partial Greater Lesser Mass Delayed Reactive Hidden Silent Brutal Twin Phantom Iron Shadow Blood Frozen "
+    "Burning Sacred Cursed Hasty".split()
+)
+ROOTS = (
+    "Block Redirect Protect Kill Investigate Track Watch Swap Jail Heal Vote Steal Copy Bus Commute Roleblock Frame "
+    "Poison Guard Reflect Bomb Mimic Cleanse Silence Visit".split()
+)
+SUFFIXES = ["", " Plus", " II", " Strike", " Aura", " Ward", " Pact", " Link", " Echo", " Rush"]
+
+
+def make_names(n: int, rng: random.Random) -> List[str]:
+    names = set()
+    while len(names) < n:
+        name = f"{rng.choice(PREFIXES)} {rng.choice(ROOTS)}{rng.choice(SUFFIXES)}"
+        if rng.random() < 0.3:
+            # distinct-but-similar names are the hard case for the candidate filter
+            name = f"{name} {rng.choice(string.ascii_uppercase)}{rng.randint(1, 99)}"
+        names.add(name)
+    return sorted(names)
+
+
+def make_query(name: str, rng: random.Random) -> str:
+    if rng.random() < 0.25:
+        return rng.choice(name.split())
+    chars = list(name.lower())
+    for _ in range(rng.randint(1, 2)):
+        i = rng.randrange(len(chars))
+        edit = rng.choice(["drop", "swap", "sub"])
+        if edit == "drop" and len(chars) > 3:
+            del chars[i]
+        elif edit == "swap" and i + 1 < len(chars):
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+        else:
+            chars[i] = rng.choice(string.ascii_lowercase)
+    return "".join(chars)
+
+
+def time_queries(search: Callable[[str], List], queries: List[str]) -> List[float]:
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(label: str, timings: List[float]):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<28} mean {statistics.mean(timings):8.3f} ms   p50 {timings[len(timings) // 2]:8.3f} ms   "
+        f"p95 {p95:8.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--names", type=int, default=4000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = make_names(args.names, rng)
+    queries = [make_query(rng.choice(names), rng) for _ in range(args.queries)]
+
+    started = time.perf_counter()
+    index = SearchIndex((name, name) for name in names)
+    print(f"{len(names)} names, {len(queries)} queries; index built in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    baseline_top = {}
+
+    def baseline(query):
+        matches = process.extractBests(query, names, limit=10)
+        baseline_top[query] = matches[0][1] if matches else None
+
+    report("extractBests (old)", time_queries(baseline, queries))
+    report("SearchIndex, cold cache", time_queries(lambda query: index.search(query, 10), queries))
+    report("SearchIndex, warm cache", time_queries(lambda query: index.search(query, 10), queries))
+
+    # Same best score as the exhaustive search means the filter didn't lose the best match (ties aside).
+    agree = sum(1 for query in queries if index.search(query, 10)[0][2] == baseline_top[query])
+    print(f"top score agrees with extractBests on {agree}/{len(queries)} queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import asyncio
 import datetime
+import functools
 import io
 import json
 import pprint
@@ -10,16 +11,21 @@ from typing import Any, Dict, List, Optional, Tuple
 import discord
 import yaml
 from discord.ext import commands
-from fuzzywuzzy import process
 from munkres import Munkres, DISALLOWED
 
 from core.bot import Bot
 from utils import menu, spreadsheet
+from utils.search import SearchIndex
 
 SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
 SECRET = "conf/google_creds.json"
 SHEET_NAME = "eimm role templates & keywords"
 
+INLINE_REGEX = re.compile(r"<<([^<>]*)>>")
+EMBED_CACHE_SIZE = 256  # most recently looked up abilities/keywords/passives kept as built embeds
+SEARCH_RESULTS = 10  # choices offered by eimm q
+NAMESPACE_LABELS = {"abilities": "", "keywords": " (keyword)", "passives": " (passive)"}
+
 
 def thwart_misty(ability_name, text: str) -> str:
     """
@@ -159,8 +165,36 @@ class EiMM(commands.Cog):
         self.abilities = {}  # type: Dict[str, List]
         self.keywords = {}  # type: Dict[str, List]
         self.passives = {}  # type: Dict[str, List]
+        # casefolded name -> (namespace, name), across all three; abilities win over keywords over passives
+        self.index = {}  # type: Dict[str, Tuple[str, str]]
+        self.search_index = SearchIndex(())
+        self.embed = functools.lru_cache(maxsize=EMBED_CACHE_SIZE)(self._build_embed)
         self.load()
 
+    def _build_embed(self, namespace: str, name: str) -> discord.Embed:
+        """
+        Use self.embed() instead, which caches these. Nothing sends them anywhere that modifies them, so the same
+        Embed can be sent any number of times.
+        """
+        if namespace == "abilities":
+            return ability_embed(self.abilities[name])
+        if namespace == "keywords":
+            return keyword_embed(self.keywords[name])
+        return passive_embed(self.passives[name])
+
+    def _build_index(self):
+        index = {}  # type: Dict[str, Tuple[str, str]]
+        namespaces = (("abilities", self.abilities), ("keywords", self.keywords), ("passives", self.passives))
+        for namespace, rows in namespaces:
+            for name in rows:
+                if name:  # blank sheet rows
+                    index.setdefault(name.casefold(), (namespace, name))
+        self.index = index
+        self.search_index = SearchIndex(
+            ((namespace, name), name) for namespace, rows in namespaces for name in rows if name
+        )
+        self.embed.cache_clear()
+
     def load(self) -> Dict[str, Dict]:
         self.connection = spreadsheet.SheetConnection(SECRET, SCOPE)
         abilities = self.connection.get_page(SHEET_NAME, "Active Abilities")
@@ -178,6 +212,8 @@ class EiMM(commands.Cog):
         passive_diffs = diff_dict(new_passives, self.passives)
         self.passives = new_passives
 
+        self._build_index()
+
         return {
             "abilities": ability_diffs,
             "keywords": keyword_diffs,
@@ -207,53 +243,40 @@ class EiMM(commands.Cog):
     @eimm.group(name="q")
     async def eimm_q(self, ctx: commands.Context, *, term: str):
         """
-        Search the template sheet for an ability.
+        Search the template sheet for an ability, keyword or passive.
 
         You can also use <<fullblock>> to search for abilities inline.
         """
-        choices = self.abilities.keys()
-        matches = process.extractBests(term, choices, limit=10)
-        if matches[0][1] == 100:
+        matches = self.search_index.search(term, SEARCH_RESULTS)
+        if not matches:
+            await ctx.send("Nothing like that in the templates.")
+            return
+        if matches[0][2] == 100:
             match = matches[0][0]
         else:
-            matches = [match[0] for match in matches]  # type: List[str]
+            labels = {f"{name}{NAMESPACE_LABELS[key[0]]}": key for key, name, _ in matches}
             try:
                 await ctx.send("Which ability did you mean?")
-                match = await menu.menu_list(ctx, matches)
+                match = labels[await menu.menu_list(ctx, list(labels))]
             except RuntimeError:
                 await ctx.send("Finish with your preview menu first.")
                 return
-        em = ability_embed(self.abilities[match])
-        await ctx.send(embed=em)
+        await ctx.send(embed=self.embed(*match))
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if message.author.id == self.bot.user.id:
             return
-        ability_regex = r"<<([^<>]*)>>"
-        match = re.search(ability_regex, message.content)
-        if match is not None:
-            match = match.group(1)
-        else:
+        if "<<" not in message.content:
+            # most messages; skip the regex entirely
             return
-        match = match.strip()
-        if match == "":
+        match = INLINE_REGEX.search(message.content)
+        if match is None:
             return
-        for abil, row in self.abilities.items():
-            if match.lower() == abil.lower():
-                em = ability_embed(row)
-                await message.channel.send(embed=em)
-                return
-        for abil, row in self.keywords.items():
-            if match.lower() == abil.lower():
-                em = keyword_embed(row)
-                await message.channel.send(embed=em)
-                return
-        for abil, row in self.passives.items():
-            if match.lower() == abil.lower():
-                em = passive_embed(row)
-                await message.channel.send(embed=em)
-                return
+        found = self.index.get(match.group(1).strip().casefold())
+        if found is None:
+            return
+        await message.channel.send(embed=self.embed(*found))
 
     @staticmethod
     def _mod_bias_queue_algorithm(
@@ -1,19 +1,28 @@
+import asyncio
+import contextlib
+import json
 import logging
+import math
+import os
 import pprint
 import re
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Callable, Union, Optional, Dict, List
+from types import MappingProxyType
+from typing import Any, Callable, FrozenSet, Mapping, NamedTuple, Set, Tuple, Union, Optional, Dict, List
 
 import discord
 import yaml
-from discord.ext import commands
+from discord.ext import commands, tasks
 from sqlalchemy import create_engine, or_
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import joinedload, sessionmaker, Session
 
 import cogs.hostbot_schema as hbs
+from core import bulk, ratelimit
 from core.bot import Bot
-from utils import spreadsheet
+from utils import archive, spreadsheet
 
 session_maker = None  # type: Union[None, Callable[[], Session]]
 # connection = None  # type: Optional[spreadsheet.SheetConnection]
@@ -22,7 +31,15 @@ cooldown_delta = timedelta(minutes=30)
 cooldown_max = 3
 
 MAX_CATEGORY_SIZE = 50
+RESET_REQUEST_SECONDS = 0.6  # rough time per delete request, for reset estimates
 LOCK_EMOJI = "\U0001F512"
+RENAME_LIMIT = 2  # Discord allows each channel this many renames...
+RENAME_WINDOW = timedelta(minutes=10)  # ...per this long
+JOURNAL_SNAPSHOT_EVERY = 100  # journal events per server between state snapshots
+ACTIVITY_FLUSH_SECONDS = 30  # how often buffered gamechat activity is written out
+ARCHIVE_DIR = "databases/hostbot_archive"
+ARCHIVE_BATCH = 500  # messages per archive write and checkpoint
+MAX_UPLOAD_SIZE = 8 * 1024 * 1024  # discord's upload limit
 
 
 class NotFoundMember:
@@ -40,16 +57,451 @@ class NotFoundMember:
         return f"{self.name}#{self.discriminator}"
 
 
-def has_role(ctx: commands.Context, allowed_roles: List[str]) -> bool:
-    session = session_maker()
+Player = Union[discord.Member, NotFoundMember]
+
+
+class ServerSnapshot(NamedTuple):
+    """
+    Read-only copy of a game server's config, with its role and channel IDs grouped by type.
+
+    Shared by every command until something changes the config, at which point it's thrown out with
+    invalidate_snapshot() and reloaded on next use.
+    """
+
+    id: int
+    name: str
+    sheet: str
+    rolepms_id: Optional[int]  # legacy single Role PMs category
+    addspec_on: bool
+    players_can_lock: bool
+    lock_emoji: str
+    roles: Mapping[str, Tuple[int, ...]]  # type -> role IDs
+    channels: Mapping[str, Tuple[int, ...]]  # type -> channel IDs
+
+    def role_id(self, role_type: str) -> Optional[int]:
+        ids = self.roles.get(role_type, ())
+        return ids[0] if ids else None
+
+    def channel_id(self, channel_type: str) -> Optional[int]:
+        ids = self.channels.get(channel_type, ())
+        return ids[0] if ids else None
+
+    @property
+    def rolepm_ids(self) -> FrozenSet[int]:
+        # the union maintains legacy support
+        ids = set(self.channels.get("rolepms", ()))
+        if self.rolepms_id is not None:
+            ids.add(self.rolepms_id)
+        return frozenset(ids)
+
+
+_snapshots = {}  # type: Dict[int, ServerSnapshot]
+
+
+def _group_ids(rows) -> Mapping[str, Tuple[int, ...]]:
+    grouped = {}  # type: Dict[str, List[int]]
+    for row in sorted(rows, key=lambda row: row.id):
+        grouped.setdefault(row.type, []).append(row.id)
+    return MappingProxyType({row_type: tuple(ids) for row_type, ids in grouped.items()})
 
-    allowed_role_ids = (
-        session.query(hbs.Role).filter(hbs.Role.server_id == ctx.guild.id, hbs.Role.type.in_(allowed_roles)).all()
+
+def get_snapshot(guild_id: int) -> Optional[ServerSnapshot]:
+    """
+    Get a guild's config snapshot, loading it (server, roles and channels in one query) if it isn't cached.
+    Returns None if the guild isn't a game server.
+    """
+    if guild_id in _snapshots:
+        return _snapshots[guild_id]
+    session = session_maker()
+    server = (
+        session.query(hbs.Server)
+        .options(joinedload(hbs.Server.roles), joinedload(hbs.Server.channels))
+        .filter_by(id=guild_id)
+        .one_or_none()
+    )  # type: Optional[hbs.Server]
+    if server is None:
+        session.close()
+        return None
+    snapshot = ServerSnapshot(
+        id=server.id,
+        name=server.name,
+        sheet=server.sheet,
+        rolepms_id=server.rolepms_id,
+        addspec_on=bool(server.addspec_on),
+        players_can_lock=bool(server.players_can_lock),
+        lock_emoji=server.lock_emoji,
+        roles=_group_ids(server.roles),
+        channels=_group_ids(server.channels),
     )
-    allowed_roles = [ctx.guild.get_role(role_id.id) for role_id in allowed_role_ids]
+    session.close()
+    _snapshots[guild_id] = snapshot
+    return snapshot
+
+
+def invalidate_snapshot(guild_id: int):
+    """
+    Call after committing any change to a guild's Server, Role or Channel rows.
+    """
+    _snapshots.pop(guild_id, None)
+
+
+def has_role(ctx: commands.Context, allowed_roles: List[str]) -> bool:
+    snapshot = get_snapshot(ctx.guild.id)
+    if snapshot is None:
+        return False
+    allowed_role_ids = {role_id for role_type in allowed_roles for role_id in snapshot.roles.get(role_type, ())}
 
     # check if author has any of the player/host roles
-    return not set(allowed_roles).isdisjoint(set(ctx.author.roles))
+    return any(role.id in allowed_role_ids for role in ctx.author.roles)
+
+
+def overwrites_by_id(channel: discord.abc.GuildChannel) -> Dict[int, Tuple[str, discord.PermissionOverwrite]]:
+    """
+    Every permission overwrite on <channel>, as target ID -> (target type, "member" or "role"; overwrite).
+
+    channel.overwrites leaves out targets that aren't cached, which without the members intent is most members, and
+    writing it back with channel.edit(overwrites=...) deletes theirs. This reads discord.py's private raw overwrites
+    instead, and is the only thing that should, so a discord.py upgrade that changes them breaks it in one place.
+    """
+    return {
+        overwrite.id: (
+            overwrite.type,
+            discord.PermissionOverwrite.from_pair(
+                discord.Permissions(overwrite.allow), discord.Permissions(overwrite.deny)
+            ),
+        )
+        for overwrite in channel._overwrites
+    }
+
+
+class GameState:
+    """
+    A server's game state as far as hostbot is concerned, built up by applying journal events in order.
+    """
+
+    def __init__(self):
+        # Role PM channel ID -> {"by_overwrites": whether it was locked by overwrites, "denied": member IDs it denied},
+        # or None once it's been unlocked. Channels that have never been either aren't in here at all.
+        self.locked = {}  # type: Dict[int, Optional[Dict[str, Any]]]
+        self.renames = {}  # type: Dict[int, List[float]]  # channel ID -> unix times of its recent renames
+        self.phase = None  # type: Optional[Tuple[int, str]]  # (phase ID, name)
+
+    def recent_renames(self, channel_id: int, now: float) -> List[float]:
+        window = RENAME_WINDOW.total_seconds()
+        recent = [renamed for renamed in self.renames.get(channel_id, []) if now - renamed < window]
+        if recent:
+            self.renames[channel_id] = recent
+        else:
+            self.renames.pop(channel_id, None)
+        return recent
+
+    def apply(self, kind: str, data: Dict[str, Any], at: float):
+        if kind == "lock":
+            self.locked[data["channel"]] = {"by_overwrites": data["by_overwrites"], "denied": data["denied"]}
+        elif kind == "unlock":
+            self.locked[data["channel"]] = None
+        elif kind == "rename":
+            self.recent_renames(data["channel"], at)
+            self.renames.setdefault(data["channel"], []).append(at)
+        elif kind in ("spec_add", "spec_rm"):
+            pass  # only journaled for the record; the channel's overwrites are what count
+        elif kind == "phase":
+            self.phase = (data["id"], data["name"])
+        elif kind == "reset":
+            self.__init__()
+        else:
+            logging.warning(f"unknown journal event kind {kind}")
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "locked": list(self.locked.items()),
+                "renames": list(self.renames.items()),
+                "phase": self.phase,
+            }
+        )
+
+    @staticmethod
+    def from_json(data: str) -> "GameState":
+        data = json.loads(data)
+        state = GameState()
+        state.locked = dict(data["locked"])
+        state.renames = dict(data["renames"])
+        state.phase = tuple(data["phase"]) if data["phase"] is not None else None
+        return state
+
+
+class Journal:
+    """
+    Append-only log of hostbot actions, with the game state it adds up to kept in memory per server.
+
+    Every JOURNAL_SNAPSHOT_EVERY events, a server's state is snapshotted, so on startup it's rebuilt from its latest
+    snapshot plus the handful of events after it, rather than from Discord.
+    """
+
+    def __init__(self):
+        self._states = {}  # type: Dict[int, GameState]
+        self._since_snapshot = {}  # type: Dict[int, int]
+
+    def load(self):
+        started = time.perf_counter()
+        session = session_maker()
+        n_events = 0
+        snapshots = {snapshot.server_id: snapshot for snapshot in session.query(hbs.JournalSnapshot)}
+        for snapshot in snapshots.values():
+            self._states[snapshot.server_id] = GameState.from_json(snapshot.state)
+        # Only the tails need replaying; one query for all of them.
+        tails = session.query(hbs.JournalEvent).order_by(hbs.JournalEvent.id)
+        if snapshots:
+            tails = tails.filter(
+                or_(
+                    hbs.JournalEvent.server_id.notin_(list(snapshots)),
+                    *[
+                        (hbs.JournalEvent.server_id == server_id) & (hbs.JournalEvent.id > snapshot.last_event_id)
+                        for server_id, snapshot in snapshots.items()
+                    ],
+                )
+            )
+        for event in tails:
+            self._apply(event)
+            n_events += 1
+        session.close()
+        logging.info(
+            f"journal: rebuilt {len(self._states)} servers from {len(snapshots)} snapshots and {n_events} events "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+
+    def _apply(self, event: hbs.JournalEvent):
+        state = self._states.setdefault(event.server_id, GameState())
+        state.apply(event.kind, json.loads(event.data), event.at)
+        self._since_snapshot[event.server_id] = self._since_snapshot.get(event.server_id, 0) + 1
+
+    def state(self, guild_id: int) -> GameState:
+        return self._states.setdefault(guild_id, GameState())
+
+    def record(self, guild_id: int, kind: str, actor_id: Optional[int] = None, **data):
+        """
+        Append an event and apply it to the server's state.
+        """
+        session = session_maker()
+        event = hbs.JournalEvent(
+            server_id=guild_id, kind=kind, data=json.dumps(data), actor_id=actor_id, at=time.time()
+        )
+        session.add(event)
+        session.commit()
+        self._apply(event)
+        if self._since_snapshot[guild_id] >= JOURNAL_SNAPSHOT_EVERY:
+            session.merge(
+                hbs.JournalSnapshot(
+                    server_id=guild_id,
+                    last_event_id=event.id,
+                    state=self._states[guild_id].to_json(),
+                    taken_at=time.time(),
+                )
+            )
+            session.commit()
+            self._since_snapshot[guild_id] = 0
+        session.close()
+
+    @staticmethod
+    def recent(guild_id: int, limit: int) -> List[hbs.JournalEvent]:
+        session = session_maker()
+        events = (
+            session.query(hbs.JournalEvent)
+            .filter_by(server_id=guild_id)
+            .order_by(hbs.JournalEvent.id.desc())
+            .limit(limit)
+            .all()
+        )
+        session.close()
+        return list(reversed(events))
+
+
+class LockManager:
+    """
+    Locks and unlocks Role PMs, keeping their lock state in the journal rather than reading it off channel names.
+
+    Locking either prefixes the channel name with LOCK_EMOJI, or (if the server is set to) denies the channel's
+    players send_messages. Renames are limited per channel by Discord, so a rename that would go over the limit is
+    handed to the scheduler for when it frees up, instead of leaving the command stuck waiting on a 429; the state
+    itself changes straight away either way. Overwrite edits have no such limit.
+
+    Renames go in the journal too, so recent ones still count against the limit after a restart.
+    """
+
+    def __init__(self, bot: Bot, journal: Journal):
+        self.bot = bot
+        self.journal = journal
+        self._deferred = {}  # type: Dict[int, datetime]  # channel ID -> when its postponed rename is due
+
+    def lock_of(self, channel: discord.TextChannel) -> Optional[Dict[str, Any]]:
+        """
+        How <channel> is locked, as in GameState.locked, or None if it isn't.
+
+        Channels the journal has never seen locked or unlocked go by their name.
+        """
+        locked = self.journal.state(channel.guild.id).locked
+        if channel.id in locked:
+            return locked[channel.id]
+        return {"by_overwrites": False, "denied": []} if channel.name.startswith(LOCK_EMOJI) else None
+
+    @staticmethod
+    def uses_overwrites(guild_id: int) -> bool:
+        session = session_maker()
+        settings = session.query(hbs.LockSettings).get(guild_id)  # type: Optional[hbs.LockSettings]
+        session.close()
+        return settings is not None and bool(settings.use_overwrites)
+
+    def rename_due(self, channel_id: int) -> Optional[datetime]:
+        """
+        When a channel's postponed rename will happen, if it has one.
+        """
+        return self._deferred.get(channel_id)
+
+    async def set_locked(
+        self, channel: discord.TextChannel, locked: bool, player_role_id: Optional[int], actor_id: int = None
+    ) -> bool:
+        """
+        Lock or unlock a Role PM. Returns False, without touching the channel, if it's already that way.
+        """
+        if (self.lock_of(channel) is not None) == locked:
+            return False
+        by_overwrites = locked and self.uses_overwrites(channel.guild.id)
+        denied = []  # type: List[int]
+        if by_overwrites:
+            # Worked out before the state changes, since it may have to fetch members, so nothing awaits between the
+            # check below and the new state being recorded.
+            denied = await self._players_to_deny(channel, player_role_id)
+
+        lock = self.lock_of(channel)  # again, in case it changed while fetching
+        if (lock is not None) == locked:
+            return False
+        if not locked:
+            # Unlocking undoes whichever way it was locked, whatever the setting is now, and only gives back what the
+            # lock itself denied, so denies hosts have set by hand stay put.
+            by_overwrites, denied = lock["by_overwrites"], lock["denied"]
+        self._record(channel, locked, by_overwrites, denied, actor_id)
+
+        try:
+            if by_overwrites:
+                await self._set_send_messages(channel, denied, False if locked else None)
+            else:
+                await self._apply_name(channel, locked)
+        except discord.HTTPException:
+            self._record(channel, not locked, by_overwrites, denied)
+            if locked and by_overwrites:
+                # Don't leave whoever it got to denied with nothing recording it.
+                with contextlib.suppress(discord.HTTPException):
+                    await self._set_send_messages(channel, denied, None)
+            raise
+        return True
+
+    def _record(
+        self,
+        channel: discord.TextChannel,
+        locked: bool,
+        by_overwrites: bool,
+        denied: List[int],
+        actor_id: Optional[int] = None,
+    ):
+        if locked:
+            self.journal.record(
+                channel.guild.id, "lock", actor_id, channel=channel.id, by_overwrites=by_overwrites, denied=denied
+            )
+        else:
+            self.journal.record(channel.guild.id, "unlock", actor_id, channel=channel.id)
+
+    async def unlock_all(
+        self,
+        channels: List[discord.TextChannel],
+        player_role_id: Optional[int],
+        limit: int,
+        progress=None,
+        actor_id: int = None,
+    ) -> bulk.BulkResult:
+        """
+        Unlock every locked channel in <channels>, concurrently. Channels that aren't locked are skipped outright.
+        """
+        locked = [channel for channel in channels if self.lock_of(channel) is not None]
+        return await bulk.run_bulk(
+            locked,
+            lambda channel: self.set_locked(channel, False, player_role_id, actor_id),
+            limit=limit,
+            progress=progress,
+        )
+
+    @staticmethod
+    async def _member(guild: discord.Guild, member_id: int) -> Optional[discord.Member]:
+        member = guild.get_member(member_id)
+        if member is None:
+            try:
+                member = await guild.fetch_member(member_id)
+            except discord.NotFound:
+                return None  # left the server
+        return member
+
+    @staticmethod
+    async def _players_to_deny(channel: discord.TextChannel, player_role_id: Optional[int]) -> List[int]:
+        """
+        IDs of the players with an overwrite of their own on <channel> that doesn't already deny them sending.
+        """
+        member_ids = []
+        for target_id, (target_type, overwrite) in overwrites_by_id(channel).items():
+            if target_type != "member" or overwrite.send_messages is False:
+                continue
+            member = await LockManager._member(channel.guild, target_id)
+            if member is not None and any(role.id == player_role_id for role in member.roles):
+                member_ids.append(member.id)
+        return member_ids
+
+    @staticmethod
+    async def _set_send_messages(channel: discord.TextChannel, member_ids: List[int], send: Optional[bool]):
+        """
+        Set send_messages on each of <member_ids>' overwrites, one target at a time (see overwrites_by_id). Clearing
+        it (<send> None) skips anyone whose deny has been changed since.
+        """
+        for member_id in member_ids:
+            member = await LockManager._member(channel.guild, member_id)
+            if member is None:
+                continue
+            _, overwrite = overwrites_by_id(channel).get(member_id, (None, discord.PermissionOverwrite()))
+            if send is None and overwrite.send_messages is not False:
+                continue
+            overwrite.send_messages = send
+            await channel.set_permissions(member, overwrite=None if overwrite.is_empty() else overwrite)
+
+    async def _apply_name(self, channel: discord.TextChannel, locked: bool):
+        base = channel.name[len(LOCK_EMOJI) :] if channel.name.startswith(LOCK_EMOJI) else channel.name
+        name = f"{LOCK_EMOJI}{base}" if locked else base
+        if name == channel.name:
+            return
+
+        recent = self.journal.state(channel.guild.id).recent_renames(channel.id, time.time())
+        if len(recent) >= RENAME_LIMIT:
+            if channel.id not in self._deferred:
+                due = datetime.utcfromtimestamp(recent[0]) + RENAME_WINDOW
+                self._deferred[channel.id] = due
+                self.bot.scheduler.schedule("hostbot_rename", due, {"channel_id": channel.id})
+            return
+
+        # Counted before it's sent, since a rename that errors out may still have used up the limit.
+        self.journal.record(channel.guild.id, "rename", channel=channel.id)
+        await channel.edit(name=name)
+
+    async def apply_deferred_rename(self, payload: Dict[str, int]):
+        """
+        Scheduler handler: bring a channel's name in line with its lock state, as of now rather than when the rename
+        was postponed (so lock-unlock-lock while over the limit is one rename, or none).
+        """
+        channel_id = payload["channel_id"]
+        self._deferred.pop(channel_id, None)
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            return
+        lock = self.lock_of(channel)
+        if lock is not None and lock["by_overwrites"]:
+            return
+        await self._apply_name(channel, lock is not None)
 
 
 class HostBot(commands.Cog):
@@ -63,7 +515,9 @@ class HostBot(commands.Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
 
-        self.confessional_cooldowns = {}  # type: Dict[int, List]
+        self.confessional_limit = bot.ratelimits.declare(
+            ratelimit.SlidingWindow("confessional", cooldown_max, cooldown_delta.total_seconds(), persist=True)
+        )
 
         self.connection = spreadsheet.SheetConnection(bot.google_creds, bot.google_scope)
 
@@ -80,6 +534,23 @@ class HostBot(commands.Cog):
 
         hbs.Base.metadata.create_all(engine)
 
+        # Not self.journal: that's the journal command.
+        self.events = Journal()
+        self.events.load()
+        self.locks = LockManager(bot, self.events)
+        bot.scheduler.register("hostbot_rename", self.locks.apply_deferred_rename)
+
+        # Gamechat activity is counted in memory and written out in one upsert per flush, rather than a write per
+        # message. (phase ID, player ID) -> [messages, characters, last message time]
+        self._activity = {}  # type: Dict[Tuple[int, int], List]
+        self.flush_activity.start()
+
+        self._archiving = set()  # type: Set[int]  # guild IDs with an archive running
+
+    def cog_unload(self):
+        self.flush_activity.cancel()
+        self._flush_activity()
+
     @commands.group(invoke_without_command=True)
     @commands.has_permissions(administrator=True)
     async def init(self, ctx: commands.Context):
@@ -200,6 +671,7 @@ class HostBot(commands.Cog):
 
         session.add(server)
         session.commit()
+        invalidate_snapshot(ctx.guild.id)
 
         await ctx.send("Created channels and roles.")
 
@@ -269,6 +741,7 @@ class HostBot(commands.Cog):
 
         session.add(server)
         session.commit()
+        invalidate_snapshot(ctx.guild.id)
 
         await ctx.send("Registered channels and roles. Use `init setchan` to configure further channels.")
 
@@ -369,46 +842,48 @@ class HostBot(commands.Cog):
 
         Must be used after "init server".
         Unlike "init rolepms", passes in a linebreak-separated list as the playerlist argument.
+        Safe to rerun with the same list if it gets interrupted; players who already have a Role PM are skipped.
         """
         session = session_maker()
 
-        server = session.query(hbs.Server).filter_by(id=ctx.guild.id).one_or_none()
-        if server is None:
+        snapshot = get_snapshot(ctx.guild.id)
+        if snapshot is None:
             await ctx.send("Server is not set up")
             return
 
-        spec_role_id = session.query(hbs.Role).filter_by(server_id=ctx.guild.id, type="spec").one_or_none()
-        spec_role = ctx.guild.get_role(spec_role_id.id)
-
-        host_role_id = session.query(hbs.Role).filter_by(server_id=ctx.guild.id, type="host").one_or_none()
-        host_role = ctx.guild.get_role(host_role_id.id)
-
-        player_role_ids = session.query(hbs.Role).filter_by(server_id=ctx.guild.id, type="player").all()
-        player_roles = [ctx.guild.get_role(role_id.id) for role_id in player_role_ids]
+        host_role = ctx.guild.get_role(snapshot.role_id("host"))
+        player_roles = [ctx.guild.get_role(role_id) for role_id in snapshot.roles.get("player", ())]
 
         ls_usernames = playerlist.strip("```").strip("\n").split("\n")
 
-        players = []
+        # Pick up where a previous run stopped: forget Role PMs whose channel has since been deleted, and skip
+        # players who still have one.
+        done = {}  # type: Dict[str, hbs.RolePM]
+        for row in session.query(hbs.RolePM).filter_by(server_id=ctx.guild.id):
+            if ctx.guild.get_channel(row.id) is None:
+                session.delete(row)
+            else:
+                done[row.player_name] = row
+        session.commit()
+
+        members = ctx.bot.member_index.index(ctx.guild)
+        players = []  # type: List[Tuple[str, Player]]
         error_names = []
         error = "Error finding players: ```\n"
         for name in ls_usernames:
-            player = ctx.guild.get_member_named(name)
+            player = members.resolve(name)
             if player is None:
                 error_names.append(name)
-                error += f"{name}\n"
-                players.append(NotFoundMember(name))
-            else:
-                players.append(player)
+                suggestions = [str(member) for member, _ in members.suggest(name)]
+                error += f"{name} (did you mean: {', '.join(suggestions)}?)\n" if suggestions else f"{name}\n"
+                player = NotFoundMember(name)
+            if name not in done:
+                players.append((name, player))
         error += "```_(Created channels without permissions instead.)_"
 
-        players = sorted(players, key=lambda p: p.name.lower())
-
-        chunked_players = [players[i : i + MAX_CATEGORY_SIZE] for i in range(0, len(players), MAX_CATEGORY_SIZE)]
+        players = sorted(players, key=lambda p: p[1].name.lower())
 
-        category = None  # type: Optional[discord.CategoryChannel]
-        categories = []
-
-        for chunk in chunked_players:
+        def base_overwrites() -> Dict[Union[discord.Role, discord.Member], discord.PermissionOverwrite]:
             overwrites = {
                 ctx.guild.default_role: discord.PermissionOverwrite(read_messages=False),
                 ctx.guild.me: discord.PermissionOverwrite(read_messages=True),
@@ -416,109 +891,241 @@ class HostBot(commands.Cog):
             }
             for player_role in player_roles:
                 overwrites[player_role] = discord.PermissionOverwrite(manage_messages=True)
-            category = await ctx.guild.create_category("Role PMs", overwrites=overwrites)
-
-            for player in chunk:
-                overwrites = {
-                    ctx.guild.default_role: discord.PermissionOverwrite(read_messages=False),
-                    ctx.guild.me: discord.PermissionOverwrite(read_messages=True),
-                    host_role: discord.PermissionOverwrite(read_messages=True, manage_messages=True),
-                }
-                for player_role in player_roles:
-                    overwrites[player_role] = discord.PermissionOverwrite(manage_messages=True)
-                if type(player) is discord.Member:
-                    if len(player_roles) == 1:
-                        if player_roles[0] not in player.roles:
-                            await player.edit(roles=player.roles + [player_roles[0]])
-                    # manage needed for pins
-                    overwrites[player] = discord.PermissionOverwrite(read_messages=True, manage_messages=True)
-                topic = f"{player}'s Role PM"
-                await category.create_text_channel(
-                    HostBot._player_channel_name(player),
-                    overwrites=overwrites,
-                    topic=topic,
+            return overwrites
+
+        # Fill any room left in existing Role PM categories first, then make new ones. Categories are recorded as
+        # soon as they're made, so a rerun reuses them.
+        slots = []  # type: List[Tuple[discord.CategoryChannel, int]]  # (category, position) per new channel
+        for category_id in sorted(snapshot.channels.get("rolepms", ())):
+            category = ctx.guild.get_channel(category_id)  # type: Optional[discord.CategoryChannel]
+            if category is not None:
+                first = len(category.channels)
+                slots += [(category, i) for i in range(first, MAX_CATEGORY_SIZE)]
+        while len(slots) < len(players):
+            category = await ctx.guild.create_category("Role PMs", overwrites=base_overwrites())
+            session.add(hbs.Channel(id=category.id, type="rolepms", server_id=ctx.guild.id))
+            server = session.query(hbs.Server).filter_by(id=ctx.guild.id).one_or_none()
+            server.rolepms_id = category.id
+            session.commit()
+            invalidate_snapshot(ctx.guild.id)
+            slots += [(category, i) for i in range(MAX_CATEGORY_SIZE)]
+
+        # Enrole everyone first, then make channels. Both go through bulk.run_bulk(); role edits are per-member rate
+        # limit buckets so they really do run in parallel, while channel creates share the guild's bucket and
+        # discord.py paces them.
+        if len(player_roles) == 1:
+            to_enrole = [
+                player
+                for _, player in players
+                if type(player) is discord.Member and player_roles[0] not in player.roles
+            ]
+            progress = await bulk.ProgressMessage.start(ctx, "Enroling players", len(to_enrole), embed=True)
+            enroled = await bulk.run_bulk(
+                to_enrole,
+                lambda player: player.add_roles(player_roles[0], reason="Role PM setup"),
+                limit=ctx.bot.conf.bulk_concurrency,
+                progress=progress,
+            )
+        else:
+            enroled = bulk.BulkResult(0)
+
+        async def create(item: Tuple[Tuple[str, Player], Tuple[discord.CategoryChannel, int]]):
+            (name, player), (category, position) = item
+            overwrites = base_overwrites()
+            if type(player) is discord.Member:
+                # manage needed for pins
+                overwrites[player] = discord.PermissionOverwrite(read_messages=True, manage_messages=True)
+            channel = await category.create_text_channel(
+                HostBot._player_channel_name(player),
+                overwrites=overwrites,
+                topic=f"{player}'s Role PM",
+                position=position,
+            )
+            session.add(
+                hbs.RolePM(
+                    id=channel.id,
+                    server_id=ctx.guild.id,
+                    category_id=category.id,
+                    player_name=name,
+                    player_id=player.id if type(player) is discord.Member else None,
                 )
+            )
+            session.commit()
 
-            categories.append(hbs.Channel(id=category.id, type="rolepms", server_id=ctx.guild.id))
+        progress = await bulk.ProgressMessage.start(ctx, "Creating Role PMs", len(players), embed=True)
+        created = await bulk.run_bulk(
+            list(zip(players, slots)), create, limit=ctx.bot.conf.bulk_concurrency, progress=progress
+        )
 
-        server = session.query(hbs.Server).filter_by(id=ctx.guild.id).one_or_none()
-        if category:
-            server.rolepms_id = category.id
-        for category_row in categories:
-            session.add(category_row)
-        session.commit()
+        em = discord.Embed(title="Role PMs", color=host_role.color if host_role else discord.Embed.Empty)
+        em.add_field(name="Created", value=str(len(created.succeeded)))
+        em.add_field(name="Already done", value=str(len([name for name in ls_usernames if name in done])))
+        if created.failed or enroled.failed:
+            em.add_field(name="Failed", value=str(len(created.failed) + len(enroled.failed)))
+            failures = created.failure_summary(lambda item: item[0][0])
+            if enroled.failed:
+                failures += "\n" + enroled.failure_summary(lambda player: f"enroling {player}")
+            em.description = f"```\n{failures.strip()[:1900]}```Rerun the same command to retry."
+        await ctx.send(embed=em)
 
         if len(error_names) > 0:
             await ctx.send(error)
 
+    @staticmethod
+    def _reset_plan(
+        ctx: commands.Context, session: Session, server: hbs.Server
+    ) -> Tuple[List[hbs.ResetTask], List[str]]:
+        """
+        Work out everything "init reset" has to delete. Returns the tasks, and what couldn't be found.
+        """
+        tasks = {}  # type: Dict[int, hbs.ResetTask]
+        missing = []
+
+        def add(target: Union[discord.abc.GuildChannel, discord.Role], kind: str, label: str):
+            if target.id not in tasks:
+                tasks[target.id] = hbs.ResetTask(id=target.id, server_id=server.id, kind=kind, label=label)
+
+        rolepm_ids = {channel.id for channel in server.channels if channel.type == "rolepms"}
+        if server.rolepms_id is not None:
+            # legacy support
+            rolepm_ids.add(server.rolepms_id)
+        for category_id in sorted(rolepm_ids):
+            category = ctx.guild.get_channel(category_id)  # type: Optional[discord.CategoryChannel]
+            if category is None:
+                missing.append("Role PMs category")
+                continue
+            for channel in category.channels:
+                add(channel, "channel", str(channel))
+            add(category, "category", str(category))
+        for role_pm in session.query(hbs.RolePM).filter_by(server_id=server.id):
+            channel = ctx.guild.get_channel(role_pm.id)
+            if channel is not None:
+                add(channel, "channel", str(channel))
+
+        for channel_row in server.channels:
+            if channel_row.type == "rolepms":
+                continue
+            channel = ctx.guild.get_channel(channel_row.id)
+            if channel is None:
+                missing.append(f"{channel_row.type} channel")
+            else:
+                add(channel, "channel", str(channel))
+
+        for role_row in server.roles:
+            role = ctx.guild.get_role(role_row.id)
+            if role is None:
+                missing.append(f"`{role_row.type}` role")
+            else:
+                add(role, "role", f"@{role}")
+
+        return list(tasks.values()), missing
+
+    @staticmethod
+    def _reset_estimate(tasks: List[hbs.ResetTask], limit: int) -> float:
+        """
+        Rough seconds a reset will take. Channel deletes each have their own rate limit bucket, so they run <limit>
+        at a time; role deletes all share the guild's bucket, so they go one by one alongside them. Categories go
+        last, once they're empty.
+        """
+        n_channels = len([task for task in tasks if task.kind == "channel"])
+        n_roles = len([task for task in tasks if task.kind == "role"])
+        n_categories = len([task for task in tasks if task.kind == "category"])
+        batches = max(math.ceil(n_channels / limit), n_roles) + math.ceil(n_categories / limit)
+        return batches * RESET_REQUEST_SECONDS
+
     @init.command(name="reset")
     @commands.is_owner()
-    async def init_reset(self, ctx: commands.Context):
+    async def init_reset(self, ctx: commands.Context, mode: str = ""):
         """
         Delete previously created channels and roles.
 
         If Role PMs and Roles have been created using 'init rolepms', deletes those too.
+        Use "init reset dry" to see what would be deleted and roughly how long it'd take, without deleting anything.
+        If a reset gets interrupted, run it again to finish it.
         """
+        # Anything else is most likely a mistyped "dry", so it mustn't fall through to a real reset.
+        if mode.lower() not in ("", "dry"):
+            await ctx.send(f'Unknown reset mode "{mode}"; use "init reset dry" for a dry run, or "init reset" alone.')
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+
         session = session_maker()
         server = session.query(hbs.Server).filter_by(id=ctx.guild.id).one_or_none()
-        if server is None:
+        tasks = session.query(hbs.ResetTask).filter_by(server_id=ctx.guild.id).all()  # type: List[hbs.ResetTask]
+        resuming = len(tasks) > 0
+        if server is None and not resuming:
             await ctx.send("This server has not been set up; nothing to reset.")
             return
 
-        reason = f"Server reset by {ctx.author}"
+        missing = []
+        if not resuming:
+            tasks, missing = self._reset_plan(ctx, session, server)
+
+        limit = ctx.bot.conf.bulk_concurrency
+        if mode.lower() == "dry":
+            em = discord.Embed(title=f"Reset plan for {ctx.guild}")
+            if resuming:
+                em.description = "Finishing an interrupted reset."
+            for kind, name in [("channel", "Channels"), ("category", "Categories"), ("role", "Roles")]:
+                labels = [task.label for task in tasks if task.kind == kind]
+                if labels:
+                    em.add_field(name=f"{name} ({len(labels)})", value=", ".join(labels)[:1024], inline=False)
+            if missing:
+                em.add_field(name="Already gone", value=", ".join(missing)[:1024], inline=False)
+            em.set_footer(text=f"Estimated time: ~{timedelta(seconds=round(self._reset_estimate(tasks, limit)))}")
+            session.rollback()
+            await ctx.send(embed=em)
+            return
 
-        try:
-            for channel in server.channels:
-                discord_ch = ctx.guild.get_channel(channel.id)
-                if discord_ch is not None:
-                    await discord_ch.delete(reason=reason)
-                else:
-                    await ctx.send(f"Could not find {channel.type} channel.")
-        except discord.Forbidden:
-            await ctx.send("Insufficient permissions to delete channels.")
+        if not resuming:
+            session.add_all(tasks)
+            session.commit()
+        for item in missing:
+            await ctx.send(f"Could not find {item}.")
 
-        try:
-            for role in server.roles:
-                discord_role = ctx.guild.get_role(role.id)
-                if discord_role is not None:
-                    await discord_role.delete(reason=reason)
-                else:
-                    await ctx.send(f"Could not find `{role.type}` role.")
-        except discord.Forbidden:
-            await ctx.send("Insufficient permissions to delete roles.")
-
-        # if server.rolepms_id is not None:
-        #     try:
-        #         category = ctx.guild.get_channel(server.rolepms_id)  # type: discord.CategoryChannel
-        #         if category is not None:
-        #             for channel in category.channels:
-        #                 await channel.delete(reason=reason)
-        #             await category.delete(reason=reason)
-        #         else:
-        #             await ctx.send('Could not find Role PMs category.')
-        #     except discord.Forbidden:
-        #         await ctx.send('Insufficient permissions to delete Role PMs.')
-
-        rolepms = session.query(hbs.Channel).filter_by(server_id=ctx.guild.id, type="rolepms").all()
-        # the union maintains legacy support
-        rolepm_ids = {category.id for category in rolepms}.union({server.rolepms_id})
-        role_pms: List[discord.CategoryChannel] = sorted(
-            [ctx.guild.get_channel(cid) for cid in rolepm_ids], key=lambda x: str(x),
-        )
+        reason = f"Server reset by {ctx.author}"
 
-        try:
-            for category in role_pms:
-                if category is not None:
-                    for channel in category.channels:
-                        await channel.delete(reason=reason)
-                    await category.delete(reason=reason)
-                else:
-                    await ctx.send("Could not find Role PMs category.")
-        except discord.Forbidden:
-            await ctx.send("Insufficient permissions to delete Role PMs.")
+        async def delete(task: hbs.ResetTask):
+            if task.kind == "role":
+                target = ctx.guild.get_role(task.id)
+            else:
+                target = ctx.guild.get_channel(task.id)
+            if target is not None:
+                try:
+                    await target.delete(reason=reason)
+                except discord.NotFound:
+                    pass
+            session.delete(task)
+            session.commit()
+
+        # Categories last, so their channels are already gone.
+        first = [task for task in tasks if task.kind != "category"]
+        categories = [task for task in tasks if task.kind == "category"]
+        progress = await bulk.ProgressMessage.start(ctx, "Resetting server", len(tasks), embed=True)
+        result = await bulk.run_bulk(first, delete, limit=limit, progress=progress)
+        if not result.failed:
+            result = await bulk.run_bulk(categories, delete, limit=limit, progress=progress)
+
+        if result.failed:
+            if any(isinstance(failure.error, discord.Forbidden) for failure in result.failed):
+                await ctx.send("Insufficient permissions to delete some channels or roles.")
+            await ctx.send(
+                f"Failed to delete:```\n{result.failure_summary(lambda task: task.label)}```"
+                f"Run `{ctx.bot.default_command_prefix}init reset` again to finish."
+            )
+            return
 
-        session.delete(server)
-        session.commit()
+        if server is not None:
+            session.query(hbs.RolePM).filter_by(server_id=ctx.guild.id).delete()
+            session.query(hbs.LockSettings).filter_by(server_id=ctx.guild.id).delete()
+            phase_ids = [phase.id for phase in session.query(hbs.Phase.id).filter_by(server_id=ctx.guild.id)]
+            self._activity = {key: counts for key, counts in self._activity.items() if key[0] not in phase_ids}
+            session.query(hbs.Activity).filter(hbs.Activity.phase_id.in_(phase_ids)).delete(synchronize_session=False)
+            session.query(hbs.Phase).filter_by(server_id=ctx.guild.id).delete()
+            session.delete(server)
+            session.commit()
+        invalidate_snapshot(ctx.guild.id)
+        self.events.record(ctx.guild.id, "reset", ctx.author.id)
 
         await ctx.send("Deleted, like, everything.")
 
@@ -555,6 +1162,7 @@ class HostBot(commands.Cog):
             new_role = hbs.Role(id=role.id, type=role_type, server_id=ctx.guild.id)
             session.add(new_role)
         session.commit()
+        invalidate_snapshot(ctx.guild.id)
         await ctx.message.add_reaction(ctx.bot.greentick)
 
     @init.command(name="setchan")
@@ -607,6 +1215,7 @@ class HostBot(commands.Cog):
                 session.add(channel_row)
 
         session.commit()
+        invalidate_snapshot(ctx.guild.id)
         await ctx.message.add_reaction(ctx.bot.greentick)
 
     # @init.command(name='setrole')
@@ -618,26 +1227,20 @@ class HostBot(commands.Cog):
         """
         List game server info and number of people in each game-related role.
         """
-        session = session_maker()
-        server = session.query(hbs.Server).filter_by(id=ctx.guild.id).one_or_none()
-        if server is None:
+        snapshot = get_snapshot(ctx.guild.id)
+        if snapshot is None:
             await ctx.send("This server has not been set up; no status exists.")
             return
 
-        spec_role_id = session.query(hbs.Role).filter_by(server_id=ctx.guild.id, type="spec").one_or_none()
-        host_role_id = session.query(hbs.Role).filter_by(server_id=ctx.guild.id, type="host").one_or_none()
-        player_role_ids = session.query(hbs.Role).filter_by(server_id=ctx.guild.id, type="player").all()
-        dead_role_id = session.query(hbs.Role).filter_by(server_id=ctx.guild.id, type="dead").one_or_none()
-
-        spec_role = ctx.guild.get_role(spec_role_id.id)
-        host_role = ctx.guild.get_role(host_role_id.id)
-        player_roles = [ctx.guild.get_role(role_id.id) for role_id in player_role_ids]
-        dead_role = ctx.guild.get_role(dead_role_id.id)
+        spec_role = ctx.guild.get_role(snapshot.role_id("spec"))
+        host_role = ctx.guild.get_role(snapshot.role_id("host"))
+        player_roles = [ctx.guild.get_role(role_id) for role_id in snapshot.roles.get("player", ())]
+        dead_role = ctx.guild.get_role(snapshot.role_id("dead"))
 
         if host_role:
-            em = discord.Embed(title=server.name, color=host_role.color)
+            em = discord.Embed(title=snapshot.name, color=host_role.color)
         else:
-            em = discord.Embed(title=server.name)
+            em = discord.Embed(title=snapshot.name)
         em.set_thumbnail(url=ctx.guild.icon_url)
 
         if host_role:
@@ -670,57 +1273,190 @@ class HostBot(commands.Cog):
         else:
             em.add_field(name=f"N/A (Dead)", value="Dead role not found", inline=False)
 
-        announcements_chan = (
-            session.query(hbs.Channel).filter_by(server_id=ctx.guild.id, type="announcements").one_or_none()
-        )
-        flips_chan = session.query(hbs.Channel).filter_by(server_id=ctx.guild.id, type="flips").one_or_none()
-        gamechat_chan = session.query(hbs.Channel).filter_by(server_id=ctx.guild.id, type="gamechat").one_or_none()
-        graveyard_chan = session.query(hbs.Channel).filter_by(server_id=ctx.guild.id, type="graveyard").one_or_none()
-        confs_chan = session.query(hbs.Channel).filter_by(server_id=ctx.guild.id, type="confessionals").one_or_none()
-        rolepms = session.query(hbs.Channel).filter_by(server_id=ctx.guild.id, type="rolepms").all()
-        # the union maintains legacy support
-        rolepm_ids = {category.id for category in rolepms}.union({server.rolepms_id})
-
-        em.add_field(
-            name="Announcements",
-            value=f'{ctx.guild.get_channel(announcements_chan.id) if announcements_chan else "N/A"}',
-        )
-        em.add_field(
-            name="Flips",
-            value=f'{ctx.guild.get_channel(flips_chan.id) if flips_chan else "N/A"}',
-        )
-        em.add_field(
-            name="Gamechat",
-            value=f'{ctx.guild.get_channel(gamechat_chan.id) if gamechat_chan else "N/A"}',
-        )
-        em.add_field(
-            name="Graveyard",
-            value=f'{ctx.guild.get_channel(graveyard_chan.id) if graveyard_chan else "N/A"}',
-        )
-        em.add_field(
-            name="Confessionals",
-            value=f'{ctx.guild.get_channel(confs_chan.id) if confs_chan else "N/A"}',
-        )
-        role_pms = sorted([str(ctx.guild.get_channel(cid)) for cid in rolepm_ids])
-        role_pms = ", ".join(channel for channel in role_pms)
+        for name, channel_type in [
+            ("Announcements", "announcements"),
+            ("Flips", "flips"),
+            ("Gamechat", "gamechat"),
+            ("Graveyard", "graveyard"),
+            ("Confessionals", "confessionals"),
+        ]:
+            channel_id = snapshot.channel_id(channel_type)
+            em.add_field(name=name, value=f'{ctx.guild.get_channel(channel_id) if channel_id else "N/A"}')
+        role_pms = sorted([str(ctx.guild.get_channel(cid)) for cid in snapshot.rolepm_ids])
+        role_pms = ", ".join(channel for channel in role_pms) or "N/A"
         em.add_field(name="Role PMs category(s)", value=f"{role_pms}")
 
         await ctx.send(embed=em)
 
-    def _inc_cooldown(self, user: discord.Member):
-        if user.id not in self.confessional_cooldowns:
-            self.confessional_cooldowns[user.id] = [datetime.utcnow()]
-            return True
+    @staticmethod
+    def _message_row(message: discord.Message) -> Dict:
+        return {
+            "id": message.id,
+            "channel_id": message.channel.id,
+            "channel": message.channel.name,
+            "author_id": message.author.id,
+            "author": str(message.author),
+            "created_at": message.created_at,
+            "edited_at": message.edited_at,
+            "content": message.content,
+            "attachments": [attachment.url for attachment in message.attachments],
+            "embeds": [embed.to_dict() for embed in message.embeds],
+            "reply_to": message.reference.message_id if message.reference is not None else None,
+            "pinned": message.pinned,
+        }
+
+    async def _archive_channel(self, channel: discord.TextChannel, path: Path):
+        """
+        Stream a channel's history into <path> a batch at a time, checkpointing after each batch.
+        """
+        session = session_maker()
+        checkpoint = session.query(hbs.ArchiveCheckpoint).get(channel.id)  # type: Optional[hbs.ArchiveCheckpoint]
+        if checkpoint is None:
+            checkpoint = hbs.ArchiveCheckpoint(
+                channel_id=channel.id, server_id=channel.guild.id, messages=0, size=0, done=False
+            )
+            session.add(checkpoint)
+            session.commit()
+        if checkpoint.done:
+            session.close()
+            return
 
-        if len(self.confessional_cooldowns[user.id]) < cooldown_max:
-            self.confessional_cooldowns[user.id].append(datetime.utcnow())
-            return True
+        # Drop anything written after the last checkpoint, so a batch that was interrupted isn't written twice.
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "ab") as fp:
+            fp.truncate(checkpoint.size)
 
-        if self.confessional_cooldowns[user.id][0] + cooldown_delta > datetime.utcnow():
-            return False
-        self.confessional_cooldowns[user.id].pop(0)
-        self.confessional_cooldowns[user.id].append(datetime.utcnow())
-        return True
+        loop = asyncio.get_event_loop()
+
+        async def write(rows: List[Dict]):
+            await loop.run_in_executor(None, archive.append_jsonl, path, rows)
+            checkpoint.last_message_id = rows[-1]["id"]
+            checkpoint.messages += len(rows)
+            checkpoint.size = path.stat().st_size
+            session.commit()
+
+        after = discord.Object(checkpoint.last_message_id) if checkpoint.last_message_id is not None else None
+        rows = []
+        try:
+            async for message in channel.history(limit=None, after=after, oldest_first=True):
+                rows.append(self._message_row(message))
+                if len(rows) >= ARCHIVE_BATCH:
+                    await write(rows)
+                    rows = []
+            if rows:
+                await write(rows)
+            checkpoint.done = True
+            session.commit()
+        finally:
+            session.close()
+
+    @commands.command()
+    @commands.guild_only()
+    async def archive(self, ctx: commands.Context, mode: str = ""):
+        """
+        Archive the game's channels (Role PMs, gamechat, graveyard and the rest) to compressed JSON Lines.
+
+        Channels are fetched several at a time and checkpointed as they go, so if it gets interrupted, running it
+        again carries on from there. "archive restart" starts over from scratch.
+        Usable by hosts only.
+        """
+        snapshot = get_snapshot(ctx.guild.id)
+        if snapshot is None:
+            await ctx.send("This server isn't a game server.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+        if not has_role(ctx, ["host"]):
+            await ctx.send("Only hosts can archive the game.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+
+        # Two at once would write into the same per-channel files and checkpoints.
+        if ctx.guild.id in self._archiving:
+            await ctx.send("This server is already being archived; wait for that to finish.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+        self._archiving.add(ctx.guild.id)
+        try:
+            await self._archive(ctx, snapshot, mode)
+        finally:
+            self._archiving.discard(ctx.guild.id)
+
+    async def _archive(self, ctx: commands.Context, snapshot: ServerSnapshot, mode: str):
+        directory = Path(ARCHIVE_DIR) / str(ctx.guild.id)
+        if mode.lower() == "restart":
+            session = session_maker()
+            session.query(hbs.ArchiveCheckpoint).filter_by(server_id=ctx.guild.id).delete()
+            session.commit()
+            session.close()
+            for old in directory.glob("*.jsonl.zst"):
+                old.unlink()
+
+        # By ID, since a channel can be configured itself and also be in a configured category, and two tasks on one
+        # file would corrupt it.
+        by_id = {}  # type: Dict[int, discord.TextChannel]
+        for channel_id in sorted({channel_id for ids in snapshot.channels.values() for channel_id in ids}):
+            channel = ctx.guild.get_channel(channel_id)
+            if isinstance(channel, discord.CategoryChannel):
+                by_id.update((text_channel.id, text_channel) for text_channel in channel.text_channels)
+            elif isinstance(channel, discord.TextChannel):
+                by_id[channel.id] = channel
+        if snapshot.rolepms_id is not None and snapshot.rolepms_id not in snapshot.channels.get("rolepms", ()):
+            category = ctx.guild.get_channel(snapshot.rolepms_id)
+            if category is not None:
+                by_id.update((text_channel.id, text_channel) for text_channel in category.text_channels)
+        channels = list(by_id.values())
+
+        await ctx.message.add_reaction(ctx.bot.waitemoji)
+        progress = await bulk.ProgressMessage.start(ctx, "Archiving channels", len(channels), embed=True)
+        result = await bulk.run_bulk(
+            channels,
+            lambda channel: self._archive_channel(channel, directory / f"{channel.id}.jsonl.zst"),
+            limit=ctx.bot.conf.bulk_concurrency,
+            progress=progress,
+        )
+        await ctx.message.remove_reaction(ctx.bot.waitemoji, ctx.bot.user)
+        if result.failed:
+            await ctx.send(
+                f"Couldn't archive:```\n{result.failure_summary(lambda channel: channel.name)}```"
+                f"Run `{ctx.bot.default_command_prefix}archive` again to finish."
+            )
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+
+        # zstd frames can simply be concatenated, so the per-channel files join up into one archive without
+        # decompressing anything.
+        combined = directory / "archive.jsonl.zst"
+        parts = [directory / f"{channel.id}.jsonl.zst" for channel in channels]
+
+        def combine():
+            tmp_path = combined.with_name(combined.name + ".tmp")
+            with open(tmp_path, "wb") as out:
+                for part in parts:
+                    if part.exists():
+                        with open(part, "rb") as fp:
+                            while True:
+                                chunk = fp.read(1024 * 1024)
+                                if not chunk:
+                                    break
+                                out.write(chunk)
+            os.replace(tmp_path, combined)
+
+        await asyncio.get_event_loop().run_in_executor(None, combine)
+
+        session = session_maker()
+        n_messages = sum(
+            checkpoint.messages
+            for checkpoint in session.query(hbs.ArchiveCheckpoint).filter(
+                hbs.ArchiveCheckpoint.channel_id.in_([channel.id for channel in channels])
+            )
+        )
+        session.close()
+        summary = f"Archived {n_messages} messages from {len(channels)} channels."
+        if combined.stat().st_size <= MAX_UPLOAD_SIZE:
+            await ctx.send(summary, file=discord.File(str(combined), f"{ctx.guild.name} archive.jsonl.zst"))
+        else:
+            await ctx.send(f"{summary} It's too big to upload here; it's on the bot's host at `{combined}`.")
+        await ctx.message.add_reaction(ctx.bot.greentick)
 
     @commands.command()
     @commands.guild_only()
@@ -733,16 +1469,14 @@ class HostBot(commands.Cog):
         if "@everyone" in ctx.message.content.lower():
             await ctx.send(ctx.author.mention)
             return
-        session = session_maker()
-        server = session.query(hbs.Server).filter_by(id=ctx.guild.id).one_or_none()
+        snapshot = get_snapshot(ctx.guild.id)
         # This should never have multiple roles in it, unless I'm manually overriding something for a game,
         # in which case, that is important to be able to support!
-        player_roles = session.query(hbs.Role).filter_by(type="player", server_id=ctx.guild.id).all()
-        if len(player_roles) == 0:
+        if snapshot is None or len(snapshot.roles.get("player", ())) == 0:
             await ctx.send("This server isn't set up for EiMM.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
-        player_roles = [ctx.guild.get_role(player_role.id) for player_role in player_roles]
+        player_roles = [ctx.guild.get_role(role_id) for role_id in snapshot.roles["player"]]
         found = False
         for player_role in player_roles:
             if player_role in ctx.author.roles:
@@ -755,18 +1489,16 @@ class HostBot(commands.Cog):
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
 
-        if not self.is_rolepm(ctx, server):
+        if not self.is_rolepm(ctx, snapshot):
             await ctx.send("Confessionals belong in your role PM.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
 
-        if self._inc_cooldown(ctx.author) is False:
-            time_til_next = cooldown_delta - (datetime.utcnow() - self.confessional_cooldowns[ctx.author.id][0])
-            hours, rem = divmod(time_til_next.seconds, 3600)
-            mins, secs = divmod(time_til_next.seconds, 60)
+        retry_after = self.confessional_limit.hit(ctx.author.id)
+        if retry_after > 0:
             await ctx.send(
                 f"Stop sending confessionals so fast!\n"
-                f"*(Max {cooldown_max} per {cooldown_delta}; {hours}:{mins:02}:{secs:02} to go.)*"
+                f"*(Max {cooldown_max} per {cooldown_delta}; {ratelimit.format_wait(retry_after)} to go.)*"
             )
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
@@ -775,13 +1507,7 @@ class HostBot(commands.Cog):
             await ctx.send("Your confessional is too long! Please keep it below 1900 characters.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
-        gy_channel = session.query(hbs.Channel).filter_by(type="graveyard", server_id=ctx.guild.id).one_or_none()
-        confs_channel = (
-            session.query(hbs.Channel)
-                .filter_by(type="confessionals", server_id=ctx.guild.id)
-                .one_or_none()
-        )
-        confs_channel = ctx.guild.get_channel(confs_channel.id)  # type: discord.TextChannel
+        confs_channel = ctx.guild.get_channel(snapshot.channel_id("confessionals"))  # type: discord.TextChannel
         msg = msg.replace("@everyone", "@\u200beveryone").replace(
             "@here", "@\u200bhere"
         )  # \u200b aka zero-width space
@@ -795,24 +1521,24 @@ class HostBot(commands.Cog):
         """
         List all avatar URLs for all players and hosts.
         """
-        session = session_maker()
-        player_role_rows = session.query(hbs.Role).filter_by(type="player", server_id=ctx.guild.id).all()
-        host_role = session.query(hbs.Role).filter_by(type="host", server_id=ctx.guild.id).one_or_none()
-        gamechat_channel = session.query(hbs.Channel).filter_by(type="gamechat", server_id=ctx.guild.id).one_or_none()
-        if host_role is None or gamechat_channel is None or player_role_rows is None or len(player_role_rows) == 0:
+        snapshot = get_snapshot(ctx.guild.id)
+        if (
+            snapshot is None
+            or snapshot.role_id("host") is None
+            or snapshot.channel_id("gamechat") is None
+            or len(snapshot.roles.get("player", ())) == 0
+        ):
             await ctx.send("This server isn't set up for EiMM.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
 
-        if ctx.channel.id == gamechat_channel.id:
+        if ctx.channel.id == snapshot.channel_id("gamechat"):
             await ctx.send("Don't spam up gamechat with this, thanks.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
 
-        player_roles = []  # type: List[discord.Role]
-        for row in player_role_rows:
-            player_roles.append(ctx.guild.get_role(row.id))
-        host_role = ctx.guild.get_role(host_role.id)  # type: discord.Role
+        player_roles = [ctx.guild.get_role(role_id) for role_id in snapshot.roles["player"]]  # type: List[discord.Role]
+        host_role = ctx.guild.get_role(snapshot.role_id("host"))  # type: discord.Role
         replies = []
         reply = "**Host avatars:**```\n"
         for host in sorted(host_role.members, key=lambda x: x.name.lower()):  # type: discord.Member
@@ -864,11 +1590,62 @@ class HostBot(commands.Cog):
         await ctx.message.add_reaction(ctx.bot.greentick)
 
     @staticmethod
-    def is_rolepm(ctx: commands.Context, server: hbs.Server) -> bool:
-        if ctx.channel.category.id == server.rolepms_id:
-            # this maintains support for legacy servers
-            return True
-        return ctx.channel.category.id in [c.id for c in server.channels if c.type == "rolepms"]
+    def is_rolepm(ctx: commands.Context, snapshot: ServerSnapshot) -> bool:
+        return ctx.channel.category is not None and ctx.channel.category.id in snapshot.rolepm_ids
+
+    @staticmethod
+    def _spec_changes(
+        channel: discord.TextChannel, targets: List[Union[discord.Member, discord.Role]], read: bool
+    ) -> List[Tuple[Union[discord.Member, discord.Role], discord.PermissionOverwrite]]:
+        """
+        The overwrites that would allow (or deny) <targets> reading <channel>, each built from the target's current
+        overwrite so the rest of it is kept. Targets that are already right are left out.
+
+        Apply these one target at a time, not batched into one channel.edit(overwrites=...), which would delete the
+        overwrites of uncached members and lock players out of their own Role PMs (see overwrites_by_id).
+        """
+        current = overwrites_by_id(channel)
+        changes = []
+        for target in targets:
+            _, overwrite = current.get(target.id, (None, discord.PermissionOverwrite()))
+            if overwrite.read_messages is not read:
+                overwrite.read_messages = read
+                changes.append((target, overwrite))
+        return changes
+
+    @staticmethod
+    async def _apply_spec_changes(
+        channel: discord.TextChannel,
+        changes: List[Tuple[Union[discord.Member, discord.Role], discord.PermissionOverwrite]],
+    ):
+        for target, overwrite in changes:
+            await channel.set_permissions(target, overwrite=overwrite)
+
+    def _record_specs(
+        self,
+        ctx: commands.Context,
+        kind: str,
+        channels: List[discord.TextChannel],
+        targets: List[Union[discord.Member, discord.Role]],
+    ):
+        self.events.record(
+            ctx.guild.id,
+            kind,
+            ctx.author.id,
+            channels=[channel.id for channel in channels],
+            targets=[target.id for target in targets],
+        )
+
+    @staticmethod
+    async def _rolepm_channels(ctx: commands.Context, snapshot: ServerSnapshot) -> List[discord.TextChannel]:
+        channels = []  # type: List[discord.TextChannel]
+        for category_id in sorted(snapshot.rolepm_ids):
+            category = ctx.guild.get_channel(category_id)  # type: Optional[discord.CategoryChannel]
+            if category is None:
+                await ctx.send("Could not find Role PMs category.")
+                continue
+            channels.extend(category.text_channels)
+        return channels
 
     @commands.group(invoke_without_command=True)
     async def addspec(self, ctx: commands.Context, specs: commands.Greedy[discord.Member]):
@@ -877,18 +1654,16 @@ class HostBot(commands.Cog):
 
         Usable by players and hosts, and only from your Role PM channel.
         """
-        session = session_maker()
-
-        server = session.query(hbs.Server).filter_by(id=ctx.guild.id).one_or_none()
-        if not server:
+        snapshot = get_snapshot(ctx.guild.id)
+        if not snapshot:
             await ctx.send("This server isn't a game server.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
-        elif server.addspec_on is False:
+        elif snapshot.addspec_on is False:
             await ctx.send("Adding specs to channels isn't enabled on this server.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
-        if not self.is_rolepm(ctx, server):
+        if not self.is_rolepm(ctx, snapshot):
             await ctx.send("This isn't a Role PM channel.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
@@ -899,23 +1674,23 @@ class HostBot(commands.Cog):
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
 
-        spec_role_id = session.query(hbs.Role).filter_by(server_id=ctx.guild.id, type="spec").one_or_none()
-        spec_role = ctx.guild.get_role(spec_role_id.id)
+        spec_role = ctx.guild.get_role(snapshot.role_id("spec"))
 
-        badspecs = []
-        for spec in specs:
-            if spec_role not in spec.roles:
-                badspecs.append(spec)
-                await ctx.message.add_reaction(ctx.bot.redtick)
-                continue
+        badspecs = [spec for spec in specs if spec_role not in spec.roles]
+        goodspecs = [spec for spec in specs if spec_role in spec.roles]
 
-            # now we can do the actual function:
-            await ctx.channel.set_permissions(spec, read_messages=True)
-            await ctx.message.add_reaction(ctx.bot.greentick)
+        # now we can do the actual function, skipping specs who can already see it:
+        changes = self._spec_changes(ctx.channel, goodspecs, True)
+        if changes:
+            await self._apply_spec_changes(ctx.channel, changes)
+            self._record_specs(ctx, "spec_add", [ctx.channel], goodspecs)
 
         if badspecs:
             badspec_msg = ", ".join([str(spec) for spec in badspecs])
             await ctx.send(f"Failed to add {badspec_msg}: only spectators can be added to a role PM!")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+        if goodspecs:
+            await ctx.message.add_reaction(ctx.bot.greentick)
 
     @addspec.command(name="all")
     async def addspec_all(self, ctx: commands.Context):
@@ -924,18 +1699,16 @@ class HostBot(commands.Cog):
 
         Usable by players and hosts, and only from your Role PM channel. @mention a user, or provide their full Discord username or server nick exactly (case-sensitive). If it's multiple words, "use quotes".
         """
-        session = session_maker()
-
-        server = session.query(hbs.Server).filter_by(id=ctx.guild.id).one_or_none()
-        if not server:
+        snapshot = get_snapshot(ctx.guild.id)
+        if not snapshot:
             await ctx.send("This server isn't a game server.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
-        elif server.addspec_on is False:
+        elif snapshot.addspec_on is False:
             await ctx.send("Adding specs to channels isn't enabled on this server.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
-        if not self.is_rolepm(ctx, server):
+        if not self.is_rolepm(ctx, snapshot):
             await ctx.send("This isn't a Role PM channel.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
@@ -946,12 +1719,13 @@ class HostBot(commands.Cog):
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
 
-        spec_role_id = session.query(hbs.Role).filter_by(server_id=ctx.guild.id, type="spec").one_or_none()
-        spec_role = ctx.guild.get_role(spec_role_id.id)
+        spec_role = ctx.guild.get_role(snapshot.role_id("spec"))
 
         # now we can do the actual function:
-        # await ctx.channel.edit(overwrites={spec_role: discord.PermissionOverwrite(read_messages=True)})
-        await ctx.channel.set_permissions(spec_role, read_messages=True)
+        changes = self._spec_changes(ctx.channel, [spec_role], True)
+        if changes:
+            await self._apply_spec_changes(ctx.channel, changes)
+            self._record_specs(ctx, "spec_add", [ctx.channel], [spec_role])
         await ctx.message.add_reaction(ctx.bot.greentick)
 
     @addspec.command(name="rm")
@@ -961,18 +1735,16 @@ class HostBot(commands.Cog):
 
         Usable by players and hosts, and only from your Role PM channel.
         """
-        session = session_maker()
-
-        server = session.query(hbs.Server).filter_by(id=ctx.guild.id).one_or_none()
-        if not server:
+        snapshot = get_snapshot(ctx.guild.id)
+        if not snapshot:
             await ctx.send("This server isn't a game server.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
-        elif server.addspec_on is False:
+        elif snapshot.addspec_on is False:
             await ctx.send("Adding specs to channels isn't enabled on this server.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
-        if not self.is_rolepm(ctx, server):
+        if not self.is_rolepm(ctx, snapshot):
             await ctx.send("This isn't a Role PM channel.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
@@ -983,17 +1755,86 @@ class HostBot(commands.Cog):
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
 
-        spec_role_id = session.query(hbs.Role).filter_by(server_id=ctx.guild.id, type="spec").one_or_none()
-        spec_role = ctx.guild.get_role(spec_role_id.id)
+        spec_role = ctx.guild.get_role(snapshot.role_id("spec"))
 
-        for spec in specs:
-            if spec_role not in spec.roles:
-                await ctx.message.add_reaction(ctx.bot.redtick)
-                continue
-            # now we can do the actual function:
-            await ctx.channel.set_permissions(spec, read_messages=False)
+        if any(spec_role not in spec.roles for spec in specs):
+            await ctx.message.add_reaction(ctx.bot.redtick)
+        # now we can do the actual function:
+        goodspecs = [spec for spec in specs if spec_role in spec.roles]
+        changes = self._spec_changes(ctx.channel, goodspecs, False)
+        if changes:
+            await self._apply_spec_changes(ctx.channel, changes)
+            self._record_specs(ctx, "spec_rm", [ctx.channel], goodspecs)
         await ctx.message.add_reaction(ctx.bot.greentick)
 
+    async def _spec_all_pms(self, ctx: commands.Context, specs: List[discord.Member], read: bool):
+        snapshot = get_snapshot(ctx.guild.id)
+        if not snapshot:
+            await ctx.send("This server isn't a game server.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+        if not has_role(ctx, ["host"]):
+            await ctx.send("Only hosts can add or remove spectators across every Role PM.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+
+        spec_role = ctx.guild.get_role(snapshot.role_id("spec"))
+        badspecs = [spec for spec in specs if spec_role not in spec.roles]
+        targets = [spec for spec in specs if spec_role in spec.roles] if specs else [spec_role]
+        if specs and not targets:
+            await ctx.send("Only spectators can be added to or removed from Role PMs.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+
+        # Per-target permission edits, in turn within a channel, skipping channels that are already right. Edits to
+        # different channels are on separate rate limit buckets, so the channels genuinely run in parallel.
+        edits = []  # type: List[Tuple[discord.TextChannel, List]]
+        for channel in await self._rolepm_channels(ctx, snapshot):
+            changes = self._spec_changes(channel, targets, read)
+            if changes:
+                edits.append((channel, changes))
+
+        progress = await bulk.ProgressMessage.start(ctx, "Updating Role PMs", len(edits), embed=True)
+        result = await bulk.run_bulk(
+            edits,
+            lambda edit: self._apply_spec_changes(*edit),
+            limit=ctx.bot.conf.bulk_concurrency,
+            progress=progress,
+        )
+
+        if result.succeeded:
+            self._record_specs(ctx, "spec_add" if read else "spec_rm", [edit[0] for edit in result.succeeded], targets)
+
+        em = discord.Embed(title="Added spectators" if read else "Removed spectators")
+        em.add_field(name="Spectators", value=", ".join(str(target) for target in targets))
+        em.add_field(name="Role PMs updated", value=str(len(result.succeeded)))
+        if result.failed:
+            em.add_field(
+                name="Failed", value=result.failure_summary(lambda edit: edit[0].name)[:1024], inline=False
+            )
+        if badspecs:
+            em.add_field(name="Skipped (not spectators)", value=", ".join(str(spec) for spec in badspecs)[:1024])
+        await ctx.send(embed=em)
+        await ctx.message.add_reaction(ctx.bot.redtick if result.failed else ctx.bot.greentick)
+
+    @addspec.command(name="allpms")
+    async def addspec_allpms(self, ctx: commands.Context, specs: commands.Greedy[discord.Member]):
+        """
+        Add spectators to every Role PM at once. With no one mentioned, adds the whole spectator role.
+
+        Usable by hosts only, from any channel.
+        """
+        await self._spec_all_pms(ctx, specs, True)
+
+    @addspec.command(name="rmpms")
+    async def addspec_rmpms(self, ctx: commands.Context, specs: commands.Greedy[discord.Member]):
+        """
+        Remove spectators from every Role PM at once. With no one mentioned, removes the whole spectator role.
+
+        Usable by hosts only, from any channel.
+        """
+        await self._spec_all_pms(ctx, specs, False)
+
     @addspec.command(name="off")
     async def addspec_off(self, ctx: commands.Context):
         """
@@ -1009,8 +1850,7 @@ class HostBot(commands.Cog):
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
 
-        host_role_id = session.query(hbs.Role).filter_by(server_id=ctx.guild.id, type="host").one_or_none()
-        host_role = ctx.guild.get_role(host_role_id.id)
+        host_role = ctx.guild.get_role(get_snapshot(ctx.guild.id).role_id("host"))
         if host_role not in ctx.author.roles and ctx.author != ctx.guild.owner:
             await ctx.send("Only hosts can toggle this setting.")
             await ctx.message.add_reaction(ctx.bot.redtick)
@@ -1018,6 +1858,7 @@ class HostBot(commands.Cog):
 
         server.addspec_on = False
         session.commit()
+        invalidate_snapshot(ctx.guild.id)
 
         await ctx.message.add_reaction(ctx.bot.greentick)
 
@@ -1036,8 +1877,7 @@ class HostBot(commands.Cog):
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
 
-        host_role_id = session.query(hbs.Role).filter_by(server_id=ctx.guild.id, type="host").one_or_none()
-        host_role = ctx.guild.get_role(host_role_id.id)
+        host_role = ctx.guild.get_role(get_snapshot(ctx.guild.id).role_id("host"))
         if host_role not in ctx.author.roles and ctx.author != ctx.guild.owner:
             await ctx.send("Only hosts can toggle this setting.")
             await ctx.message.add_reaction(ctx.bot.redtick)
@@ -1045,19 +1885,18 @@ class HostBot(commands.Cog):
 
         server.addspec_on = True
         session.commit()
+        invalidate_snapshot(ctx.guild.id)
 
         await ctx.message.add_reaction(ctx.bot.greentick)
 
     async def _lockunlock(self, ctx: commands.Context, lock=True):
-        session = session_maker()
+        snapshot = get_snapshot(ctx.guild.id)
 
-        server = session.query(hbs.Server).filter_by(id=ctx.guild.id).one_or_none()
-
-        if not server:
+        if not snapshot:
             await ctx.send("This server isn't a game server.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
-        if not self.is_rolepm(ctx, server):
+        if not self.is_rolepm(ctx, snapshot):
             await ctx.send("This isn't a Role PM channel.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
@@ -1065,46 +1904,61 @@ class HostBot(commands.Cog):
             await ctx.send("Only players and hosts can lock/unlock Role PMs.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
-        if not has_role(ctx, ["host"]) and not server.players_can_lock and lock is True:
+        if not has_role(ctx, ["host"]) and not snapshot.players_can_lock and lock is True:
             await ctx.send("Locking is currently disabled for players; only hosts can lock role PMs.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
 
-        if lock and ctx.channel.name[0] != LOCK_EMOJI:
-            await ctx.channel.edit(name=f"{LOCK_EMOJI}{ctx.channel.name}")
-            await ctx.message.add_reaction(ctx.bot.greentick)
-        elif lock:
-            await ctx.send("You're already locked.")
+        try:
+            changed = await self.locks.set_locked(ctx.channel, lock, snapshot.role_id("player"), ctx.author.id)
+        except discord.Forbidden:
+            await ctx.send("Insufficient permissions to lock/unlock this channel.")
             await ctx.message.add_reaction(ctx.bot.redtick)
-        elif not lock and ctx.channel.name[0] == LOCK_EMOJI:
-            await ctx.channel.edit(name=ctx.channel.name[1:])
-            await ctx.message.add_reaction(ctx.bot.greentick)
-        else:
-            await ctx.send("You need to be locked to unlock.")
+            return
+        if not changed:
+            await ctx.send("You're already locked." if lock else "You need to be locked to unlock.")
             await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+        due = self.locks.rename_due(ctx.channel.id)
+        if due is not None:
+            minutes = math.ceil((due - datetime.utcnow()).total_seconds() / 60)
+            await ctx.send(f"Done; Discord limits channel renames, so the name will catch up in ~{minutes} min.")
+        await ctx.message.add_reaction(ctx.bot.greentick)
 
-    @staticmethod
-    async def _unlock_all(ctx: commands.Context):
-        session = session_maker()
-        server = session.query(hbs.Server).filter_by(id=ctx.guild.id).one_or_none()
-        rolepms = session.query(hbs.Channel).filter_by(server_id=ctx.guild.id, type="rolepms").all()
-        # the union maintains legacy support
-        rolepm_ids = {category.id for category in rolepms}.union({server.rolepms_id})
-
-        role_pms: List[discord.CategoryChannel] = sorted(
-            [ctx.guild.get_channel(cid) for cid in rolepm_ids], key=lambda x: str(x),
+    async def _unlock_all(self, ctx: commands.Context):
+        snapshot = get_snapshot(ctx.guild.id)
+        channels = await self._rolepm_channels(ctx, snapshot)
+
+        progress = await bulk.ProgressMessage.start(ctx, "Unlocking Role PMs", len(channels))
+        result = await self.locks.unlock_all(
+            channels,
+            snapshot.role_id("player"),
+            ctx.bot.conf.bulk_concurrency,
+            progress=progress,
+            actor_id=ctx.author.id,
         )
+        if result.failed:
+            if any(isinstance(failure.error, discord.Forbidden) for failure in result.failed):
+                await ctx.send("Insufficient permissions to unlock some Role PMs.")
+            await ctx.send(f"Failed to unlock:```\n{result.failure_summary(lambda channel: channel.name)}```")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+        await ctx.message.add_reaction(ctx.bot.greentick)
 
-        try:
-            for category in role_pms:
-                if category is not None:
-                    for channel in category.channels:
-                        if channel.name[0] == LOCK_EMOJI:
-                            await channel.edit(name=channel.name[1:])
-                else:
-                    await ctx.send("Could not find Role PMs category.")
-        except discord.Forbidden:
-            await ctx.send("Insufficient permissions to delete Role PMs.")
+    async def _set_lock_mode(self, ctx: commands.Context, use_overwrites: bool):
+        if not has_role(ctx, ["host"]):
+            await ctx.send("Only hosts may change how Role PMs are locked.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+        session = session_maker()
+        settings = session.query(hbs.LockSettings).get(ctx.guild.id)  # type: Optional[hbs.LockSettings]
+        if settings is None:
+            settings = hbs.LockSettings(server_id=ctx.guild.id)
+            session.add(settings)
+        settings.use_overwrites = use_overwrites
+        session.commit()
+        session.close()
+        await ctx.message.add_reaction(ctx.bot.greentick)
 
     @staticmethod
     async def _enable_locking(ctx: commands.Context):
@@ -1116,6 +1970,7 @@ class HostBot(commands.Cog):
         server = session.query(hbs.Server).filter_by(id=ctx.guild.id).one_or_none()
         server.players_can_lock = True
         session.commit()
+        invalidate_snapshot(ctx.guild.id)
         await ctx.message.add_reaction(ctx.bot.greentick)
 
     @commands.command()
@@ -1127,6 +1982,10 @@ class HostBot(commands.Cog):
             # but I really don't want use a command group and lose "##lock".
             await self._enable_locking(ctx)
             return
+        if str_that_might_be_on.lower() in {"perms", "names"}:
+            # "lock perms" locks by taking away players' send_messages, "lock names" (the default) by renaming.
+            await self._set_lock_mode(ctx, str_that_might_be_on.lower() == "perms")
+            return
         await self._lockunlock(ctx, True)
 
     @commands.command()
@@ -1144,6 +2003,193 @@ class HostBot(commands.Cog):
 
         await self._unlock_all(ctx)
 
+    def _phase_id(self, guild_id: int) -> Optional[int]:
+        phase = self.events.state(guild_id).phase
+        return phase[0] if phase is not None else None
+
+    @commands.Cog.listener("on_message")
+    async def count_activity(self, message: discord.Message):
+        if message.guild is None or message.author.bot:
+            return
+        phase_id = self._phase_id(message.guild.id)
+        if phase_id is None:
+            return
+        snapshot = get_snapshot(message.guild.id)
+        if snapshot is None or message.channel.id != snapshot.channel_id("gamechat"):
+            return
+        player_role_ids = snapshot.roles.get("player", ())
+        if not any(role.id in player_role_ids for role in getattr(message.author, "roles", ())):
+            return
+
+        counts = self._activity.setdefault((phase_id, message.author.id), [0, 0, None])
+        counts[0] += 1
+        counts[1] += len(message.content)
+        counts[2] = message.created_at
+
+    def _flush_activity(self):
+        if not self._activity:
+            return
+        rows = [
+            {
+                "phase_id": phase_id,
+                "player_id": player_id,
+                "messages": messages,
+                "characters": characters,
+                "last_message_at": last_message_at,
+            }
+            for (phase_id, player_id), (messages, characters, last_message_at) in self._activity.items()
+        ]
+        session = session_maker()
+        try:
+            for i in range(0, len(rows), 50):  # stay well under SQLite's bound parameter limit
+                stmt = sqlite_insert(hbs.Activity).values(rows[i : i + 50])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["phase_id", "player_id"],
+                    set_={
+                        "messages": hbs.Activity.messages + stmt.excluded.messages,
+                        "characters": hbs.Activity.characters + stmt.excluded.characters,
+                        "last_message_at": stmt.excluded.last_message_at,
+                    },
+                )
+                session.execute(stmt)
+            session.commit()
+        except Exception:
+            # Keep the buffer for the next flush to retry, rather than losing it.
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        # Only emptied once it's committed. Nothing awaits in here, so nothing can have been counted since.
+        self._activity = {}
+
+    @tasks.loop(seconds=ACTIVITY_FLUSH_SECONDS)
+    async def flush_activity(self):
+        # An exception escaping would stop the loop for good.
+        try:
+            self._flush_activity()
+        except Exception:
+            logging.exception("failed to write out gamechat activity; retrying next flush")
+
+    @commands.group(invoke_without_command=True)
+    @commands.guild_only()
+    async def activity(self, ctx: commands.Context, *, phase_name: str = None):
+        """
+        Show each player's gamechat activity for a phase (default: the current one).
+
+        Only messages sent by players, in gamechat, after "activity phase" has been used are counted.
+        Usable by hosts only.
+        """
+        snapshot = get_snapshot(ctx.guild.id)
+        if snapshot is None:
+            await ctx.send("This server isn't a game server.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+        if not has_role(ctx, ["host"]):
+            await ctx.send("Only hosts can check activity.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+
+        # Make sure the counts include everything up to now.
+        self._flush_activity()
+
+        session = session_maker()
+        phases = session.query(hbs.Phase).filter_by(server_id=ctx.guild.id).order_by(hbs.Phase.id.desc())
+        if phase_name is None:
+            phase = phases.first()  # type: Optional[hbs.Phase]
+        else:
+            phase = phases.filter(hbs.Phase.name == phase_name).first()
+        if phase is None:
+            if phase_name is None:
+                prefix = ctx.bot.default_command_prefix
+                await ctx.send(f"No phases yet; start one with `{prefix}activity phase <name>`.")
+            else:
+                names = ", ".join(f"`{phase.name}`" for phase in phases)
+                await ctx.send(f"There's no phase called `{phase_name}`. Phases: {names or 'none'}")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            session.close()
+            return
+
+        rows = session.query(hbs.Activity).filter_by(phase_id=phase.id).all()  # type: List[hbs.Activity]
+        counts = {row.player_id: (row.messages, row.characters) for row in rows}
+        session.close()
+        # Players who haven't said anything are the ones hosts are looking for, so list them too.
+        for role_id in snapshot.roles.get("player", ()):
+            role = ctx.guild.get_role(role_id)
+            if role is not None:
+                for member in role.members:
+                    counts.setdefault(member.id, (0, 0))
+
+        lines = []
+        for player_id, (messages, characters) in sorted(counts.items(), key=lambda item: item[1]):
+            member = ctx.guild.get_member(player_id)
+            name = str(member) if member is not None else f"<@{player_id}>"
+            lines.append(f"`{messages:>5} msgs {characters:>7,} chars` {name}")
+
+        em = discord.Embed(title=f"Activity: {phase.name}", description="\n".join(lines)[:4096] or "Nobody yet.")
+        em.set_footer(text=f"Since {phase.started_at:%Y-%m-%d %H:%M} UTC")
+        await ctx.send(embed=em)
+
+    @activity.command(name="phase")
+    @commands.guild_only()
+    async def activity_phase(self, ctx: commands.Context, *, name: str):
+        """
+        Start a new phase, e.g. "Day 2". Activity from here on counts toward it.
+
+        Usable by hosts only.
+        """
+        if get_snapshot(ctx.guild.id) is None:
+            await ctx.send("This server isn't a game server.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+        if not has_role(ctx, ["host"]):
+            await ctx.send("Only hosts can start phases.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+
+        # Anything buffered belongs to the phase that's ending.
+        self._flush_activity()
+        session = session_maker()
+        phase = hbs.Phase(server_id=ctx.guild.id, name=name, started_at=datetime.utcnow())
+        session.add(phase)
+        session.commit()
+        self.events.record(ctx.guild.id, "phase", ctx.author.id, id=phase.id, name=name)
+        session.close()
+        await ctx.message.add_reaction(ctx.bot.greentick)
+
+    @commands.command()
+    @commands.guild_only()
+    async def journal(self, ctx: commands.Context, limit: int = 20):
+        """
+        Show the most recent hostbot actions on this server (locks, renames, spectators, phases...).
+
+        Usable by hosts only.
+        """
+        if not has_role(ctx, ["host"]) and not ctx.author.guild_permissions.administrator:
+            await ctx.send("Only hosts can read the journal.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+
+        def describe(value: Any) -> str:
+            if isinstance(value, list):
+                return ", ".join(describe(item) for item in value)
+            if isinstance(value, int) and not isinstance(value, bool):
+                target = ctx.guild.get_channel(value) or ctx.guild.get_role(value) or ctx.guild.get_member(value)
+                return str(target) if target is not None else str(value)
+            return str(value)
+
+        lines = []
+        for event in self.events.recent(ctx.guild.id, min(limit, 50)):
+            details = " ".join(f"{key}={describe(value)}" for key, value in json.loads(event.data).items())
+            actor = ctx.guild.get_member(event.actor_id) if event.actor_id is not None else None
+            line = f"`{datetime.utcfromtimestamp(event.at):%m-%d %H:%M}` **{event.kind}** {details}"
+            if actor is not None:
+                line += f" *({actor})*"
+            lines.append(line)
+
+        em = discord.Embed(title="Journal", description="\n".join(lines)[-4096:] or "Nothing yet.")
+        em.set_footer(text="Times in UTC")
+        await ctx.send(embed=em)
+
     # TODO on this... need to:
     #  (a) do db updates
     #  (b) ensure the emoji is valid
@@ -1,5 +1,5 @@
 from sqlalchemy import ForeignKey
-from sqlalchemy import Boolean, Column, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, Integer, String
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from typing import Iterable
@@ -18,6 +18,7 @@ class Server(Base):
     lock_emoji = Column(String)
     roles = relationship('Role', back_populates='server')  # type: Iterable[Role]
     channels = relationship('Channel', back_populates='server')  # type: Iterable[Channel]
+    role_pms = relationship('RolePM', back_populates='server')  # type: Iterable[RolePM]
 
     # rolepms = relationship('RolePMs', back_populates='server', uselist=False)
 
@@ -54,6 +55,148 @@ class Channel(Base):
             f'server_id={self.server_id}>'
         )
 
+class RolePM(Base):
+    """
+    A player's Role PM channel, recorded as soon as it's created so an interrupted "init pmlist" can pick up where it
+    left off.
+    """
+    __tablename__ = 'RolePM'
+    id = Column(Integer, primary_key=True)  # channel id
+    server_id = Column(Integer, ForeignKey('Server.id'))
+    category_id = Column(Integer)
+    player_name = Column(String)  # as given to "init pmlist"
+    player_id = Column(Integer)  # None if they couldn't be found on the server
+    server = relationship('Server', back_populates='role_pms')
+
+    def __repr__(self):
+        return (
+            f'<RolePM id={self.id}, '
+            f'server_id={self.server_id}, '
+            f'category_id={self.category_id}, '
+            f'player_name={self.player_name}>'
+        )
+
+
+class ResetTask(Base):
+    """
+    A channel or role still to be deleted by "init reset". Rows are removed as each deletion goes through, so a reset
+    that gets interrupted can be finished by running it again.
+    """
+    __tablename__ = 'ResetTask'
+    id = Column(Integer, primary_key=True)  # channel or role id
+    server_id = Column(Integer)  # not a foreign key, so these never get in the way of deleting the Server row
+    kind = Column(String)  # "channel", "category" or "role"
+    label = Column(String)  # for reporting
+
+    def __repr__(self):
+        return (
+            f'<ResetTask id={self.id}, '
+            f'server_id={self.server_id}, '
+            f'kind={self.kind}, '
+            f'label={self.label}>'
+        )
+
+
+class LockSettings(Base):
+    __tablename__ = 'LockSettings'
+    server_id = Column(Integer, ForeignKey('Server.id'), primary_key=True)
+    use_overwrites = Column(Boolean)  # lock Role PMs with permission overwrites instead of renaming them
+
+    def __repr__(self):
+        return f'<LockSettings server_id={self.server_id}, use_overwrites={self.use_overwrites}>'
+
+
+class Phase(Base):
+    """
+    A game phase (e.g. "Day 1"), as started by "activity phase". Activity counts toward the latest one.
+    """
+    __tablename__ = 'Phase'
+    id = Column(Integer, primary_key=True)
+    server_id = Column(Integer, ForeignKey('Server.id'), index=True)
+    name = Column(String)
+    started_at = Column(DateTime)  # use utc timezone internally
+
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    def __repr__(self):
+        return f'<Phase id={self.id}, server_id={self.server_id}, name={self.name}, started_at={self.started_at}>'
+
+
+class Activity(Base):
+    """
+    A player's gamechat activity for one phase. Kept as running totals, so reporting never has to count messages.
+    """
+    __tablename__ = 'Activity'
+    phase_id = Column(Integer, ForeignKey('Phase.id'), primary_key=True)
+    player_id = Column(Integer, primary_key=True)
+    messages = Column(Integer)
+    characters = Column(Integer)
+    last_message_at = Column(DateTime)  # use utc timezone internally
+
+    def __repr__(self):
+        return (
+            f'<Activity phase_id={self.phase_id}, '
+            f'player_id={self.player_id}, '
+            f'messages={self.messages}, '
+            f'characters={self.characters}>'
+        )
+
+
+class ArchiveCheckpoint(Base):
+    """
+    How far "archive" has got through a channel, so an interrupted archive picks up where it left off.
+    """
+    __tablename__ = 'ArchiveCheckpoint'
+    channel_id = Column(Integer, primary_key=True)
+    server_id = Column(Integer, index=True)  # not a foreign key, so archives outlive "init reset"
+    last_message_id = Column(Integer)  # None until the first batch is written
+    messages = Column(Integer)
+    size = Column(Integer)  # bytes of the channel's archive file as of last_message_id
+    done = Column(Boolean)
+
+    def __repr__(self):
+        return (
+            f'<ArchiveCheckpoint channel_id={self.channel_id}, '
+            f'server_id={self.server_id}, '
+            f'last_message_id={self.last_message_id}, '
+            f'messages={self.messages}, '
+            f'done={self.done}>'
+        )
+
+
+class JournalEvent(Base):
+    """
+    One hostbot action, in an append-only log. Replaying a server's events over its latest JournalSnapshot rebuilds
+    its in-memory game state; they're also the record of what happened, for after something goes wrong.
+    """
+    __tablename__ = 'JournalEvent'
+    id = Column(Integer, primary_key=True)
+    server_id = Column(Integer)  # not a foreign key, so the journal outlives "init reset"
+    kind = Column(String)  # see GameState.apply()
+    data = Column(String)  # JSON
+    actor_id = Column(Integer)  # whoever caused it, if anyone
+    at = Column(Float)  # unix time
+
+    __table_args__ = (Index('ix_JournalEvent_server_id', 'server_id', 'id'), {'sqlite_autoincrement': True})
+
+    def __repr__(self):
+        return f'<JournalEvent id={self.id}, server_id={self.server_id}, kind={self.kind}, data={self.data}>'
+
+
+class JournalSnapshot(Base):
+    """
+    A server's game state as of one of its journal events, so startup only has to replay what came after.
+    """
+    __tablename__ = 'JournalSnapshot'
+    server_id = Column(Integer, primary_key=True)
+    last_event_id = Column(Integer)
+    state = Column(String)  # JSON, from GameState.to_json()
+    taken_at = Column(Float)  # unix time
+
+    def __repr__(self):
+        return f'<JournalSnapshot server_id={self.server_id}, last_event_id={self.last_event_id}>'
+
+
 # class RolePMs(Base):
 #     __tablename__ = 'RolePMs'
 #     # id = Column(Integer, primary_key=True)
@@ -1,26 +1,34 @@
 import asyncio
+import contextlib
+import html
+import io
+import json
 import logging
 import pprint
-from datetime import datetime
+import re
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union, Generator, Tuple
+from typing import Any, AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Union, Generator, Tuple
 
 import discord
 import gspread
-from discord.ext import commands
-from sqlalchemy import create_engine, event, desc
+from discord.ext import commands, tasks
+from sqlalchemy import create_engine, event, desc, func, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.engine import Engine
-from sqlalchemy.orm import sessionmaker
-from gspread.exceptions import SpreadsheetNotFound
+from sqlalchemy.orm import Session, sessionmaker
+from gspread.exceptions import SpreadsheetNotFound, WorksheetNotFound
 
 from cogs import interview_schema as schema
+from core import bulk, jobs, locks, ratelimit
 from core.bot import Bot
-from utils import spreadsheet, utils
+from utils import archive, minhash, spreadsheet, utils
 
 _DEBUG_FLAG = False  # Note: toggle to off when not testing
 
 DB_DIR = "databases"
 DB_FILE = f"{DB_DIR}/interviews.db"
+ARCHIVE_DIR = f"{DB_DIR}/interview_archive"
 
 
 # For some awful reason, SQLite doesn't turn on foreign key constraints by default.
@@ -46,6 +54,30 @@ SHEET_NAME = ""
 SERVER_LEFT_MSG = "[Member Left]"
 ERROR_MSG = "[Bad User]"
 
+SEARCH_LIMIT = 8  # results per search embed
+MAX_EXPORT_SIZE = 8 * 1024 * 1024  # discord's upload limit
+
+POSTED_COLUMN = "H"  # the "Posted?" column of an interview's sheet page, see Question.to_row()
+ASKER_ID_COLUMN = "D"  # asker ID and question number, which together identify a row, are in these two columns
+QUESTION_NUM_COLUMN = "E"
+VERIFY_HOURS = 6  # how often current interviews get a full background recount
+STATS_RECENT = 10  # past interviews listed in iv stats
+DUPES_LIMIT = 10  # groups of similar questions listed in iv dupes
+
+# Question outbox replication
+OUTBOX_RETRY_DELAY = 5.0  # seconds before the first retry; doubles each retry after that
+OUTBOX_MAX_DELAY = 600.0  # cap on the retry delay, in seconds
+OUTBOX_MAX_ATTEMPTS = 12  # attempts before a question is marked failed and left for "iv queue retry"
+
+DIGEST_WINDOW = 10.0  # seconds backstage notifications are held for, once questions start coming in quickly
+DIGEST_LENGTH = 2000  # max characters per digest embed description
+
+# Rate limits, per member per server
+ASK_BURST = 5  # ask/mask commands allowed in a burst...
+ASK_PER = 60.0  # ...refilling over this many seconds
+VOTE_LIMIT = 5  # vote commands allowed...
+VOTE_PER = 60.0  # ...in any this many seconds
+
 
 class Candidate:
     """
@@ -93,6 +125,7 @@ class Question:
         message_id: int,
         answer: str = None,
         timestamp: datetime = None,
+        row_num: int = None,
     ):
         self.interviewee = interviewee
         self.asker = asker
@@ -107,13 +140,15 @@ class Question:
             self.timestamp = datetime.utcnow()
         else:
             self.timestamp = timestamp
+        # Row on the sheet this question was read from, if any; used to flag it as posted.
+        self.row_num = row_num
 
     @property
     def jump_url(self) -> str:
         return f"https://discordapp.com/channels/{self.server_id}/{self.channel_id}/{self.message_id}"
 
     @staticmethod
-    async def from_row(ctx: commands.Context, row: Dict[str, Any]) -> "Question":
+    async def from_row(ctx: commands.Context, row: Dict[str, Any], row_num: int = None) -> "Question":
         """
         Translates a row from the Google sheet to an object.
         """
@@ -135,8 +170,26 @@ class Question:
             message_id=row["Message ID"],
             answer=str(row["Answer"]),
             timestamp=datetime.utcfromtimestamp(row["POSIX Timestamp"]),
+            row_num=row_num,
         )
 
+    def to_answered(self, interview_id: int) -> Dict[str, Any]:
+        """
+        Convert this (answered) Question to an AnsweredQuestion row for the search index.
+        """
+        return {
+            "interview_id": interview_id,
+            "row_num": self.row_num,
+            "asker_id": self.asker.id,
+            "asker_name": str(self.asker),
+            "question_num": self.question_num,
+            "question": self.question,
+            "answer": self.answer,
+            "channel_id": self.channel_id,
+            "message_id": self.message_id,
+            "timestamp": self.timestamp,
+        }
+
     def to_row(self, ctx: commands.Context) -> list:
         """
         Convert this Question to a row for uploading to Sheets.
@@ -163,19 +216,34 @@ class Question:
         ]
 
     @staticmethod
-    def upload_many(ctx: commands.Context, connection: spreadsheet.SheetConnection, questions: List["Question"]):
+    def queue_many(
+        ctx: commands.Context, session: Session, interview: schema.Interview, questions: List["Question"]
+    ) -> List[schema.QueuedQuestion]:
         """
-        Upload a list of Questions to a spreadsheet.
+        Add a list of Questions to the outbox, to be appended to the interview's sheet page in the background.
+        Doesn't commit.
 
-        This would normally be a normal method, but there's a separate command (append_rows vs append_row) for
-        bulk upload, and we need to use that to dodge Sheets API rate limits.
+        The outbox uploads everything queued for a page in one append_rows call, to dodge Sheets API rate limits.
         """
-        session = session_maker()
-        server = session.query(schema.Server).filter_by(id=ctx.guild.id).one_or_none()
-
-        rows = [q.to_row(ctx) for q in questions]
-        sheet = connection.get_sheet(server.sheet_name).sheet1
-        sheet.append_rows(rows)
+        now = datetime.utcnow()
+        queued = [
+            schema.QueuedQuestion(
+                server_id=ctx.guild.id,
+                interview_id=interview.id,
+                asker_id=q.asker.id,
+                question=q.question,
+                row=json.dumps(q.to_row(ctx)),
+                spreadsheet=interview.server.sheet_name,
+                page=interview.sheet_name,
+                status=schema.QUEUE_PENDING,
+                attempts=0,
+                created_at=now,
+                next_attempt=now,
+            )
+            for q in questions
+        ]
+        session.add_all(queued)
+        return queued
 
     @staticmethod
     def _generate_words(text: str) -> Generator[str, None, None]:
@@ -230,9 +298,181 @@ class InterviewEmbed(discord.Embed):
         )
         # +100 length as a buffer for the metadata fields
         em.length = len(f"**{interviewee}**'s interview" + " " + f"Asked by {asker}") + len(asker.avatar_url) + 100
+        # Questions rendered into this embed, so they can be flagged as posted once it's actually sent.
+        em.questions = []  # type: List[Question]
         return em
 
 
+class AnswerPipeline:
+    """
+    Posts answer embeds to a channel in order, while flagging their rows as posted on the sheet in the background.
+
+    Sends go out one at a time so they stay ordered; discord.py holds the channel's rate-limit bucket between them,
+    so there's no extra pacing to do here. Rows are only flagged once their embed (or too-long notice) has actually
+    been sent, so if posting dies partway through, the remaining rows are left unposted for the next `answer`. If
+    flagging dies instead, posting stops, since anything posted but not flagged would be posted again next time;
+    whatever did slip through is in unflagged.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, channel: discord.TextChannel, sheet: gspread.Worksheet = None):
+        self.loop = loop
+        self.channel = channel
+        self.sheet = sheet  # if None, nothing is flagged (i.e. previews)
+        self.posted = []  # type: List[Question]
+        self.flagged = []  # type: List[Question]  # posted, and flagged as posted on the sheet
+        self.n_sent = 0
+        self._flag_queue = asyncio.Queue()  # type: asyncio.Queue
+
+    async def run(self, items: Iterable[Union[InterviewEmbed, Question]]) -> List[Question]:
+        """
+        Post everything in <items>, returning the questions that made it to the channel.
+        """
+        flagger = self.loop.create_task(self._flag_rows()) if self.sheet is not None else None
+        try:
+            for item in items:
+                if flagger is not None and flagger.done():
+                    break  # flagging has died; awaiting it below raises why
+                await self._post(item)
+        except BaseException:
+            if flagger is not None:
+                # Still flag what was posted, but it's the error already in flight that gets raised.
+                self._flag_queue.put_nowait(None)
+                try:
+                    await flagger
+                except Exception:
+                    logging.exception("failed to flag posted answers on the sheet")
+            raise
+        if flagger is not None:
+            # Sentinel; lets the flagger finish whatever's left in the queue and exit.
+            self._flag_queue.put_nowait(None)
+            await flagger
+        logging.debug("done sending answers")
+        return self.posted
+
+    @property
+    def unflagged(self) -> List[Question]:
+        """
+        Questions that were posted, but aren't flagged as posted on the sheet.
+        """
+        if self.sheet is None:
+            return []
+        flagged_rows = {question.row_num for question in self.flagged}
+        return [question for question in self.posted if question.row_num not in flagged_rows]
+
+    async def _post(self, item: Union[InterviewEmbed, Question]):
+        if type(item) is Question:
+            # question was too long
+            await self.channel.send(
+                f"Question #{item.question_num} or its answer from {item.asker} was too long "
+                f"to embed, please split it up and answer it manually."
+            )
+            questions = [item]
+        else:
+            await self.channel.send(embed=item)
+            self.n_sent += 1
+            logging.debug(f"sent {self.n_sent} answer embeds")
+            questions = item.questions
+        self.posted.extend(questions)
+        if self.sheet is not None:
+            for question in questions:
+                self._flag_queue.put_nowait(question)
+
+    async def _flag_rows(self):
+        """
+        Drain the flag queue into as few Sheets calls as possible while posting carries on.
+        """
+        while True:
+            batch = [await self._flag_queue.get()]
+            while not self._flag_queue.empty():
+                batch.append(self._flag_queue.get_nowait())
+            questions = [q for q in batch if q is not None]
+            if questions:
+                cells = [{"range": f"{POSTED_COLUMN}{q.row_num}", "values": [[True]]} for q in questions]
+                await self.loop.run_in_executor(None, self.sheet.batch_update, cells)
+                self.flagged.extend(questions)
+                logging.debug(f"flagged {len(cells)} rows as posted")
+            if None in batch:
+                return
+
+
+class BackstageNotice(NamedTuple):
+    channel: discord.TextChannel
+    embed: discord.Embed  # sent as-is when the notice goes out on its own
+    title: str
+    lines: List[str]  # one per question, for digests
+
+
+class BackstageDigest:
+    """
+    Per-guild buffer for backstage "new question" notifications.
+
+    The first notice in a quiet spell is sent straight away and opens a window; anything else that comes in during
+    the window is held, then sent as one digest embed when it closes (or on its own, if it's the only one). Windows
+    keep reopening until one passes with nothing in it, so a rush costs a message every DIGEST_WINDOW seconds rather
+    than one per question.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, window: float = DIGEST_WINDOW):
+        self.loop = loop
+        self.window = window
+        self._held = {}  # type: Dict[int, List[BackstageNotice]]  # guild ID -> notices; only has open windows
+        self._drains = {}  # type: Dict[int, asyncio.Task]  # guild ID -> task sending its held notices
+
+    async def notify(self, notice: BackstageNotice):
+        guild_id = notice.channel.guild.id
+        if guild_id in self._held:
+            self._held[guild_id].append(notice)
+            return
+        self._held[guild_id] = []
+        self._drains[guild_id] = self.loop.create_task(self._drain(guild_id))
+        await notice.channel.send(embed=notice.embed)
+
+    def close(self):
+        for task in self._drains.values():
+            task.cancel()
+        # A drain cancelled before it ever ran doesn't get to clean up after itself.
+        self._held.clear()
+        self._drains.clear()
+
+    async def _drain(self, guild_id: int):
+        try:
+            while True:
+                await asyncio.sleep(self.window)
+                notices = self._held[guild_id]
+                if not notices:
+                    return
+                self._held[guild_id] = []
+                try:
+                    await self._send(notices)
+                except Exception:
+                    logging.exception(f"failed to send backstage digest for guild {guild_id}")
+        finally:
+            # However this ends, the window has to close with it, or every later notice would be held for a drain
+            # that's no longer running.
+            self._held.pop(guild_id, None)
+            self._drains.pop(guild_id, None)
+
+    @staticmethod
+    async def _send(notices: List[BackstageNotice]):
+        # Go by the latest notice, in case the backstage channel was changed mid-window.
+        channel = notices[-1].channel
+        if len(notices) == 1:
+            await channel.send(embed=notices[0].embed)
+            return
+
+        lines = [line for notice in notices for line in notice.lines]
+        descriptions = [""]
+        for line in lines:
+            if len(descriptions[-1]) + len(line) + 1 > DIGEST_LENGTH:
+                descriptions.append("")
+            descriptions[-1] += line + "\n"
+        for i, description in enumerate(descriptions):
+            em = discord.Embed(title=notices[-1].title, description=description, color=notices[-1].embed.color)
+            if i == 0:
+                em.set_author(name=f"{len(lines)} new questions")
+            await channel.send(embed=em)
+
+
 def _name_or_default(user: discord.User) -> str:
     if user is not None:
         return str(user)
@@ -337,6 +577,174 @@ def add_question(em: discord.Embed, question: Question, current_length: int) ->
     return text_length
 
 
+def _index_answers(session: Session, rows: List[Dict[str, Any]]):
+    """
+    Upsert AnsweredQuestion rows (and so the search index, via its triggers). Doesn't commit.
+
+    Keyed on (interview_id, row_num), so reposting or reimporting a row just updates it.
+    """
+    for i in range(0, len(rows), 50):  # stay well under SQLite's bound parameter limit
+        stmt = sqlite_insert(schema.AnsweredQuestion).values(rows[i : i + 50])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["interview_id", "row_num"],
+            set_={
+                key: stmt.excluded[key]
+                for key in ("asker_id", "asker_name", "question_num", "question", "answer", "channel_id", "message_id")
+            },
+        )
+        session.execute(stmt)
+
+
+def _row_from_values(row_num: int, row: List[str]) -> Dict[str, Any]:
+    """
+    Normalize a raw sheet row (as from get_all_values). Column order is the same as Question.to_row().
+    """
+    row = row + [""] * (11 - len(row))
+    try:
+        timestamp = datetime.utcfromtimestamp(float(row[1]))
+    except ValueError:
+        timestamp = None
+    return {
+        "row_num": row_num,
+        "asker_id": int(row[3]) if row[3].isdigit() else None,
+        "asker_name": row[2],
+        "question_num": int(row[4]) if row[4].isdigit() else None,
+        "question": row[5],
+        "answer": row[6],
+        "posted": row[7] == "TRUE",
+        "channel_id": int(row[9]) if row[9].isdigit() else None,
+        "message_id": int(row[10]) if row[10].isdigit() else None,
+        "timestamp": timestamp,
+    }
+
+
+def _answered_from_values(interview_id: int, row_num: int, row: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Convert a raw sheet row to an AnsweredQuestion row, if it's been answered and posted.
+    """
+    answered = _row_from_values(row_num, row)
+    if answered["answer"] == "" or not answered.pop("posted"):
+        return None
+    answered["interview_id"] = interview_id
+    return answered
+
+
+def _archive_interview(server_id: int, interview_id: int, values: List[List[str]]) -> schema.ArchivedInterview:
+    """
+    Snapshot an interview's sheet page (as from get_all_values) to cold storage. Blocking, so run it in an executor,
+    then merge the returned row into a session to index it.
+    """
+    path = Path(ARCHIVE_DIR) / f"{server_id}" / f"{interview_id}.jsonl.zst"
+    # +1 to skip the heading row, +1 for 1-indexing
+    rows = [_row_from_values(i + 2, row) for i, row in enumerate(values[1:])]
+    archive.write_jsonl(path, rows)
+    return schema.ArchivedInterview(
+        interview_id=interview_id,
+        path=str(path),
+        num_rows=len(rows),
+        num_answered=len([row for row in rows if row["posted"]]),
+        size=path.stat().st_size,
+        archived_at=datetime.utcnow(),
+    )
+
+
+def _count_sheet(
+    connection: spreadsheet.SheetConnection, sheet_name: str, revision: Optional[str], settled_rows: int
+) -> Optional[Tuple[str, int, int, int]]:
+    """
+    Count the questions asked and answered on a spreadsheet's current page, only reading rows after <settled_rows>.
+    Blocking, so run it in an executor.
+
+    Returns (revision, asked, answered, settled_rows), or None if the spreadsheet is still at <revision>.
+    """
+    client = connection.client()
+    sheet = client.open(sheet_name)
+    new_revision = spreadsheet.get_revision(client, sheet.id)
+    if new_revision == revision:
+        return None
+
+    first_row = settled_rows + 2  # +1 for the heading row, +1 for 1-indexing
+    values = sheet.sheet1.get(f"{POSTED_COLUMN}{first_row}:{POSTED_COLUMN}")
+    posted = [bool(row) and row[0] == "TRUE" for row in values]
+    new_settled = settled_rows
+    for flag in posted:
+        if not flag:
+            break
+        new_settled += 1
+    return new_revision, settled_rows + len(posted), settled_rows + sum(posted), new_settled
+
+
+def _transcript_markdown(
+    interviewee: str, interviews: List[Tuple[schema.Interview, Optional[schema.ArchivedInterview]]]
+) -> Generator[str, None, None]:
+    yield f"# {interviewee}'s interviews\n"
+    for interview, archived in interviews:
+        yield f"\n## Interview started {interview.start_time:%Y/%m/%d}\n\n"
+        if archived is None:
+            yield "_Not archived._\n"
+            continue
+        for row in archive.read_jsonl(archived.path):
+            if not row["posted"] or row["answer"] == "":
+                continue
+            question = "\n> ".join(line.strip() for line in row["question"].split("\n"))
+            yield f"**Question #{row['question_num']} from {row['asker_name']}**\n\n> {question}\n\n{row['answer']}\n\n"
+
+
+def _transcript_html(
+    interviewee: str, interviews: List[Tuple[schema.Interview, Optional[schema.ArchivedInterview]]]
+) -> Generator[str, None, None]:
+    title = html.escape(f"{interviewee}'s interviews")
+    yield f'<!DOCTYPE html>\n<html>\n<head><meta charset="utf-8"><title>{title}</title></head>\n'
+    yield f"<body>\n<h1>{title}</h1>\n"
+    for interview, archived in interviews:
+        yield f"<h2>Interview started {interview.start_time:%Y/%m/%d}</h2>\n"
+        if archived is None:
+            yield "<p><em>Not archived.</em></p>\n"
+            continue
+        for row in archive.read_jsonl(archived.path):
+            if not row["posted"] or row["answer"] == "":
+                continue
+            question = html.escape(row["question"]).replace("\n", "<br>")
+            answer = html.escape(row["answer"]).replace("\n", "<br>")
+            yield (
+                f"<h3>Question #{row['question_num']} from {html.escape(row['asker_name'])}</h3>\n"
+                f"<blockquote>{question}</blockquote>\n<p>{answer}</p>\n"
+            )
+    yield "</body>\n</html>\n"
+
+
+def _fts_query(terms: str) -> str:
+    """
+    Quote each search term, so users can't accidentally (or deliberately) write FTS5 query syntax.
+    """
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms.split())
+
+
+def _search_answers(
+    session: Session, server_id: int, terms: str, interviewee_id: int = None, limit: int = SEARCH_LIMIT
+) -> list:
+    """
+    Full-text search over answered questions on a server, best matches first.
+    """
+    query = """
+        SELECT
+            AnsweredQuestion.question_num, AnsweredQuestion.asker_name, AnsweredQuestion.channel_id,
+            AnsweredQuestion.message_id, Interview.interviewee_id, Interview.start_time,
+            snippet(AnswerSearch, 0, '**', '**', '…', 16) AS question_snippet,
+            snippet(AnswerSearch, 1, '**', '**', '…', 32) AS answer_snippet
+        FROM AnswerSearch
+        JOIN AnsweredQuestion ON AnsweredQuestion.id = AnswerSearch.rowid
+        JOIN Interview ON Interview.id = AnsweredQuestion.interview_id
+        WHERE AnswerSearch MATCH :query AND Interview.server_id = :server_id
+    """
+    params = {"query": _fts_query(terms), "server_id": server_id, "limit": limit}
+    if interviewee_id is not None:
+        query += " AND Interview.interviewee_id = :interviewee_id"
+        params["interviewee_id"] = interviewee_id
+    query += " ORDER BY bm25(AnswerSearch) LIMIT :limit"
+    return session.execute(text(query), params).fetchall()
+
+
 def _server_active(ctx: commands.Context):
     """
     Exposed so that it can be checked in help commands.
@@ -451,10 +859,30 @@ class Interview(commands.Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
         self.connection = None  # type: Optional[spreadsheet.SheetConnection]
+        self.sheet_index = None  # type: Optional[spreadsheet.SheetIndex]
+        self._rollovers = {}  # type: Dict[int, jobs.Job]  # guild ID -> most recent "iv next" job
+        # Commands that change the current interview's sheet page or counters hold their guild's lock for writing;
+        # read-only ones hold it for reading, so they can run alongside each other but never mid-change.
+        self.guild_locks = locks.KeyedRWLock()
+        self.backstage_digest = BackstageDigest(bot.loop)
+        # guild ID -> (current interview ID, near-duplicate index of its questions)
+        self._dupe_indexes = {}  # type: Dict[int, Tuple[int, minhash.LSHIndex]]
+        self.ask_limit = bot.ratelimits.declare(ratelimit.TokenBucket("iv_ask", ASK_BURST, ASK_PER))
+        self.vote_limit = bot.ratelimits.declare(ratelimit.SlidingWindow("iv_vote", VOTE_LIMIT, VOTE_PER))
         self.load()
+        bot.scheduler.register("iv_invite_revoke", self._revoke_invite)
+        self.verify_tallies.start()
+        self._outbox_wakeup = asyncio.Event()
+        self._replicator = bot.loop.create_task(self._replicate())
+
+    def cog_unload(self):
+        self.verify_tallies.cancel()
+        self._replicator.cancel()
+        self.backstage_digest.close()
 
     def load(self):
         self.connection = spreadsheet.SheetConnection(SECRET, SCOPE)
+        self.sheet_index = spreadsheet.SheetIndex(self.connection)
 
         if not Path(DB_FILE).exists():
             # Note: Don't technically need this condition, but it adds a bit of clarity, so keeping it in for now.
@@ -464,15 +892,234 @@ class Interview(commands.Cog):
         session_maker = sessionmaker(bind=engine)
 
         schema.Base.metadata.create_all(engine)
+        schema.create_indexes(engine)
+        schema.create_search_index(engine)
 
     # == Helper methods ==
 
+    async def _recount(
+        self, session: Session, interview: schema.Interview, full: bool = False
+    ) -> schema.InterviewTally:
+        """
+        Bring an interview's tally, and its question counts, up to date with its sheet page. Doesn't commit, and
+        should be called with the guild's write lock held, since the counts it sets are absolute.
+
+        Only rows after the settled ones are read, and nothing at all if the sheet hasn't changed since the last
+        count; <full> ignores both and re-reads the whole page.
+        """
+        tally = session.query(schema.InterviewTally).get(interview.id)  # type: Optional[schema.InterviewTally]
+        if tally is None:
+            tally = schema.InterviewTally(interview_id=interview.id, settled_rows=0)
+            session.add(tally)
+        revision, settled_rows = (None, 0) if full else (tally.revision, tally.settled_rows)
+
+        counts = await self.bot.loop.run_in_executor(
+            None, _count_sheet, self.connection, interview.server.sheet_name, revision, settled_rows
+        )
+        if counts is not None:
+            tally.revision, tally.asked, tally.answered, tally.settled_rows = counts
+        tally.counted_at = datetime.utcnow()
+        if full:
+            tally.verified_at = tally.counted_at
+
+        # Questions still in the outbox have been asked too; they just aren't on the sheet yet.
+        waiting = (
+            session.query(func.count(schema.QueuedQuestion.id))
+            .filter(
+                schema.QueuedQuestion.interview_id == interview.id,
+                schema.QueuedQuestion.status.in_([schema.QUEUE_PENDING, schema.QUEUE_FAILED]),
+            )
+            .scalar()
+        )
+        interview.questions_asked = tally.asked + waiting
+        interview.questions_answered = tally.answered
+        return tally
+
+    @tasks.loop(hours=VERIFY_HOURS)
+    async def verify_tallies(self):
+        """
+        Full recount of every current interview, to catch anything edited by hand among the settled rows.
+        """
+        session = session_maker()
+        current = session.query(schema.Interview.id, schema.Interview.server_id).filter_by(current=True).all()
+        session.close()
+        for interview_id, server_id in current:
+            # Under the guild's write lock, and read fresh inside it, so an ask or answer that lands mid-count isn't
+            # overwritten by counts from before it.
+            async with self.guild_locks.write(server_id):
+                session = session_maker()
+                try:
+                    interview = session.query(schema.Interview).get(interview_id)  # type: schema.Interview
+                    old_counts = (interview.questions_asked, interview.questions_answered)
+                    await self._recount(session, interview, full=True)
+                    if (interview.questions_asked, interview.questions_answered) != old_counts:
+                        logging.info(
+                            f"interview {interview.id} counts were off: {old_counts} -> "
+                            f"{(interview.questions_asked, interview.questions_answered)}"
+                        )
+                    session.commit()
+                except Exception:
+                    logging.exception(f"failed to verify counts for interview {interview_id}")
+                finally:
+                    session.close()
+
+    @verify_tallies.before_loop
+    async def before_verify_tallies(self):
+        await self.bot.wait_until_ready()
+
+    def _append_rows(self, sheet_name: str, page_name: str, rows: List[list], dedupe: bool = False):
+        """
+        Blocking, so run it in an executor. <dedupe> first drops any of <rows> already on the page (by asker ID and
+        question number), for retries after an append that may have gone through anyway.
+
+        Raises WorksheetNotFound if the page has been renamed or deleted, rather than putting the rows on some other
+        interview's page.
+        """
+        page = self.connection.get_sheet(sheet_name).worksheet(page_name)
+        if dedupe:
+            present = {
+                (row[0], row[1]) for row in page.get(f"{ASKER_ID_COLUMN}2:{QUESTION_NUM_COLUMN}") if len(row) >= 2
+            }
+            rows = [row for row in rows if (str(row[3]), str(row[4])) not in present]
+            if not rows:
+                return
+        page.append_rows(rows)
+
+    @contextlib.asynccontextmanager
+    async def _interview_lock(self, ctx: commands.Context, write: bool) -> AsyncIterator[None]:
+        """
+        Hold the guild's interview lock, letting the invoker know if they're waiting on someone else's command.
+        """
+        queued = self.guild_locks.busy(ctx.guild.id, write=write)
+        if queued:
+            await ctx.message.add_reaction(ctx.bot.waitemoji)
+        async with (self.guild_locks.write if write else self.guild_locks.read)(ctx.guild.id):
+            if queued:
+                try:
+                    await ctx.message.remove_reaction(ctx.bot.waitemoji, ctx.bot.user)
+                except discord.HTTPException:
+                    pass
+            yield
+
+    def _dupe_index(self, session: Session, interview: schema.Interview) -> minhash.LSHIndex:
+        """
+        Near-duplicate index over the questions asked this interview, built from the outbox on first use.
+        """
+        if interview.server_id in self._dupe_indexes:
+            interview_id, index = self._dupe_indexes[interview.server_id]
+            if interview_id == interview.id:
+                return index
+        index = minhash.LSHIndex()
+        for queued_id, question in (
+            session.query(schema.QueuedQuestion.id, schema.QueuedQuestion.question)
+            .filter_by(interview_id=interview.id)
+            .order_by(schema.QueuedQuestion.id)
+        ):
+            index.add(queued_id, question)
+        self._dupe_indexes[interview.server_id] = (interview.id, index)
+        return index
+
+    async def _replicate_once(self) -> Optional[float]:
+        """
+        Upload whatever's due in the outbox, one append per sheet page, oldest first.
+
+        A page's questions go up in the order they were asked, so once any of them has failed for good, nothing else
+        for that page goes up until "iv queue retry".
+
+        Returns how long until the next retry is due, or None if there's nothing left to retry.
+        """
+        session = session_maker()
+        waiting = (
+            session.query(schema.QueuedQuestion)
+            .filter(schema.QueuedQuestion.status.in_([schema.QUEUE_PENDING, schema.QUEUE_FAILED]))
+            .order_by(schema.QueuedQuestion.id)
+            .all()
+        )  # type: List[schema.QueuedQuestion]
+        batches = {}  # type: Dict[Tuple[str, str], List[schema.QueuedQuestion]]
+        for queued in waiting:
+            batches.setdefault((queued.spreadsheet, queued.page), []).append(queued)
+
+        next_due = None  # type: Optional[datetime]
+        for (sheet_name, page_name), batch in batches.items():
+            if any(queued.status == schema.QUEUE_FAILED for queued in batch):
+                continue
+            # The oldest row decides, since the page's rows go up together.
+            if batch[0].next_attempt > datetime.utcnow():
+                next_due = batch[0].next_attempt if next_due is None else min(next_due, batch[0].next_attempt)
+                continue
+            rows = [json.loads(queued.row) for queued in batch]
+            # Any row that's errored before may have made it up anyway (e.g. a timeout after the append went
+            # through), so check for it rather than appending it twice.
+            dedupe = any(queued.error is not None for queued in batch)
+            try:
+                await self.bot.loop.run_in_executor(None, self._append_rows, sheet_name, page_name, rows, dedupe)
+            except WorksheetNotFound:
+                # Retrying won't bring the page back; leave it to a host to restore it and "iv queue retry".
+                logging.warning(f"no page {page_name} in {sheet_name} for {len(batch)} queued questions")
+                for queued in batch:
+                    queued.attempts += 1
+                    queued.error = f"page {page_name} not found"
+                    queued.status = schema.QUEUE_FAILED
+            except Exception as e:
+                logging.warning(
+                    f"failed to upload {len(batch)} questions to {sheet_name} "
+                    f"(attempt {batch[0].attempts + 1} for the oldest): {e}"
+                )
+                retry_at = datetime.utcnow() + timedelta(
+                    seconds=min(OUTBOX_RETRY_DELAY * 2 ** batch[0].attempts, OUTBOX_MAX_DELAY)
+                )
+                # Each row counts its own attempts, so one queued a moment ago doesn't inherit the oldest's.
+                failed = False
+                for queued in batch:
+                    queued.attempts += 1
+                    queued.error = str(e)[:500]
+                    queued.next_attempt = retry_at
+                    if queued.attempts >= OUTBOX_MAX_ATTEMPTS:
+                        queued.status = schema.QUEUE_FAILED
+                        failed = True
+                if not failed:
+                    next_due = retry_at if next_due is None else min(next_due, retry_at)
+            else:
+                sent_at = datetime.utcnow()
+                for queued in batch:
+                    queued.status = schema.QUEUE_SENT
+                    queued.error = None
+                    queued.sent_at = sent_at
+            session.commit()
+        session.close()
+
+        if next_due is None:
+            return None
+        return max((next_due - datetime.utcnow()).total_seconds(), 0)
+
+    async def _replicate(self):
+        """
+        Background task draining the question outbox to Sheets. Woken up whenever questions are queued.
+        """
+        while True:
+            self._outbox_wakeup.clear()
+            try:
+                delay = await self._replicate_once()
+            except Exception:
+                logging.exception("question outbox replication failed")
+                delay = OUTBOX_MAX_DELAY
+            if delay is None:
+                await self._outbox_wakeup.wait()
+                continue
+            try:
+                await asyncio.wait_for(self._outbox_wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
     @staticmethod
     def _generate_embeds(
         interviewee: discord.Member, interview: schema.Interview, questions: List[Question], avatar_url: str = None
-    ) -> List[Union[discord.Embed, Question]]:
+    ) -> Generator[Union[InterviewEmbed, Question], None, None]:
         """
-        Generate a list of discord.Embeds to be posted from a list of Questions.
+        Generate the InterviewEmbeds to be posted from a list of Questions.
+
+        Embeds are yielded as soon as they're full, so the first can be posted while the rest are still rendering.
+        Questions too long to embed at all are yielded as-is.
         """
         if avatar_url is None:
             avatar_url = interviewee.avatar_url
@@ -494,9 +1141,7 @@ class Interview(commands.Cog):
 
         last_asker = None  # type: Optional[discord.Member]
 
-        ls_embeds = []
-
-        em = None  # type: Optional[discord.Embed]
+        em = None  # type: Optional[InterviewEmbed]
         for question in questions:
             # Three cases where we need to start a new embed:
             # 1. If the total length of the embed is > max message size
@@ -504,9 +1149,9 @@ class Interview(commands.Cog):
             # 3. If there's a new asker (only one asker per embed)
             logging.debug(f"generating {question.asker}-{question.question_num}")
             if last_asker != question.asker or len(em.fields) > 23:  # 23 as a buffer idk
-                # new asker, append old embed and make a new one
+                # new asker, yield old embed and make a new one
                 if em is not None and len(em.fields) > 0:
-                    ls_embeds.append(finalize(em))
+                    yield finalize(em)
                 # make a new embed
                 em = new_em(question.asker)
 
@@ -516,23 +1161,50 @@ class Interview(commands.Cog):
             # Update answered questions per asker
             n_answered += 1
             if added_length == -1:
-                # question wasn't added, append to list and retry
+                # question wasn't added, yield what we have and retry
                 if len(em.fields) > 0:
-                    ls_embeds.append(finalize(em))
+                    yield finalize(em)
                 em = new_em(question.asker)
                 added_length = add_question(em, question, length)
 
             if added_length == -2:
-                # question cannot be added, add an error
-                ls_embeds.append(question)
+                # question cannot be added, yield it as an error
+                yield question
+            else:
+                em.questions.append(question)
             length += added_length
             last_asker = question.asker
         if em is not None:
             # yield the final embed
             if len(em.fields) > 0:
-                ls_embeds.append(finalize(em))
+                yield finalize(em)
+
+    @staticmethod
+    async def _edit_audience(
+        ctx: commands.Context, audience_role: discord.Role, members: List[discord.Member], add: bool, reason: str
+    ) -> bool:
+        """
+        Add or remove the audience role for a batch of members concurrently, reporting any failures.
+
+        Returns whether every member was updated.
+        """
+        if add:
+            label = "Adding audience members"
 
-        return ls_embeds
+            async def action(member: discord.Member):
+                await member.add_roles(audience_role, reason=reason)
+
+        else:
+            label = "Removing audience members"
+
+            async def action(member: discord.Member):
+                await member.remove_roles(audience_role, reason=reason)
+
+        progress = await bulk.ProgressMessage.start(ctx, label, len(members))
+        result = await bulk.run_bulk(members, action, limit=ctx.bot.conf.bulk_concurrency, progress=progress)
+        if result.failed:
+            await ctx.send(f"Failed to update {len(result.failed)} members:```\n{result.failure_summary()}```")
+        return not result.failed
 
     # == Setup ==
 
@@ -569,8 +1241,6 @@ class Interview(commands.Cog):
             await ctx.message.add_reaction(ctx.bot.redtick)
             return False
 
-        client = gspread.authorize(self.connection.creds)
-        sheet_names = [sheet["name"] for sheet in client.list_spreadsheet_files()]
         # try:
         #     sheet = self.connection.get_sheet(sheet_name)
         # except SpreadsheetNotFound:
@@ -579,7 +1249,7 @@ class Interview(commands.Cog):
         #     await ctx.message.add_reaction(ctx.bot.redtick)
         #     return False
 
-        if sheet_name not in sheet_names:
+        if not await self.sheet_index.contains(ctx.bot.loop, sheet_name):
             await ctx.send(
                 f"Spreadsheet `{sheet_name}` cannot be found, make sure it's been shared with the bot "
                 f"account (`{ctx.bot.conf.google_email}`) and try again."
@@ -680,81 +1350,167 @@ class Interview(commands.Cog):
         shares the document with them. Old emails must still be cleared out manually.
         """
 
-        # set the old interview row to be not-current
+        if ctx.guild.id in self._rollovers and not self._rollovers[ctx.guild.id].done:
+            await ctx.send("An interview rollover is already running.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+
+        # Only read here; the rollover itself is written in one go at the end, in commit().
         session = session_maker()
-        old_interview = (
-            session.query(schema.Interview).filter_by(server_id=ctx.guild.id, current=True).one_or_none()
-        )  # type: schema.Interview
-        if old_interview is not None:
+        try:
+            old_interview = (
+                session.query(schema.Interview).filter_by(server_id=ctx.guild.id, current=True).one_or_none()
+            )  # type: Optional[schema.Interview]
             # if old_interview doesn't exist that just means it's the first interview!
-            old_interview.current = False
-            server = old_interview.server
-        else:
-            server = session.query(schema.Server).filter_by(id=ctx.guild.id).one_or_none()
+            server = session.query(schema.Server).filter_by(id=ctx.guild.id).one_or_none()  # type: schema.Server
+        finally:
+            session.close()
 
         timestamp = datetime.utcnow()
         sheet_name = f"{interviewee.name} [{interviewee.id}]-{timestamp.timestamp()}"
+        op_message = {}  # type: Dict[str, int]
 
-        # Create new schema.Interview & add it do database
-
-        new_interview = schema.Interview(
-            server_id=ctx.guild.id,
-            interviewee_id=interviewee.id,
-            start_time=timestamp,
-            sheet_name=sheet_name,
-            questions_asked=1,  # Starts at 1 for the default question
-            questions_answered=0,
-            current=True,
-        )
-        session.add(new_interview)
-
-        # Make & clear a new sheet page
-
-        interview_sheet = self.connection.get_sheet(server.sheet_name)
-        old_sheet = interview_sheet.sheet1
-        new_sheet = old_sheet.duplicate(insert_sheet_index=0, new_sheet_name=sheet_name)
-        new_sheet.insert_row(
-            [
-                timestamp.strftime("%m/%d/%Y %H:%M:%S"),
-                timestamp.timestamp(),
-                str(ctx.bot.user),
-                str(ctx.bot.user.id),
-                1,
-                server.default_question,
-                "",
-                False,
-                str(ctx.guild.id),
-                str(ctx.channel.id),
-                str(ctx.message.id),
-            ],
-            index=2,
-        )
-        new_sheet.resize(rows=2)
-
-        if email is not None:
-            interview_sheet.share(email, perm_type="user", role="writer")
+        # Everything else runs as a background job. Sheets calls go to an executor so they don't block other
+        # commands, and steps that don't depend on each other run at the same time.
 
-        channel = ctx.guild.get_channel(server.answer_channel)
-        op_msg = await self._votals_in_channel(ctx, flag=None, channel=channel)
-        new_interview.op_channel_id = op_msg.channel.id
-        new_interview.op_message_id = op_msg.id
+        loop = ctx.bot.loop
+        sheets = {}  # type: Dict[str, gspread.Worksheet]
 
-        session.query(schema.Vote).filter_by(server_id=ctx.guild.id).delete()
+        async def open_sheet():
+            sheets["spreadsheet"] = await loop.run_in_executor(None, self.connection.get_sheet, server.sheet_name)
+            # Worksheets are tracked by ID, so this stays the old page even once the new one is inserted before it.
+            sheets["old"] = sheets["spreadsheet"].sheet1
 
-        # Open the interview up for votes, questions, etc.
-        server.active = True
+        async def archive_old():
+            values = await loop.run_in_executor(None, sheets["old"].get_all_values)
+            archived = await loop.run_in_executor(
+                None, _archive_interview, old_interview.server_id, old_interview.id, values
+            )
+            # Own session, so the archive is kept whether or not the rollover itself goes through.
+            archive_session = session_maker()
+            try:
+                archive_session.merge(archived)
+                archive_session.commit()
+            finally:
+                archive_session.close()
+
+        def make_page():
+            # Written to be safe to retry: reuse the page if an earlier attempt created it, and overwrite row 2
+            # rather than inserting.
+            try:
+                new_sheet = sheets["spreadsheet"].worksheet(sheet_name)
+            except WorksheetNotFound:
+                new_sheet = sheets["old"].duplicate(insert_sheet_index=0, new_sheet_name=sheet_name)
+            new_sheet.resize(rows=2)
+            new_sheet.update(
+                "A2:K2",
+                [
+                    [
+                        timestamp.strftime("%m/%d/%Y %H:%M:%S"),
+                        timestamp.timestamp(),
+                        str(ctx.bot.user),
+                        str(ctx.bot.user.id),
+                        1,
+                        server.default_question,
+                        "",
+                        False,
+                        str(ctx.guild.id),
+                        str(ctx.channel.id),
+                        str(ctx.message.id),
+                    ]
+                ],
+            )
 
-        # Only commit after the new page is up and old votes are deleted.
-        session.commit()
+        async def share():
+            await loop.run_in_executor(
+                None, lambda: sheets["spreadsheet"].share(email, perm_type="user", role="writer")
+            )
 
-        audience_role: discord.Role = ctx.guild.get_role(server.audience_role_id)
-        if audience_role:
-            for member in audience_role.members:  # type: discord.Member
-                await member.remove_roles(audience_role, reason="interview rollover")
+        async def post_votals():
+            channel = ctx.guild.get_channel(server.answer_channel)
+            op_msg = await self._votals_in_channel(ctx, flag=None, channel=channel)
+            op_message["channel_id"] = op_msg.channel.id
+            op_message["message_id"] = op_msg.id
+
+        async def clear_audience():
+            audience_role = ctx.guild.get_role(server.audience_role_id)  # type: discord.Role
+            if audience_role and not await self._edit_audience(
+                ctx, audience_role, audience_role.members, add=False, reason="interview rollover"
+            ):
+                raise RuntimeError("some audience members couldn't be removed")
+
+        async def commit():
+            commit_session = session_maker()
+            try:
+                # set the old interview row to be not-current
+                commit_session.query(schema.Interview).filter_by(server_id=ctx.guild.id, current=True).update(
+                    {"current": False}, synchronize_session=False
+                )
+                commit_session.add(
+                    schema.Interview(
+                        server_id=ctx.guild.id,
+                        interviewee_id=interviewee.id,
+                        start_time=timestamp,
+                        sheet_name=sheet_name,
+                        questions_asked=1,  # Starts at 1 for the default question
+                        questions_answered=0,
+                        current=True,
+                        op_channel_id=op_message["channel_id"],
+                        op_message_id=op_message["message_id"],
+                    )
+                )
+                commit_session.query(schema.Vote).filter_by(server_id=ctx.guild.id).delete()
+                # Open the interview up for votes, questions, etc.
+                commit_session.query(schema.Server).filter_by(id=ctx.guild.id).update({"active": True})
+                commit_session.commit()
+            finally:
+                commit_session.close()
+
+        steps = [
+            jobs.JobStep("Open the interview sheet", open_sheet),
+            jobs.JobStep(
+                "Make a new sheet page",
+                lambda: loop.run_in_executor(None, make_page),
+                after=["Open the interview sheet"],
+            ),
+            # Not until the new page is up, so a sheet that won't open doesn't leave the final votals posted for an
+            # interview that never started.
+            jobs.JobStep("Post votals", post_votals, after=["Make a new sheet page"], retries=0),
+            # Only commit after the new page is up and the votals that are about to be deleted are posted.
+            jobs.JobStep("Open the new interview", commit, after=["Make a new sheet page", "Post votals"], retries=0),
+            # Left alone if the rollover fails, so the old interview keeps its stage.
+            jobs.JobStep("Clear the stage", clear_audience, after=["Open the new interview"], retries=0),
+        ]
+        if old_interview is not None:
+            steps.append(jobs.JobStep("Archive the old interview", archive_old, after=["Open the interview sheet"]))
+        if email is not None:
+            steps.append(jobs.JobStep("Share the sheet", share, after=["Open the interview sheet"]))
 
-        await ctx.message.add_reaction(ctx.bot.greentick)
-        await asyncio.sleep(2)
-        await ctx.send(f"{ctx.author.mention}, make sure to update the table of contents!")
+        await ctx.message.add_reaction(ctx.bot.waitemoji)
+        status = await ctx.send(f"Setting up {interviewee}'s interview...")
+        job = jobs.Job(f"Setting up {interviewee}'s interview", steps, status)
+        self._rollovers[ctx.guild.id] = job
+
+        async def run():
+            # Nothing awaits this task, so anything that escapes has to be caught here or it'd go unreported.
+            try:
+                async with self.guild_locks.write(ctx.guild.id):
+                    await job.run()
+                await ctx.message.clear_reactions()
+                if not job.steps["Open the new interview"].succeeded:
+                    await ctx.message.add_reaction(ctx.bot.redtick)
+                    return
+                await ctx.message.add_reaction(ctx.bot.greentick)
+                await ctx.send(f"{ctx.author.mention}, make sure to update the table of contents!")
+            except Exception as e:
+                logging.exception(f"interview rollover for {ctx.guild} failed")
+                try:
+                    await ctx.send(f"Setting up {interviewee}'s interview failed: {e}")
+                    await ctx.message.add_reaction(ctx.bot.redtick)
+                except discord.HTTPException:
+                    pass
+
+        loop.create_task(run())
 
     @iv.command(name="settings")
     @commands.has_permissions(administrator=True)
@@ -763,20 +1519,21 @@ class Interview(commands.Cog):
         """
         Check current settings for this server's interviews.
         """
-        session = session_maker()
-        server = session.query(schema.Server).filter_by(id=ctx.guild.id).one_or_none()  # type: schema.Server
-        answer = ctx.guild.get_channel(server.answer_channel)
-        backstage = ctx.guild.get_channel(server.back_channel)
-        em = discord.Embed(title=f"{ctx.guild} interview settings", color=ctx.bot.user.color)
-
-        em.add_field(name="Answer channel", value=f"{answer.mention}")
-        em.add_field(name="Backstage channel", value=f"{backstage.mention}")
-        em.add_field(name="Sheet name", value=f"{server.sheet_name}")
-        em.add_field(name="Default question", value=f"{server.default_question}")
-        em.add_field(name="Reinterview limit", value=f"{server.limit}")
-        em.add_field(name="Manager", value=f"{ctx.guild.get_role(server.manager_role_id)}")
-        em.add_field(name="On-stage audience", value=f"{ctx.guild.get_role(server.audience_role_id)}")
-        await ctx.send(embed=em)
+        async with self._interview_lock(ctx, write=False):
+            session = session_maker()
+            server = session.query(schema.Server).filter_by(id=ctx.guild.id).one_or_none()  # type: schema.Server
+            answer = ctx.guild.get_channel(server.answer_channel)
+            backstage = ctx.guild.get_channel(server.back_channel)
+            em = discord.Embed(title=f"{ctx.guild} interview settings", color=ctx.bot.user.color)
+
+            em.add_field(name="Answer channel", value=f"{answer.mention}")
+            em.add_field(name="Backstage channel", value=f"{backstage.mention}")
+            em.add_field(name="Sheet name", value=f"{server.sheet_name}")
+            em.add_field(name="Default question", value=f"{server.default_question}")
+            em.add_field(name="Reinterview limit", value=f"{server.limit}")
+            em.add_field(name="Manager", value=f"{ctx.guild.get_role(server.manager_role_id)}")
+            em.add_field(name="On-stage audience", value=f"{ctx.guild.get_role(server.audience_role_id)}")
+            await ctx.send(embed=em)
 
     @iv.command(name="overwrite")
     @commands.is_owner()
@@ -792,26 +1549,23 @@ class Interview(commands.Cog):
     @_ck_server_active()
     async def iv_recount(self, ctx: commands.Context):
         """
-        TODO: Update metadata for the current interview as possible from the sheet.
+        Update the current interview's question counts from the sheet.
+
+        Only rows that could have changed since the last recount are read. Every current interview also gets a full
+        recount in the background every few hours.
         """
-        session = session_maker()
-        interview = session.query(schema.Interview).filter_by(server_id=ctx.guild.id, current=True).one_or_none()
-        old_count = interview.questions_answered
-        old_total = interview.questions_asked
-
-        sheet = self.connection.get_sheet(interview.server.sheet_name).sheet1
-        count = 0
-        records = sheet.get_all_records()
-        for record in records:
-            if record["Posted?"] == "TRUE":
-                count += 1
-        interview.questions_answered = count
-        interview.questions_asked = len(records)
-        session.commit()
+        async with self._interview_lock(ctx, write=True):
+            session = session_maker()
+            interview = session.query(schema.Interview).filter_by(server_id=ctx.guild.id, current=True).one_or_none()
+            old_count = interview.questions_answered
+            old_total = interview.questions_asked
+
+            await self._recount(session, interview)
+            session.commit()
 
         await ctx.message.add_reaction(ctx.bot.greentick)
-        await ctx.send(f"Old count: {old_count}\nNew count: {count}")
-        await ctx.send(f"Old total: {old_total}\nNew total: {len(records)}")
+        await ctx.send(f"Old count: {old_count}\nNew count: {interview.questions_answered}")
+        await ctx.send(f"Old total: {old_total}\nNew total: {interview.questions_asked}")
 
     @iv.command(name="channel")
     @commands.has_permissions(administrator=True)
@@ -950,10 +1704,10 @@ class Interview(commands.Cog):
             if user.lower() == "all":
                 user = ctx.guild.default_role
             else:
-                await ctx.send('Invalid <user> argument. Mention a member or "all".')
+                suggestions = ctx.bot.member_index.suggest(ctx.guild, user)
+                hint = f" Did you mean: {', '.join(str(member) for member in suggestions)}?" if suggestions else ""
+                await ctx.send(f'Invalid <user> argument. Mention a member or "all".{hint}')
                 return
-        await ctx.message.add_reaction(ctx.bot.waitemoji)
-        await stage.set_permissions(user, send_messages=True)
 
         if minutes > 24 * 60:  # max at 24 hours
             await ctx.send(
@@ -961,12 +1715,86 @@ class Interview(commands.Cog):
                 "ask a mod."
             )
             return
-        await asyncio.sleep(60 * minutes)
-        await stage.set_permissions(user, send_messages=None)
-        await ctx.message.clear_reactions()
-        await ctx.message.add_reaction(ctx.bot.greentick)
+        await ctx.message.add_reaction(ctx.bot.waitemoji)
+        await stage.set_permissions(user, send_messages=True)
+
+        # Revoked by the scheduler rather than a sleeping coroutine, so it still happens if the bot restarts.
+        ctx.bot.scheduler.schedule(
+            "iv_invite_revoke",
+            datetime.utcnow() + timedelta(minutes=minutes),
+            {
+                "guild_id": ctx.guild.id,
+                "stage_id": stage.id,
+                "target_id": user.id,
+                "target_is_role": type(user) is discord.Role,
+                "channel_id": ctx.channel.id,
+                "message_id": ctx.message.id,
+            },
+        )
+
+    async def _revoke_invite(self, payload: Dict[str, Any]):
+        """
+        Scheduler handler closing the stage back up after an "iv invite" runs out.
+        """
+        guild = self.bot.get_guild(payload["guild_id"])  # type: Optional[discord.Guild]
+        if guild is None:
+            return
+        stage = guild.get_channel(payload["stage_id"])
+        if payload["target_is_role"]:
+            target = guild.get_role(payload["target_id"])
+        else:
+            target = guild.get_member(payload["target_id"])
+        if stage is None or target is None:
+            return
+        await stage.set_permissions(target, send_messages=None)
 
-    @iv.command(name="stats")
+        try:
+            message = await guild.get_channel(payload["channel_id"]).fetch_message(payload["message_id"])
+            await message.clear_reactions()
+            await message.add_reaction(self.bot.greentick)
+        except (AttributeError, discord.HTTPException):
+            # The invite message is gone; nothing to mark.
+            pass
+
+    @staticmethod
+    def _past_interviews(session: Session, server_id: int, interviewee_id: int) -> Tuple[int, str]:
+        """
+        Count someone's interviews on a server, and describe the most recent ones.
+        """
+        num, asked, answered = (
+            session.query(
+                func.count(schema.Interview.id),
+                func.sum(schema.Interview.questions_asked),
+                func.sum(schema.Interview.questions_answered),
+            )
+            .filter_by(server_id=server_id, interviewee_id=interviewee_id)
+            .one()
+        )
+        recent = (
+            session.query(
+                schema.Interview.start_time,
+                schema.Interview.op_channel_id,
+                schema.Interview.op_message_id,
+                schema.Interview.questions_answered,
+                schema.Interview.questions_asked,
+            )
+            .filter_by(server_id=server_id, interviewee_id=interviewee_id)
+            .order_by(desc(schema.Interview.start_time))
+            .limit(STATS_RECENT)
+            .all()
+        )
+
+        description = ""
+        if num > len(recent):
+            description += f"...and {num - len(recent)} earlier\n"
+        for start_time, channel_id, message_id, iv_answered, iv_asked in reversed(recent):
+            url = utils.jump_url(server_id, channel_id, message_id)
+            description += f"• [{start_time}]({url}): {iv_answered} out of {iv_asked}\n"
+        if num > 1:
+            description += f"\n{answered} out of {asked} questions answered across {num} interviews.\n"
+        return num, description
+
+    @iv.group(name="stats", invoke_without_command=True)
     @_ck_server_active()
     async def iv_stats(self, ctx: commands.Context, member: Optional[discord.Member]):
         """
@@ -983,11 +1811,7 @@ class Interview(commands.Cog):
                 await ctx.send("There is no currently ongoing interview.")
                 return
             interviewee = ctx.guild.get_member(interview.interviewee_id)
-            past_interviews = (
-                session.query(schema.Interview)
-                .filter_by(server_id=ctx.guild.id, interviewee_id=interview.interviewee_id)
-                .all()
-            )  # type: List[schema.Interview]
+            num_interviews, past = self._past_interviews(session, ctx.guild.id, interview.interviewee_id)
 
             # view general stats
             em = discord.Embed(
@@ -995,11 +1819,8 @@ class Interview(commands.Cog):
                 color=interviewee.color,
             )
             em.set_thumbnail(url=interviewee.avatar_url)
-            if len(past_interviews) > 1:
-                description = f"{interviewee}'s past interviews were:\n"
-                for iv in past_interviews:
-                    url = utils.jump_url(iv.server_id, iv.op_channel_id, iv.op_message_id)
-                    description += f"• [{iv.start_time}]({url}): {iv.questions_answered} out of {iv.questions_asked}\n"
+            if num_interviews > 1:
+                description = f"{interviewee}'s past interviews were:\n" + past
             else:
                 description = f"This is {interviewee}'s first interview!"
             em.description = description
@@ -1009,87 +1830,436 @@ class Interview(commands.Cog):
             await ctx.send(embed=em)
             return
 
-        past_interviews = (
-            session.query(schema.Interview).filter_by(server_id=ctx.guild.id, interviewee_id=member.id).all()
-        )  # type: List[schema.Interview]
+        num_interviews, past = self._past_interviews(session, ctx.guild.id, member.id)
 
         em = discord.Embed(
             title=f"Interview stats for {member}",
             color=member.color,
         )
-        if len(past_interviews) > 0:
-            description = f"{member}'s past interviews were:\n"
-            for iv in past_interviews:
-                url = utils.jump_url(iv.server_id, iv.op_channel_id, iv.op_message_id)
-                description += f"• [{iv.start_time}]({url}): {iv.questions_answered} out of {iv.questions_asked}\n"
-            em.description = description
+        if num_interviews > 0:
+            em.description = f"{member}'s past interviews were:\n" + past
         em.set_thumbnail(url=member.avatar_url)
         if interview is None:
             # No questions could have been asked if there's no current interview
             await ctx.send(embed=em)
             return
-        current_qs = session.query(schema.Asker).filter_by(interview_id=interview.id, asker_id=member.id).one_or_none()
-        if current_qs is None:
-            # hasn't asked questions
-            current_qs = 0
+        current_qs = (
+            session.query(schema.Asker.num_questions).filter_by(interview_id=interview.id, asker_id=member.id).scalar()
+        )
+        past_qs = (
+            session.query(func.sum(schema.Asker.num_questions))
+            .join(schema.Asker.interview)
+            .filter(schema.Interview.server_id == ctx.guild.id, schema.Asker.asker_id == member.id)
+            .scalar()
+        )
+
+        em.add_field(name="Questions asked this interview", value=str(current_qs or 0))
+        em.add_field(name="Questions total", value=str(past_qs or 0))
+        await ctx.send(embed=em)
+
+    @iv_stats.command(name="top")
+    @_ck_server_active()
+    async def iv_stats_top(self, ctx: commands.Context, num: int = 10):
+        """
+        View the server's top question askers and most interviewed members.
+        """
+        num = max(1, min(num, 25))
+        session = session_maker()
+        askers = (
+            session.query(schema.Asker.asker_id, func.sum(schema.Asker.num_questions))
+            .join(schema.Asker.interview)
+            .filter(schema.Interview.server_id == ctx.guild.id)
+            .group_by(schema.Asker.asker_id)
+            .order_by(func.sum(schema.Asker.num_questions).desc())
+            .limit(num)
+            .all()
+        )  # type: List[Tuple[int, int]]
+        interviewees = (
+            session.query(
+                schema.Interview.interviewee_id,
+                func.count(schema.Interview.id),
+                func.sum(schema.Interview.questions_answered),
+            )
+            .filter_by(server_id=ctx.guild.id)
+            .group_by(schema.Interview.interviewee_id)
+            .order_by(func.count(schema.Interview.id).desc(), func.sum(schema.Interview.questions_answered).desc())
+            .limit(num)
+            .all()
+        )  # type: List[Tuple[int, int, int]]
+        session.close()
+
+        def name(user_id: int) -> str:
+            member = ctx.guild.get_member(user_id)
+            return SERVER_LEFT_MSG if member is None else str(member)
+
+        em = discord.Embed(title=f"Interview leaderboard for {ctx.guild}", color=ctx.guild.me.color)
+        em.add_field(
+            name="Most questions asked",
+            value="\n".join(f"{i}. {name(user_id)}: {total}" for i, (user_id, total) in enumerate(askers, 1))
+            or "No questions yet!",
+            inline=False,
+        )
+        em.add_field(
+            name="Most interviewed",
+            value="\n".join(
+                f"{i}. {name(user_id)}: {n} interviews, {answered} answers"
+                for i, (user_id, n, answered) in enumerate(interviewees, 1)
+            )
+            or "No interviews yet!",
+            inline=False,
+        )
+        await ctx.send(embed=em)
+
+    @iv.command(name="search")
+    @_ck_server_active()
+    async def iv_search(self, ctx: commands.Context, *, terms: str):
+        """
+        Search the answers from all past interviews.
+
+        Mention a member at the end to only search their interviews, e.g. "iv search favorite pokemon @user".
+        """
+        interviewee = None  # type: Optional[discord.Member]
+        match = re.search(r"\s*<@!?(\d+)>\s*$", terms)
+        if match is not None:
+            interviewee = ctx.guild.get_member(int(match.group(1)))
+            terms = terms[: match.start()]
+        if terms.strip() == "":
+            await ctx.send("Search for at least one word.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+
+        session = session_maker()
+        results = _search_answers(
+            session, ctx.guild.id, terms, interviewee_id=interviewee.id if interviewee is not None else None
+        )
+        if len(results) == 0:
+            await ctx.send(f"No answers found for `{terms.strip()}`.")
+            return
+
+        em = discord.Embed(title=f"Interview answers matching: {terms.strip()}"[:256], color=ctx.bot.user.color)
+        for result in results:
+            name = _name_or_default(ctx.guild.get_member(result.interviewee_id))
+            url = utils.jump_url(ctx.guild.id, result.channel_id, result.message_id)
+            em.add_field(
+                name=f"{name}'s interview, question #{result.question_num} from {result.asker_name}"[:256],
+                value=f"> [{result.question_snippet[:300]}]({url})\n{result.answer_snippet[:600]}",
+                inline=False,
+            )
+        await ctx.send(embed=em)
+
+    @iv.command(name="reindex")
+    @commands.is_owner()
+    @_ck_server_active()
+    async def iv_reindex(self, ctx: commands.Context):
+        """
+        Import answered questions from every past interview's sheet page into the search index.
+
+        Only needed once, for interviews from before searching existed; newer answers are indexed as they're posted.
+        """
+        session = session_maker()
+        server = session.query(schema.Server).filter_by(id=ctx.guild.id).one_or_none()  # type: schema.Server
+        interviews = (
+            session.query(schema.Interview).filter_by(server_id=ctx.guild.id).order_by(schema.Interview.start_time).all()
+        )  # type: List[schema.Interview]
+
+        await ctx.message.add_reaction(ctx.bot.waitemoji)
+        spreadsheet_ = await ctx.bot.loop.run_in_executor(None, self.connection.get_sheet, server.sheet_name)
+        n_rows = 0
+        missing = []
+        for interview in interviews:
+            try:
+                page = await ctx.bot.loop.run_in_executor(None, spreadsheet_.worksheet, interview.sheet_name)
+            except WorksheetNotFound:
+                missing.append(interview.sheet_name)
+                continue
+            values = await ctx.bot.loop.run_in_executor(None, page.get_all_values)
+            # +1 to skip the heading row, +1 for 1-indexing
+            rows = [_answered_from_values(interview.id, i + 2, row) for i, row in enumerate(values[1:])]
+            rows = [row for row in rows if row is not None]
+            _index_answers(session, rows)
+            session.commit()
+            n_rows += len(rows)
+
+        await ctx.message.clear_reactions()
+        await ctx.message.add_reaction(ctx.bot.greentick)
+        reply = f"Indexed {n_rows} answers from {len(interviews) - len(missing)} interviews."
+        if missing:
+            reply += f"\nCouldn't find sheet pages for: " + ", ".join(f"`{name}`" for name in missing)
+        await ctx.send(reply[:2000])
+
+    @iv.command(name="export")
+    @_ck_server_active()
+    async def iv_export(self, ctx: commands.Context, member: discord.Member, fmt: str = "markdown"):
+        """
+        Export a member's past interviews as a Markdown or HTML transcript.
+
+        Use "html" as the last argument for HTML; defaults to Markdown. Only finished interviews are archived.
+        """
+        fmt = fmt.lower()
+        if fmt in {"md", "markdown"}:
+            render, extension = _transcript_markdown, "md"
+        elif fmt == "html":
+            render, extension = _transcript_html, "html"
         else:
-            current_qs = current_qs.num_questions
-        ls_past_qs = session.query(schema.Asker).filter_by(asker_id=member.id).all()
-        past_qs = 0
-        for asker in ls_past_qs:
-            past_qs += asker.num_questions
-
-        em.add_field(name="Questions asked this interview", value=str(current_qs))
-        em.add_field(name="Questions total", value=str(past_qs))
+            await ctx.send("Export format must be `markdown` or `html`.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+
+        session = session_maker()
+        interviews = (
+            session.query(schema.Interview, schema.ArchivedInterview)
+            .outerjoin(schema.ArchivedInterview, schema.ArchivedInterview.interview_id == schema.Interview.id)
+            .filter(schema.Interview.server_id == ctx.guild.id, schema.Interview.interviewee_id == member.id)
+            .order_by(schema.Interview.start_time)
+            .all()
+        )
+        if not any(archived is not None for _, archived in interviews):
+            await ctx.send(f"{member} has no archived interviews.")
+            return
+
+        def write_transcript() -> io.BytesIO:
+            # Rows are decompressed and rendered a chunk at a time, so only the output is ever held in full.
+            fp = io.BytesIO()
+            for chunk in render(str(member), interviews):
+                fp.write(chunk.encode("utf-8"))
+            fp.seek(0)
+            return fp
+
+        fp = await ctx.bot.loop.run_in_executor(None, write_transcript)
+        if fp.getbuffer().nbytes > MAX_EXPORT_SIZE:
+            await ctx.send(f"{member}'s transcript is too large to upload.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+        await ctx.send(file=discord.File(fp, f"{member.name} interviews.{extension}"))
+
+    @iv.command(name="archive")
+    @commands.is_owner()
+    @_ck_server_active()
+    async def iv_archive(self, ctx: commands.Context):
+        """
+        Archive every finished interview that isn't archived yet from its sheet page.
+
+        Only needed once, for interviews from before archiving existed; newer ones are archived by "iv next".
+        """
+        session = session_maker()
+        server = session.query(schema.Server).filter_by(id=ctx.guild.id).one_or_none()  # type: schema.Server
+        interviews = (
+            session.query(schema.Interview)
+            .outerjoin(schema.ArchivedInterview, schema.ArchivedInterview.interview_id == schema.Interview.id)
+            .filter(
+                schema.Interview.server_id == ctx.guild.id,
+                schema.Interview.current == False,
+                schema.ArchivedInterview.interview_id == None,
+            )
+            .all()
+        )  # type: List[schema.Interview]
+
+        await ctx.message.add_reaction(ctx.bot.waitemoji)
+        spreadsheet_ = await ctx.bot.loop.run_in_executor(None, self.connection.get_sheet, server.sheet_name)
+        missing = []
+        for interview in interviews:
+            try:
+                page = await ctx.bot.loop.run_in_executor(None, spreadsheet_.worksheet, interview.sheet_name)
+            except WorksheetNotFound:
+                missing.append(interview.sheet_name)
+                continue
+            values = await ctx.bot.loop.run_in_executor(None, page.get_all_values)
+            # Compressing a whole interview takes a while, so keep it off the event loop.
+            archived = await ctx.bot.loop.run_in_executor(
+                None, _archive_interview, interview.server_id, interview.id, values
+            )
+            session.merge(archived)
+            session.commit()
+
+        await ctx.message.clear_reactions()
+        await ctx.message.add_reaction(ctx.bot.greentick)
+        reply = f"Archived {len(interviews) - len(missing)} interviews."
+        if missing:
+            reply += f"\nCouldn't find sheet pages for: " + ", ".join(f"`{name}`" for name in missing)
+        await ctx.send(reply[:2000])
+
+    @iv.command(name="dupes")
+    @_ck_server_active()
+    async def iv_dupes(self, ctx: commands.Context):
+        """
+        List groups of similar questions asked this interview, so repeats can be answered together.
+
+        Only covers questions asked since the question queue was added.
+        """
+        session = session_maker()
+        interview = (
+            session.query(schema.Interview).filter_by(server_id=ctx.guild.id, current=True).one_or_none()
+        )  # type: Optional[schema.Interview]
+        if interview is None:
+            await ctx.send("There is no currently ongoing interview.")
+            await ctx.message.add_reaction(ctx.bot.redtick)
+            return
+        clusters = self._dupe_index(session, interview).clusters()
+        questions = {
+            queued.id: queued
+            for queued in session.query(schema.QueuedQuestion).filter(
+                schema.QueuedQuestion.id.in_([key for cluster in clusters[:DUPES_LIMIT] for key in cluster])
+            )
+        }  # type: Dict[int, schema.QueuedQuestion]
+        session.close()
+
+        interviewee = ctx.guild.get_member(interview.interviewee_id)
+        em = discord.Embed(
+            title=f"Similar questions in {_name_or_default(interviewee)}'s interview",
+            color=ctx.bot.user.color,
+        )
+        if not clusters:
+            em.description = "No repeats so far!"
+        for cluster in clusters[:DUPES_LIMIT]:
+            value = ""
+            for key in cluster:
+                asker = ctx.guild.get_member(questions[key].asker_id)
+                value += f"**{_name_or_default(asker)}**: {questions[key].question[:150]}\n"
+            em.add_field(name=f"{len(cluster)} similar questions", value=value[:1024], inline=False)
+        if len(clusters) > DUPES_LIMIT:
+            em.set_footer(text=f"...and {len(clusters) - DUPES_LIMIT} more groups")
         await ctx.send(embed=em)
 
+    @iv.group(name="queue", invoke_without_command=True)
+    @_ck_server_active()
+    async def iv_queue(self, ctx: commands.Context):
+        """
+        View questions that haven't made it onto the interview sheet yet.
+
+        Questions are uploaded in the background and retried while Sheets is having trouble. Failed uploads can be
+        requeued with "iv queue retry".
+        """
+        session = session_maker()
+        counts = dict(
+            session.query(schema.QueuedQuestion.status, func.count(schema.QueuedQuestion.id))
+            .filter_by(server_id=ctx.guild.id)
+            .group_by(schema.QueuedQuestion.status)
+            .all()
+        )  # type: Dict[str, int]
+        waiting = (
+            session.query(schema.QueuedQuestion)
+            .filter(
+                schema.QueuedQuestion.server_id == ctx.guild.id,
+                schema.QueuedQuestion.status.in_([schema.QUEUE_PENDING, schema.QUEUE_FAILED]),
+            )
+            .order_by(schema.QueuedQuestion.id)
+            .limit(SEARCH_LIMIT)
+            .all()
+        )  # type: List[schema.QueuedQuestion]
+        session.close()
+
+        em = discord.Embed(
+            title=f"Question queue for {ctx.guild}",
+            description=(
+                f"{counts.get(schema.QUEUE_PENDING, 0)} pending, {counts.get(schema.QUEUE_FAILED, 0)} failed, "
+                f"{counts.get(schema.QUEUE_SENT, 0)} sent."
+            ),
+            color=ctx.bot.user.color,
+        )
+        for queued in waiting:
+            asker = ctx.guild.get_member(queued.asker_id)
+            value = queued.question[:200] + ("..." if len(queued.question) > 200 else "")
+            if queued.error is not None:
+                value += f"\n*Attempt {queued.attempts}: {queued.error[:200]}*"
+            em.add_field(
+                name=f"{queued.status.capitalize()}: {_name_or_default(asker)}",
+                value=value,
+                inline=False,
+            )
+        await ctx.send(embed=em)
+
+    @iv_queue.command(name="retry")
+    @_ck_server_active()
+    async def iv_queue_retry(self, ctx: commands.Context):
+        """
+        Requeue every question that failed to upload.
+        """
+        session = session_maker()
+        num = (
+            session.query(schema.QueuedQuestion)
+            .filter_by(server_id=ctx.guild.id, status=schema.QUEUE_FAILED)
+            .update(
+                {"status": schema.QUEUE_PENDING, "attempts": 0, "next_attempt": datetime.utcnow()},
+                synchronize_session=False,
+            )
+        )
+        session.commit()
+        self._outbox_wakeup.set()
+        await ctx.message.add_reaction(ctx.bot.greentick)
+        await ctx.send(f"Requeued {num} questions.")
+
     # == Questions ==
 
+    @staticmethod
+    async def _rate_limited(ctx: commands.Context, limiter: ratelimit.Limiter) -> bool:
+        """
+        Count a use of a rate limited command, telling the invoker off if they're over the limit.
+        """
+        retry_after = limiter.hit(f"{ctx.guild.id}:{ctx.author.id}")
+        if retry_after <= 0:
+            return False
+        await ctx.send(f"Slow down! Try again in {ratelimit.format_wait(retry_after)}.")
+        await ctx.message.add_reaction(ctx.bot.redtick)
+        return True
+
     async def _ask_many(self, ctx: commands.Context, question_strs: List[str]):
         """
         Ask a bunch of questions at once. Or just one. Either way, use the batch upload command rather than
         doing it one at a time.
         """
-        session = session_maker()
-        interview = (
-            session.query(schema.Interview).filter_by(current=True, server_id=ctx.guild.id).one_or_none()
-        )  # type: Optional[schema.Interview]
-        interviewee = ctx.guild.get_member(interview.interviewee_id)
-        if interviewee is None:
-            await ctx.send(f"Couldn't find server member `{interview.interviewee_id}`.")
+        if await self._rate_limited(ctx, self.ask_limit):
             return
+        session = session_maker()
+        # Held while the asker's and the interview's counters are bumped, so a concurrent recount or answer can't
+        # commit over them.
+        async with self._interview_lock(ctx, write=True):
+            interview = (
+                session.query(schema.Interview).filter_by(current=True, server_id=ctx.guild.id).one_or_none()
+            )  # type: Optional[schema.Interview]
+            interviewee = ctx.guild.get_member(interview.interviewee_id)
+            if interviewee is None:
+                await ctx.send(f"Couldn't find server member `{interview.interviewee_id}`.")
+                return
 
-        asker_meta = None
-        for asker in interview.askers:
-            if asker.asker_id == ctx.author.id:
-                asker_meta = asker
-        if asker_meta is None:
-            asker_meta = schema.Asker(interview_id=interview.id, asker_id=ctx.author.id, num_questions=0)
-            session.add(asker_meta)
-
-        questions = []
-        for question_str in question_strs:
-            q = Question(
-                interviewee=interviewee,
-                asker=ctx.author,
-                question=question_str,
-                question_num=asker_meta.num_questions + 1,
-                server_id=ctx.guild.id,
-                channel_id=ctx.channel.id,
-                message_id=ctx.message.id,
-                # message=ctx.message,
-                # answer=,  # unfilled, obviously
-                timestamp=datetime.utcnow(),
-            )
+            asker_meta = None
+            for asker in interview.askers:
+                if asker.asker_id == ctx.author.id:
+                    asker_meta = asker
+            if asker_meta is None:
+                asker_meta = schema.Asker(interview_id=interview.id, asker_id=ctx.author.id, num_questions=0)
+                session.add(asker_meta)
+
+            questions = []
+            for question_str in question_strs:
+                q = Question(
+                    interviewee=interviewee,
+                    asker=ctx.author,
+                    question=question_str,
+                    question_num=asker_meta.num_questions + 1,
+                    server_id=ctx.guild.id,
+                    channel_id=ctx.channel.id,
+                    message_id=ctx.message.id,
+                    # message=ctx.message,
+                    # answer=,  # unfilled, obviously
+                    timestamp=datetime.utcnow(),
+                )
 
-            questions.append(q)
+                questions.append(q)
 
-            asker_meta.num_questions += 1
-            interview.questions_asked += 1
+                asker_meta.num_questions += 1
+                interview.questions_asked += 1
 
-        Question.upload_many(ctx, self.connection, questions)
+            # Sheets can be slow or down, so questions go to the outbox and get uploaded in the background.
+            dupe_index = self._dupe_index(session, interview)
+            queued = Question.queue_many(ctx, session, interview, questions)
+            session.commit()
+        self._outbox_wakeup.set()
 
-        session.commit()
+        repeats = {}  # type: Dict[int, List[Tuple[int, float]]]  # index in question_strs -> outbox rows it matches
+        for i, queued_question in enumerate(queued):
+            matches = dupe_index.add(queued_question.id, queued_question.question)
+            if matches:
+                repeats[i] = matches
 
         desc = (
             "\n".join(question_strs)[:1900] + "..."
@@ -1105,10 +2275,32 @@ class Interview(commands.Cog):
             name=f"New question from {ctx.author}",
             icon_url=ctx.author.avatar_url,
         )
+        if repeats:
+            originals = {
+                queued_question.id: queued_question
+                for queued_question in session.query(schema.QueuedQuestion).filter(
+                    schema.QueuedQuestion.id.in_([key for matches in repeats.values() for key, _ in matches])
+                )
+            }  # type: Dict[int, schema.QueuedQuestion]
+            value = ""
+            for i, matches in repeats.items():
+                original = originals[matches[0][0]]
+                asker = ctx.guild.get_member(original.asker_id)
+                value += (
+                    f"{question_strs[i][:100]}\n> {original.question[:100]} "
+                    f"({_name_or_default(asker)}, {matches[0][1]:.0%} similar)\n"
+                )
+            em.add_field(name="Possible repeats", value=value[:1024], inline=False)
         backstage = ctx.guild.get_channel(interview.server.back_channel)
         if backstage is None:
             await ctx.send(f"Backstage channel `{interview.server.back_channel}` not found for this server.")
-        await backstage.send(embed=em)
+        else:
+            lines = [
+                f"**{ctx.author}**: {q[:300] + '...' if len(q) > 300 else q} ([jump]({ctx.message.jump_url}))"
+                + (" *(possible repeat)*" if i in repeats else "")
+                for i, q in enumerate(question_strs)
+            ]
+            await self.backstage_digest.notify(BackstageNotice(backstage, em, em.title, lines))
 
         await ctx.message.add_reaction(ctx.bot.greentick)
 
@@ -1154,13 +2346,12 @@ class Interview(commands.Cog):
         logging.debug("records fetched")
 
         filtered_rows = []
-        filtered_cells = []
         for i, row in enumerate(rows):
             if row["Answer"] is not None and row["Answer"] != "" and row["Posted?"] == "FALSE":
-                filtered_rows.append(row)
-                filtered_cells.append({"range": f"H{i + 2}", "values": [[True]]})
+                # +2: one for the heading row, one for 1-indexing
+                filtered_rows.append((i + 2, row))
 
-        logging.debug("filtered cells")
+        logging.debug("filtered rows")
 
         # Note: Useful debug output, not convinced this is perfect yet.
         # print('\n=== raw rows ===\n')
@@ -1168,34 +2359,37 @@ class Interview(commands.Cog):
         # print(f'\n=== filtered ({len(filtered_rows)}) ===\n')
         # pprint.pprint(filtered_rows)
 
-        questions = [await Question.from_row(ctx, row) for row in filtered_rows]
+        # Askers who've left the server have to be fetched, so resolve them all at once rather than one by one.
+        questions = await asyncio.gather(*[Question.from_row(ctx, row, row_num=i) for i, row in filtered_rows])
 
         if len(questions) == 0:
             await ctx.send("No new questions to be answered.")
             return
 
-        n_sent = 0
         embeds = Interview._generate_embeds(interviewee=interviewee, interview=interview, questions=questions)
-        for embed in embeds:
-            if type(embed) is Question:
-                # question was too long
-                await channel.send(
-                    f"Question #{embed.question_num} or its answer from {embed.asker} was too long "
-                    f"to embed, please split it up and answer it manually."
-                )
-            else:
-                await channel.send(embed=embed)
-                n_sent += 1
-                logging.debug(f"sent {n_sent} answer embeds")
-        logging.debug("done sending answers")
 
         if preview_flag is True:
+            await AnswerPipeline(ctx.bot.loop, channel).run(embeds)
             return
 
-        # Update sheet and metadata if not previewing:
-        sheet.batch_update(filtered_cells)
-        interview.questions_answered += len(questions)
-        session.commit()
+        # Update sheet and metadata if not previewing; only count what actually got posted and flagged, even if
+        # posting fails, since anything unflagged will be posted again.
+        pipeline = AnswerPipeline(ctx.bot.loop, channel, sheet=sheet)
+        try:
+            await pipeline.run(embeds)
+        finally:
+            interview.questions_answered += len(pipeline.flagged)
+            _index_answers(session, [q.to_answered(interview.id) for q in pipeline.flagged])
+            session.commit()
+            unflagged = pipeline.unflagged
+            if unflagged:
+                rows = ", ".join(str(q.row_num) for q in unflagged)[:1500]
+                # Not to be mistaken for (or hide) whatever stopped the posting, if anything did.
+                with contextlib.suppress(discord.HTTPException):
+                    await ctx.send(
+                        f"Posted, but couldn't mark as posted on the sheet: rows {rows}. Tick them by hand, or "
+                        f"they'll be posted again next time."
+                    )
 
     @commands.command()
     @_ck_server_active()
@@ -1212,7 +2406,8 @@ class Interview(commands.Cog):
         channel = ctx.guild.get_channel(server.answer_channel)
 
         try:
-            await self._channel_answer(ctx, channel)
+            async with self._interview_lock(ctx, write=True):
+                await self._channel_answer(ctx, channel)
         except Exception as e:
             # this is bad practice but i don't know what the error is; it'll be removed later
             await ctx.message.add_reaction(ctx.bot.redtick)
@@ -1228,7 +2423,8 @@ class Interview(commands.Cog):
         """
         Preview answers, visible in the current channel.
         """
-        await self._channel_answer(ctx, ctx.channel, preview_flag=True)
+        async with self._interview_lock(ctx, write=True):
+            await self._channel_answer(ctx, ctx.channel, preview_flag=True)
         await ctx.message.add_reaction(ctx.bot.greentick)
 
     async def _imganswer(self, ctx: commands.Context, row_num: int, url: str, channel: discord.TextChannel):
@@ -1264,6 +2460,7 @@ class Interview(commands.Cog):
             message_id=row[10],
             answer=row[6],
             timestamp=row[1],
+            row_num=row_num,
         )
         add_question(em, question, 0)  # we're not checking length here
         em.set_footer(text=f"{n_answered + interview.questions_answered} questions answered (of {n_asked})")
@@ -1272,6 +2469,9 @@ class Interview(commands.Cog):
         if not preview_flag:
             interview.questions_answered += 1
             sheet.update_acell(f"H{row_num}", True)
+            answered = _answered_from_values(interview.id, row_num, row[:7] + ["TRUE"] + row[8:])
+            if answered is not None:
+                _index_answers(session, [answered])
             session.commit()
 
         await channel.send(embed=em)
@@ -1291,7 +2491,8 @@ class Interview(commands.Cog):
             channel = ctx.channel
         else:
             channel = ctx.guild.get_channel(server.answer_channel)
-        await self._imganswer(ctx, row_num, url, channel)
+        async with self._interview_lock(ctx, write=True):
+            await self._imganswer(ctx, row_num, url, channel)
 
     # == Manage audience members
 
@@ -1311,9 +2512,11 @@ class Interview(commands.Cog):
             await ctx.send(f"No audience role set up for {ctx.guild}.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
-        for mention in mentions:  # type: discord.Member
-            await mention.add_roles(audience_role, reason=f"enroled by grantstage command used by {ctx.author}.")
-        await ctx.message.add_reaction(ctx.bot.greentick)
+        reason = f"enroled by grantstage command used by {ctx.author}."
+        if await self._edit_audience(ctx, audience_role, mentions, add=True, reason=reason):
+            await ctx.message.add_reaction(ctx.bot.greentick)
+        else:
+            await ctx.message.add_reaction(ctx.bot.redtick)
 
     @commands.command()
     @_ck_server_active()
@@ -1331,9 +2534,11 @@ class Interview(commands.Cog):
             await ctx.send(f"No audience role set up for {ctx.guild}.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
-        for mention in mentions:  # type: discord.Member
-            await mention.remove_roles(audience_role, reason=f"revoked by revokestage command used by {ctx.author}.")
-        await ctx.message.add_reaction(ctx.bot.greentick)
+        reason = f"revoked by revokestage command used by {ctx.author}."
+        if await self._edit_audience(ctx, audience_role, mentions, add=False, reason=reason):
+            await ctx.message.add_reaction(ctx.bot.greentick)
+        else:
+            await ctx.message.add_reaction(ctx.bot.redtick)
 
     @commands.command()
     @_ck_server_active()
@@ -1375,9 +2580,11 @@ class Interview(commands.Cog):
             await ctx.send(f"No audience role set up for {ctx.guild}.")
             await ctx.message.add_reaction(ctx.bot.redtick)
             return
-        for member in audience_role.members:  # type: discord.Member
-            await member.remove_roles(audience_role, reason=f"clearstage used by {ctx.author}")
-        await ctx.message.add_reaction(ctx.bot.greentick)
+        reason = f"clearstage used by {ctx.author}"
+        if await self._edit_audience(ctx, audience_role, audience_role.members, add=False, reason=reason):
+            await ctx.message.add_reaction(ctx.bot.greentick)
+        else:
+            await ctx.message.add_reaction(ctx.bot.redtick)
 
     # == Votes ==
 
@@ -1464,6 +2671,8 @@ class Interview(commands.Cog):
         Rules are checked in order, so if you vote for five people, but the first three are illegal votes,
         none of your votes will count.
         """
+        if await self._rate_limited(ctx, self.vote_limit):
+            return
 
         session = session_maker()
         iv_meta = session.query(schema.Interview).filter_by(server_id=ctx.guild.id, current=True).one_or_none()
@@ -1677,7 +2886,8 @@ class Interview(commands.Cog):
 
         Use the --full flag to view who's voting for each candidate.
         """
-        await self._votals_in_channel(ctx, flag=flag, channel=ctx.channel)
+        async with self._interview_lock(ctx, write=False):
+            await self._votals_in_channel(ctx, flag=flag, channel=ctx.channel)
 
     @commands.group(invoke_without_command=True)
     @_ck_server_active()
@@ -1,7 +1,9 @@
 from typing import Iterable
 
 from sqlalchemy import Column, Integer, String, DateTime
-from sqlalchemy import ForeignKey, Boolean
+from sqlalchemy import ForeignKey, Boolean, Index, UniqueConstraint
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -54,6 +56,9 @@ class Interview(Base):
     # TODO: oh god there's so much more
     #  later edit: is there??? i think it may be good now
 
+    # Covers looking up someone's interviews on a server, in order (iv stats, past interview checks).
+    __table_args__ = (Index('ix_Interview_server_interviewee_start', 'server_id', 'interviewee_id', 'start_time'),)
+
     server = relationship('Server', back_populates='interviews')  # type: Server
     askers = relationship('Asker', back_populates='interview')  # type: Iterable[Asker]
 
@@ -95,7 +100,7 @@ class Asker(Base):
     __tablename__ = 'Asker'
     # server_id = Column(Integer, ForeignKey('Server.id'), primary_key=True)
     interview_id = Column(Integer, ForeignKey('Interview.id'), primary_key=True)
-    asker_id = Column(Integer, primary_key=True)
+    asker_id = Column(Integer, primary_key=True, index=True)  # indexed for per-member totals across interviews
     num_questions = Column(Integer)
 
     interview = relationship('Interview', back_populates='askers')  # type: Interview
@@ -104,6 +109,168 @@ class Asker(Base):
         return f'<Asker interview_id={self.interview_id}, asker_id={self.asker_id}, num_questions={self.num_questions}'
 
 
+class AnsweredQuestion(Base):
+    """
+    Local copy of an answered question, so past interviews can be searched without going through Sheets.
+
+    Backs the AnswerSearch full-text index (see create_search_index()).
+    """
+    __tablename__ = 'AnsweredQuestion'
+    id = Column(Integer, primary_key=True)  # auto-incremented primary key, also the FTS rowid
+    interview_id = Column(Integer, ForeignKey('Interview.id'))
+    row_num = Column(Integer)  # row on the interview's sheet page
+    asker_id = Column(Integer)
+    asker_name = Column(String)
+    question_num = Column(Integer)
+    question = Column(String)
+    answer = Column(String)
+    channel_id = Column(Integer)
+    message_id = Column(Integer)
+    timestamp = Column(DateTime)  # use utc timezone internally
+
+    __table_args__ = (UniqueConstraint('interview_id', 'row_num'),)
+
+    interview = relationship('Interview')  # type: Interview
+
+    def __repr__(self):
+        return (
+            f'<AnsweredQuestion id={self.id}, interview_id={self.interview_id}, row_num={self.row_num}, '
+            f'asker_id={self.asker_id}, question_num={self.question_num}>'
+        )
+
+
+class ArchivedInterview(Base):
+    """
+    Index of finished interviews snapshotted to local cold storage, one zstd-compressed JSON Lines file each.
+    """
+    __tablename__ = 'ArchivedInterview'
+    interview_id = Column(Integer, ForeignKey('Interview.id'), primary_key=True)
+    path = Column(String)
+    num_rows = Column(Integer)
+    num_answered = Column(Integer)
+    size = Column(Integer)  # compressed size, in bytes
+    archived_at = Column(DateTime)  # use utc timezone internally
+
+    interview = relationship('Interview')  # type: Interview
+
+    def __repr__(self):
+        return (
+            f'<ArchivedInterview interview_id={self.interview_id}, path={self.path}, num_rows={self.num_rows}, '
+            f'num_answered={self.num_answered}, size={self.size}, archived_at={self.archived_at}>'
+        )
+
+
+class InterviewTally(Base):
+    """
+    Running counts for an interview's sheet page, so recounts only re-read what could have changed.
+
+    Rows up to settled_rows are all posted; answered questions don't get un-posted in normal use, so recounts start
+    after them. The periodic full verification re-reads everything in case one was edited by hand.
+    """
+    __tablename__ = 'InterviewTally'
+    interview_id = Column(Integer, ForeignKey('Interview.id'), primary_key=True)
+    revision = Column(String)  # Drive version of the spreadsheet when last counted
+    settled_rows = Column(Integer)  # leading data rows (after the heading) that are all posted
+    asked = Column(Integer)
+    answered = Column(Integer)
+    counted_at = Column(DateTime)  # use utc timezone internally
+    verified_at = Column(DateTime)  # last full recount, use utc timezone internally
+
+    interview = relationship('Interview')  # type: Interview
+
+    def __repr__(self):
+        return (
+            f'<InterviewTally interview_id={self.interview_id}, revision={self.revision}, '
+            f'settled_rows={self.settled_rows}, asked={self.asked}, answered={self.answered}, '
+            f'counted_at={self.counted_at}, verified_at={self.verified_at}>'
+        )
+
+
+QUEUE_PENDING = 'pending'
+QUEUE_FAILED = 'failed'
+QUEUE_SENT = 'sent'
+
+
+class QueuedQuestion(Base):
+    """
+    Outbox of asked questions. Questions are saved here first and appended to the interview sheet in the background,
+    so asking never waits on Sheets. Sent questions are kept as a local record of everything asked.
+    """
+    __tablename__ = 'QueuedQuestion'
+    id = Column(Integer, primary_key=True)  # auto-incremented primary key, also the order rows go to the sheet in
+    server_id = Column(Integer, ForeignKey('Server.id'))
+    interview_id = Column(Integer, ForeignKey('Interview.id'))
+    asker_id = Column(Integer)
+    question = Column(String)
+    row = Column(String)  # JSON list, as from Question.to_row()
+    spreadsheet = Column(String)  # spreadsheet name
+    page = Column(String)  # page of the spreadsheet, i.e. Interview.sheet_name
+    status = Column(String, index=True)  # QUEUE_PENDING, QUEUE_FAILED or QUEUE_SENT
+    attempts = Column(Integer, default=0)
+    error = Column(String)  # last upload error
+    created_at = Column(DateTime)  # use utc timezone internally
+    next_attempt = Column(DateTime)  # use utc timezone internally
+    sent_at = Column(DateTime)  # use utc timezone internally
+
+    # Keep IDs increasing even after deletes, since they're the upload order.
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    interview = relationship('Interview')  # type: Interview
+
+    def __repr__(self):
+        return (
+            f'<QueuedQuestion id={self.id}, interview_id={self.interview_id}, asker_id={self.asker_id}, '
+            f'status={self.status}, attempts={self.attempts}, next_attempt={self.next_attempt}>'
+        )
+
+
+# SQLAlchemy can't declare virtual tables, so the FTS5 index over AnsweredQuestion is plain DDL. It's an
+# external-content table, so the text is only stored once; the triggers keep it in sync with AnsweredQuestion.
+_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS AnswerSearch USING fts5(
+        question, answer, asker_name, content='AnsweredQuestion', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS AnsweredQuestion_ai AFTER INSERT ON AnsweredQuestion BEGIN
+        INSERT INTO AnswerSearch(rowid, question, answer, asker_name)
+        VALUES (new.id, new.question, new.answer, new.asker_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS AnsweredQuestion_ad AFTER DELETE ON AnsweredQuestion BEGIN
+        INSERT INTO AnswerSearch(AnswerSearch, rowid, question, answer, asker_name)
+        VALUES ('delete', old.id, old.question, old.answer, old.asker_name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS AnsweredQuestion_au AFTER UPDATE ON AnsweredQuestion BEGIN
+        INSERT INTO AnswerSearch(AnswerSearch, rowid, question, answer, asker_name)
+        VALUES ('delete', old.id, old.question, old.answer, old.asker_name);
+        INSERT INTO AnswerSearch(rowid, question, answer, asker_name)
+        VALUES (new.id, new.question, new.answer, new.asker_name);
+    END
+    """,
+]
+
+
+def create_indexes(engine: Engine):
+    """
+    create_all() skips tables that already exist, indexes and all, so indexes added since a database was made have
+    to be created separately.
+    """
+    for table in (Interview.__table__, Asker.__table__):
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
+def create_search_index(engine: Engine):
+    with engine.begin() as conn:
+        for ddl in _SEARCH_DDL:
+            conn.execute(text(ddl))
+
+
 # TODO: reorganize InterviewMeta into a one(server)-to-many(metas), with a "current" boolean flag field
 #  to mark the current one. Also, merge IntervieweeStats in with that.
 # NOTE: could refactor TotalQuestions into a meta-per-asker table rather than *just* questions asked
@@ -4,7 +4,7 @@ from typing import Dict, List
 class Conf:
     def __init__(self, greentick_id: int = None, redtick_id: int = None, boostemoji_id: int = None,
                  waitemoji_id: int = None, plugins: List[str] = None, imgur_keys: Dict[str, str] = None,
-                 trusted: List[int] = None, google_email: str = None):
+                 trusted: List[int] = None, google_email: str = None, bulk_concurrency: int = 5):
         self.greentick_id = greentick_id
         self.redtick_id = redtick_id
         self.boostemoji_id = boostemoji_id
@@ -15,6 +15,9 @@ class Conf:
 
         self.google_email = google_email
 
+        # Max number of Discord API calls bulk operations (role resets, channel setup, etc.) keep in flight at once.
+        self.bulk_concurrency = bulk_concurrency
+
         # TODO: do stuff with this
         if trusted is not None:
             self.trusted = trusted
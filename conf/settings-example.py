@@ -45,6 +45,7 @@ conf = Conf(
     plugins=plugins,
     imgur_keys=imgur_keys,
     google_email='your-bot-here@your-bot-here.iam.gserviceaccount.com',
+    bulk_concurrency=5,  # max Discord API calls in flight for bulk operations like clearing roles
 )
 
 activity = None
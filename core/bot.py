@@ -12,6 +12,9 @@ from conf.conf import Conf
 
 # from core.checks import Checks
 from core.imgur import Imgur
+from core.member_index import MemberDirectory
+from core.ratelimit import RateLimits
+from core.scheduler import Scheduler
 
 
 class Bot(commands.Bot):
@@ -46,6 +49,16 @@ class Bot(commands.Bot):
         else:
             self.imgur = None
 
+        # Persistent timers shared by all cogs; see Scheduler.register().
+        self.scheduler = Scheduler(self)
+        self.scheduler.start()
+
+        # Rate limits for spam-prone commands; cogs declare theirs when they load.
+        self.ratelimits = RateLimits()
+
+        # Name -> member lookups for each guild, for anything resolving members from plain text.
+        self.member_index = MemberDirectory()
+
         # I don't like circular includes but there's a bunch of API methods that might need to be invoked
         # when checking commands.
         # TODO: implement
@@ -105,6 +118,23 @@ class Bot(commands.Bot):
 
         await super().on_message(message)
 
+    async def on_member_join(self, member: discord.Member):
+        self.member_index.member_added(member)
+
+    async def on_member_remove(self, member: discord.Member):
+        self.member_index.member_removed(member)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.nick != after.nick:
+            self.member_index.member_added(after)
+
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        if str(before) != str(after):
+            self.member_index.user_updated(after, self.guilds)
+
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.member_index.guild_removed(guild)
+
     async def wait_for_first(
         self, events: List[str], *, checks: Optional[List[Callable[..., bool]]] = None, timeout: float = None
     ) -> Tuple[Any, str]:
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import discord
+from discord.ext import commands
+
+DEFAULT_CONCURRENCY = 5
+PROGRESS_THRESHOLD = 10  # don't bother with a progress message for fewer items than this
+PROGRESS_INTERVAL = 2.0  # seconds between progress message edits; edits are rate limited too
+
+
+class BulkFailure(NamedTuple):
+    item: Any
+    error: Exception
+
+
+class BulkResult:
+    """
+    Outcome of a run_bulk() call.
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self.succeeded = []  # type: List[Any]
+        self.failed = []  # type: List[BulkFailure]
+
+    @property
+    def done(self) -> int:
+        return len(self.succeeded) + len(self.failed)
+
+    def failure_summary(self, describe: Callable[[Any], str] = str, limit: int = 10) -> str:
+        """
+        One line per failed item (up to <limit>), for reporting back to the invoker.
+        """
+        lines = [f"{describe(failure.item)}: {failure.error}" for failure in self.failed[:limit]]
+        if len(self.failed) > limit:
+            lines.append(f"...and {len(self.failed) - limit} more")
+        return "\n".join(lines)
+
+
+async def run_bulk(
+    items: Iterable[Any],
+    action: Callable[[Any], Awaitable[Any]],
+    limit: int = DEFAULT_CONCURRENCY,
+    progress: Optional[Callable[[BulkResult], Awaitable[None]]] = None,
+) -> BulkResult:
+    """
+    Await action(item) for every item, with at most <limit> in flight at once.
+
+    discord.py already queues requests per rate-limit bucket and sleeps through 429s, so the cap isn't there to pace
+    individual calls; it keeps a big batch from flooding that queue (and the global limit) all at once. Requests on
+    different buckets (e.g. edits to different channels) genuinely run in parallel.
+
+    Discord errors are collected in the result rather than stopping the run; anything else still raises.
+    """
+    items = list(items)
+    result = BulkResult(len(items))
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run_one(item):
+        async with semaphore:
+            try:
+                await action(item)
+            except discord.HTTPException as e:
+                logging.warning(f"bulk action failed for {item}: {e}")
+                result.failed.append(BulkFailure(item, e))
+            else:
+                result.succeeded.append(item)
+        if progress is not None:
+            await progress(result)
+
+    await asyncio.gather(*[run_one(item) for item in items])
+    return result
+
+
+class ProgressMessage:
+    """
+    A message that's edited to show the progress of a run_bulk() call; pass it in as the progress callback.
+
+    Plain text by default, or an embed (which also counts failures) with <embed>.
+    """
+
+    def __init__(
+        self, message: discord.Message, label: str, interval: float = PROGRESS_INTERVAL, embed: bool = False
+    ):
+        self.message = message
+        self.label = label
+        self.interval = interval
+        self.embed = embed
+        self._last_edit = time.monotonic()
+
+    @staticmethod
+    async def start(
+        ctx: commands.Context, label: str, total: int, embed: bool = False
+    ) -> Optional["ProgressMessage"]:
+        """
+        Post a progress message, unless the batch is too small to be worth one.
+        """
+        if total < PROGRESS_THRESHOLD:
+            return None
+        progress = ProgressMessage(None, label, embed=embed)
+        progress.message = await ctx.send(**progress._render(BulkResult(total)))
+        return progress
+
+    def _render(self, result: BulkResult) -> Dict[str, Any]:
+        if not self.embed:
+            return {"content": f"{self.label}: {result.done}/{result.total}"}
+        em = discord.Embed(title=self.label, description=f"{result.done}/{result.total}")
+        if result.failed:
+            em.add_field(name="Failed", value=str(len(result.failed)))
+        return {"embed": em}
+
+    async def __call__(self, result: BulkResult):
+        if result.done < result.total and time.monotonic() - self._last_edit < self.interval:
+            return
+        self._last_edit = time.monotonic()
+        try:
+            await self.message.edit(**self._render(result))
+        except discord.HTTPException:
+            # Progress is best-effort; the summary at the end is what matters.
+            pass
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+import discord
+
+STATUS_INTERVAL = 2.0  # seconds between status message edits
+RETRY_DELAY = 2.0  # seconds before the first retry; doubles each retry after that
+
+_PENDING = "\N{HOURGLASS WITH FLOWING SAND}"
+_RUNNING = "\N{CLOCKWISE RIGHTWARDS AND LEFTWARDS OPEN CIRCLE ARROWS}"
+_DONE = "\N{WHITE HEAVY CHECK MARK}"
+_FAILED = "\N{CROSS MARK}"
+_SKIPPED = "\N{BLACK RIGHT-POINTING DOUBLE TRIANGLE WITH VERTICAL BAR}"
+
+
+class JobStep:
+    """
+    One step of a Job. Steps run as soon as every step named in <after> has finished, concurrently with anything
+    else that's ready, and are retried up to <retries> times before failing the job.
+
+    Steps that get retried should be safe to run twice.
+    """
+
+    def __init__(
+        self, name: str, action: Callable[[], Awaitable[None]], after: Iterable[str] = (), retries: int = 2
+    ):
+        self.name = name
+        self.action = action
+        self.after = list(after)
+        self.retries = retries
+        self.status = _PENDING
+        self.attempts = 0
+        self.error = None  # type: Optional[Exception]
+        self.finished = asyncio.Event()
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status == _DONE
+
+    def __str__(self):
+        line = f"{self.status} {self.name}"
+        if self.attempts > 1:
+            line += f" (attempt {self.attempts})"
+        if self.error is not None and self.status == _FAILED:
+            line += f": {self.error}"
+        return line
+
+
+class Job:
+    """
+    A background job made of JobSteps, with its progress shown in a status message that's kept up to date.
+    """
+
+    def __init__(self, title: str, steps: List[JobStep], message: discord.Message):
+        self.title = title
+        self.steps = {step.name: step for step in steps}  # type: Dict[str, JobStep]
+        self.message = message
+        self.done = False
+        self._last_edit = 0.0
+
+    @property
+    def failed(self) -> bool:
+        return any(step.status in {_FAILED, _SKIPPED} for step in self.steps.values())
+
+    def status_text(self) -> str:
+        if not self.done:
+            heading = f"**{self.title}**"
+        elif self.failed:
+            heading = f"**{self.title}** failed"
+        else:
+            heading = f"**{self.title}** done"
+        return heading + "\n" + "\n".join(str(step) for step in self.steps.values())
+
+    async def _update_status(self, force: bool = False):
+        if not force and time.monotonic() - self._last_edit < STATUS_INTERVAL:
+            return
+        self._last_edit = time.monotonic()
+        try:
+            await self.message.edit(content=self.status_text())
+        except discord.HTTPException:
+            # Status is best-effort.
+            pass
+
+    async def _run_step(self, step: JobStep):
+        for name in step.after:
+            await self.steps[name].finished.wait()
+        try:
+            if not all(self.steps[name].succeeded for name in step.after):
+                step.status = _SKIPPED
+                return
+            step.status = _RUNNING
+            while True:
+                step.attempts += 1
+                await self._update_status()
+                try:
+                    await step.action()
+                except Exception as e:
+                    step.error = e
+                    logging.exception(f"{self.title}: step '{step.name}' failed (attempt {step.attempts})")
+                    if step.attempts > step.retries:
+                        step.status = _FAILED
+                        return
+                    await asyncio.sleep(RETRY_DELAY * 2 ** (step.attempts - 1))
+                else:
+                    step.status = _DONE
+                    return
+        finally:
+            step.finished.set()
+            await self._update_status()
+
+    async def run(self) -> bool:
+        """
+        Run every step, returning whether they all succeeded.
+        """
+        await self._update_status(force=True)
+        try:
+            await asyncio.gather(*[self._run_step(step) for step in self.steps.values()])
+        finally:
+            # Even if it's cancelled, so whatever checks for a running job isn't stuck thinking this one still is.
+            self.done = True
+        await self._update_status(force=True)
+        return not self.failed
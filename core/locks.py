@@ -0,0 +1,122 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Hashable, Set
+
+
+class RWLock:
+    """
+    Async readers-writer lock: any number of readers at once, or a single writer.
+
+    Writers are served strictly in the order they asked, and once one is waiting, new readers queue up behind it, so
+    a steady stream of readers can't starve writers.
+    """
+
+    def __init__(self):
+        self._cond = asyncio.Condition()
+        self._readers = 0
+        self._next_ticket = 0  # handed to the next writer to ask
+        self._serving = 0  # ticket of the writer that holds the lock, or is next up to
+        self._abandoned = set()  # type: Set[int]  # tickets of writers that gave up waiting
+
+    @property
+    def writers(self) -> int:
+        """
+        Writers holding or waiting on the lock.
+        """
+        return self._next_ticket - self._serving - len(self._abandoned)
+
+    @property
+    def readers(self) -> int:
+        return self._readers
+
+    def _advance(self):
+        self._serving += 1
+        while self._serving in self._abandoned:
+            self._abandoned.remove(self._serving)
+            self._serving += 1
+
+    async def acquire_read(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._serving == self._next_ticket)
+            self._readers += 1
+
+    async def release_read(self):
+        async with self._cond:
+            self._readers -= 1
+            self._cond.notify_all()
+
+    async def acquire_write(self):
+        async with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            try:
+                await self._cond.wait_for(lambda: self._serving == ticket and self._readers == 0)
+            except BaseException:
+                # Cancelled while waiting; don't leave everyone behind waiting on this ticket.
+                if self._serving == ticket:
+                    self._advance()
+                    self._cond.notify_all()
+                else:
+                    self._abandoned.add(ticket)
+                raise
+
+    async def release_write(self):
+        async with self._cond:
+            self._advance()
+            self._cond.notify_all()
+
+
+class KeyedRWLock:
+    """
+    An RWLock per key (e.g. per guild ID), made on demand and dropped again once nothing is using it.
+    """
+
+    def __init__(self):
+        self._locks = {}  # type: Dict[Hashable, RWLock]
+        self._users = {}  # type: Dict[Hashable, int]
+
+    def busy(self, key: Hashable, write: bool = False) -> bool:
+        """
+        Whether reading (or writing) <key> right now would have to wait.
+        """
+        lock = self._locks.get(key)
+        if lock is None:
+            return False
+        return lock.writers > 0 or (write and lock.readers > 0)
+
+    def _checkout(self, key: Hashable) -> RWLock:
+        if key not in self._locks:
+            self._locks[key] = RWLock()
+            self._users[key] = 0
+        self._users[key] += 1
+        return self._locks[key]
+
+    def _checkin(self, key: Hashable):
+        self._users[key] -= 1
+        if self._users[key] == 0:
+            del self._locks[key]
+            del self._users[key]
+
+    @asynccontextmanager
+    async def read(self, key: Hashable) -> AsyncIterator[None]:
+        lock = self._checkout(key)
+        try:
+            await lock.acquire_read()
+            try:
+                yield
+            finally:
+                await lock.release_read()
+        finally:
+            self._checkin(key)
+
+    @asynccontextmanager
+    async def write(self, key: Hashable) -> AsyncIterator[None]:
+        lock = self._checkout(key)
+        try:
+            await lock.acquire_write()
+            try:
+                yield
+            finally:
+                await lock.release_write()
+        finally:
+            self._checkin(key)
@@ -0,0 +1,167 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+from utils.search import trigrams
+
+SUGGEST_LIMIT = 3  # suggestions per unresolved name
+SUGGEST_THRESHOLD = 0.4  # minimum trigram similarity for a suggestion
+
+
+class MemberIndex:
+    """
+    One guild's members, looked up by name.
+
+    Exact lookups (name#discriminator, name, nickname) are dict hits instead of Guild.get_member_named()'s scan over
+    every member, and a trigram index over names and nicknames finds the closest matches for names that don't
+    resolve, which are usually typos.
+    """
+
+    def __init__(self, members: Iterable[discord.Member] = ()):
+        self._members = {}  # type: Dict[int, discord.Member]
+        self._keys = {}  # type: Dict[int, Tuple[str, ...]]  # member ID -> the exact keys it's indexed under
+        self._tags = {}  # type: Dict[str, int]
+        self._names = {}  # type: Dict[str, Set[int]]
+        self._nicks = {}  # type: Dict[str, Set[int]]
+        self._grams = {}  # type: Dict[str, Set[Tuple[int, int]]]  # trigram -> (member ID, 0 for name/1 for nick)
+        self._member_grams = {}  # type: Dict[int, Tuple[Set[str], ...]]  # member ID -> trigrams of name[, nick]
+        for member in members:
+            self.add(member)
+
+    def __len__(self):
+        return len(self._members)
+
+    def add(self, member: discord.Member):
+        """
+        Index <member>, replacing whatever it was indexed as before (e.g. after a name or nickname change).
+        """
+        if member.id in self._members:
+            self.remove(member.id)
+        self._members[member.id] = member
+        self._keys[member.id] = (str(member), member.name, member.nick)
+        self._tags[str(member)] = member.id
+        self._names.setdefault(member.name, set()).add(member.id)
+        if member.nick is not None:
+            self._nicks.setdefault(member.nick, set()).add(member.id)
+
+        names = (member.name,) if member.nick is None else (member.name, member.nick)
+        self._member_grams[member.id] = tuple(trigrams(name) for name in names)
+        for which, grams in enumerate(self._member_grams[member.id]):
+            for gram in grams:
+                self._grams.setdefault(gram, set()).add((member.id, which))
+
+    def remove(self, member_id: int):
+        if member_id not in self._members:
+            return
+        del self._members[member_id]
+        tag, name, nick = self._keys.pop(member_id)
+        self._tags.pop(tag, None)
+        self._discard(self._names, name, member_id)
+        if nick is not None:
+            self._discard(self._nicks, nick, member_id)
+        for which, grams in enumerate(self._member_grams.pop(member_id)):
+            for gram in grams:
+                self._discard(self._grams, gram, (member_id, which))
+
+    @staticmethod
+    def _discard(index: Dict[str, set], key: str, value):
+        values = index.get(key)
+        if values is None:
+            return
+        values.discard(value)
+        if not values:
+            del index[key]
+
+    def _first(self, ids: Optional[Set[int]]) -> Optional[discord.Member]:
+        if not ids:
+            return None
+        # Lowest ID, so a name shared by several members always resolves to the same one.
+        return self._members[min(ids)]
+
+    def resolve(self, name: str) -> Optional[discord.Member]:
+        """
+        "name#discriminator" if it looks like one, then an exact, case-sensitive username or nickname, like
+        Guild.get_member_named(). That takes whichever matching member comes first in the member cache; this prefers
+        a username match over a nickname one, and the lowest ID among those, so the answer doesn't depend on cache
+        order.
+        """
+        if len(name) > 5 and name[-5] == "#":
+            member_id = self._tags.get(name)
+            if member_id is not None:
+                return self._members[member_id]
+        return self._first(self._names.get(name)) or self._first(self._nicks.get(name))
+
+    def suggest(
+        self, name: str, limit: int = SUGGEST_LIMIT, threshold: float = SUGGEST_THRESHOLD
+    ) -> List[Tuple[discord.Member, float]]:
+        """
+        Members whose name or nickname is closest to <name>, with their similarity (0-1), best first.
+
+        Only members sharing a trigram with <name> are scored at all, so this doesn't scan the whole guild either.
+        """
+        if len(name) > 5 and name[-5] == "#":
+            name = name[:-5]
+        grams = trigrams(name)
+        shared = {}  # type: Dict[Tuple[int, int], int]
+        for gram in grams:
+            for key in self._grams.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+
+        # Dice coefficient against the name and the nickname separately, keeping whichever is closer.
+        best = {}  # type: Dict[int, float]
+        for (member_id, which), count in shared.items():
+            score = 2 * count / (len(grams) + len(self._member_grams[member_id][which]))
+            best[member_id] = max(score, best.get(member_id, 0.0))
+
+        scored = [(self._members[member_id], score) for member_id, score in best.items() if score >= threshold]
+        scored.sort(key=lambda match: (-match[1], str(match[0])))
+        return scored[:limit]
+
+
+class MemberDirectory:
+    """
+    A MemberIndex per guild, built the first time it's needed and kept current from member events after that.
+
+    Without the members intent, guilds are never chunked and those events mostly don't arrive, while members still
+    come and go from the cache. So an index is also rebuilt whenever its size no longer matches the guild's member
+    cache, which is far cheaper to check than to rebuild every time.
+    """
+
+    def __init__(self):
+        self._indexes = {}  # type: Dict[int, MemberIndex]
+
+    def index(self, guild: discord.Guild) -> MemberIndex:
+        members = guild.members
+        index = self._indexes.get(guild.id)
+        if index is None or len(index) != len(members):
+            index = self._indexes[guild.id] = MemberIndex(members)
+        return index
+
+    def resolve(self, guild: discord.Guild, name: str) -> Optional[discord.Member]:
+        return self.index(guild).resolve(name)
+
+    def suggest(self, guild: discord.Guild, name: str, limit: int = SUGGEST_LIMIT) -> List[discord.Member]:
+        return [member for member, _ in self.index(guild).suggest(name, limit=limit)]
+
+    def member_added(self, member: discord.Member):
+        index = self._indexes.get(member.guild.id)
+        if index is not None:
+            index.add(member)
+
+    def member_removed(self, member: discord.Member):
+        index = self._indexes.get(member.guild.id)
+        if index is not None:
+            index.remove(member.id)
+
+    def user_updated(self, user: discord.User, guilds: Iterable[discord.Guild]):
+        """
+        Usernames and discriminators are per user rather than per member, so re-index the user in every guild.
+        """
+        for guild in guilds:
+            index = self._indexes.get(guild.id)
+            member = guild.get_member(user.id)
+            if index is not None and member is not None:
+                index.add(member)
+
+    def guild_removed(self, guild: discord.Guild):
+        self._indexes.pop(guild.id, None)
@@ -0,0 +1,243 @@
+import json
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import Column, Float, String, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+DB_DIR = "databases"
+DB_FILE = f"{DB_DIR}/ratelimit.db"
+
+Base = declarative_base()
+
+
+class LimiterState(Base):
+    __tablename__ = 'LimiterState'
+    limiter = Column(String, primary_key=True)  # Limiter.name
+    key = Column(String, primary_key=True)  # JSON
+    state = Column(String)  # JSON, as from Limiter._dump()
+    touched = Column(Float)  # unix time
+
+    def __repr__(self):
+        return f'<LimiterState limiter={self.limiter}, key={self.key}, state={self.state}, touched={self.touched}>'
+
+
+class Limiter:
+    """
+    Rate limit per key (e.g. per user ID). Checks are O(1), and keys nobody has hit for long enough to have fully
+    reset are dropped, oldest first, as a side effect of other checks.
+
+    Declared with RateLimits.declare(), and <persist>-ed, state is also written through to SQLite and survives
+    restarts and cog reloads. Keys must then be JSON-able (ints and strings).
+    """
+
+    def __init__(self, name: str, persist: bool = False, clock: Callable[[], float] = time.time):
+        self.name = name
+        self.persist = persist
+        self.clock = clock
+        self._states = OrderedDict()  # type: OrderedDict[Hashable, Tuple[float, Any]]  # key -> (touched, state)
+        self._session_maker = None  # type: Optional[Callable]
+
+    @property
+    def idle_after(self) -> float:
+        """
+        Seconds after which an untouched key is back to a fresh state, and can be forgotten.
+        """
+        raise NotImplementedError
+
+    def _fresh(self) -> Any:
+        raise NotImplementedError
+
+    def _check(self, state: Any, now: float, take: bool) -> Tuple[Any, float]:
+        """
+        Returns (new state, 0) if a hit is allowed now, or (state, seconds until it would be) if not. Only counts
+        the hit in the new state if <take>.
+        """
+        raise NotImplementedError
+
+    def _dump(self, state: Any) -> Any:
+        return state
+
+    def _load(self, data: Any) -> Any:
+        return data
+
+    def _expire(self, now: float):
+        while self._states:
+            key, (touched, _) = next(iter(self._states.items()))
+            if now - touched < self.idle_after:
+                break
+            del self._states[key]
+
+    def _state(self, key: Hashable, now: float) -> Any:
+        self._expire(now)
+        if key in self._states:
+            return self._states[key][1]
+        return self._fresh()
+
+    def hit(self, key: Hashable) -> float:
+        """
+        Count a hit for <key> if it's allowed. Returns 0 if it was, otherwise the seconds until one would be.
+        """
+        now = self.clock()
+        state, retry_after = self._check(self._state(key, now), now, take=True)
+        if retry_after > 0:
+            return retry_after
+        self._states[key] = (now, state)
+        self._states.move_to_end(key)
+        if self.persist and self._session_maker is not None:
+            self._save(key, now, state)
+        return 0.0
+
+    def peek(self, key: Hashable) -> float:
+        """
+        Like hit(), without counting anything.
+        """
+        now = self.clock()
+        return self._check(self._state(key, now), now, take=False)[1]
+
+    def reset(self, key: Hashable):
+        self._states.pop(key, None)
+        if self.persist and self._session_maker is not None:
+            session = self._session_maker()
+            session.query(LimiterState).filter_by(limiter=self.name, key=json.dumps(key)).delete()
+            session.commit()
+            session.close()
+
+    def _save(self, key: Hashable, now: float, state: Any):
+        session = self._session_maker()
+        session.merge(
+            LimiterState(limiter=self.name, key=json.dumps(key), state=json.dumps(self._dump(state)), touched=now)
+        )
+        session.commit()
+        session.close()
+
+    def _restore(self, session_maker: Callable):
+        """
+        Load this limiter's persisted state, throwing out whatever has gone idle since.
+        """
+        self._session_maker = session_maker
+        now = self.clock()
+        session = session_maker()
+        query = session.query(LimiterState).filter_by(limiter=self.name)
+        query.filter(LimiterState.touched <= now - self.idle_after).delete()
+        for row in query.order_by(LimiterState.touched):
+            self._states[json.loads(row.key)] = (row.touched, self._load(json.loads(row.state)))
+        session.commit()
+        session.close()
+
+
+class SlidingWindow(Limiter):
+    """
+    At most <limit> hits in any <per> seconds.
+
+    Exact rather than approximated: each key keeps the times of its last <limit> hits, oldest first, so the oldest
+    one is the only one that ever needs checking.
+    """
+
+    def __init__(self, name: str, limit: int, per: float, **kwargs):
+        super().__init__(name, **kwargs)
+        self.limit = limit
+        self.per = per
+
+    @property
+    def idle_after(self) -> float:
+        return self.per
+
+    def _fresh(self) -> Deque[float]:
+        return deque(maxlen=self.limit)
+
+    def _check(self, state: Deque[float], now: float, take: bool) -> Tuple[Deque[float], float]:
+        if len(state) == self.limit and now - state[0] < self.per:
+            return state, state[0] + self.per - now
+        if take:
+            state.append(now)  # pushes the oldest out once full
+        return state, 0.0
+
+    def _dump(self, state: Deque[float]) -> Any:
+        return list(state)
+
+    def _load(self, data: Any) -> Deque[float]:
+        return deque(data, maxlen=self.limit)
+
+
+class TokenBucket(Limiter):
+    """
+    Bursts of up to <capacity> hits, refilling at <capacity> per <per> seconds.
+
+    Better than a window for things that are fine in a burst but not sustained, like inline lookups.
+    """
+
+    def __init__(self, name: str, capacity: int, per: float, **kwargs):
+        super().__init__(name, **kwargs)
+        self.capacity = capacity
+        self.per = per
+        self.rate = capacity / per  # tokens per second
+
+    @property
+    def idle_after(self) -> float:
+        return self.per
+
+    def _fresh(self) -> Tuple[float, float]:
+        return float(self.capacity), self.clock()  # (tokens, as of)
+
+    def _check(self, state: Tuple[float, float], now: float, take: bool) -> Tuple[Tuple[float, float], float]:
+        tokens, updated = state
+        tokens = min(float(self.capacity), tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            return state, (1 - tokens) / self.rate
+        if take:
+            tokens -= 1
+        return (tokens, now), 0.0
+
+    def _dump(self, state: Tuple[float, float]) -> Any:
+        return list(state)
+
+    def _load(self, data: Any) -> Tuple[float, float]:
+        return data[0], data[1]
+
+
+class RateLimits:
+    """
+    Registry of the bot's limiters, and the database persistent ones keep their state in.
+    """
+
+    def __init__(self, db_file: str = DB_FILE):
+        self._db_file = db_file
+        self._session_maker = None  # type: Optional[Callable]
+        self._limiters = {}  # type: Dict[str, Limiter]
+
+    def _sessions(self) -> Callable:
+        if self._session_maker is None:
+            Path(self._db_file).parent.mkdir(exist_ok=True)
+            engine = create_engine(f"sqlite:///{self._db_file}")
+            Base.metadata.create_all(engine)
+            self._session_maker = sessionmaker(bind=engine)
+        return self._session_maker
+
+    def declare(self, limiter: Limiter) -> Limiter:
+        """
+        Register <limiter>, restoring its state if it's persistent, and return it. Declaring the same name again
+        (e.g. when a cog reloads) returns the existing limiter, state and all.
+        """
+        if limiter.name in self._limiters:
+            return self._limiters[limiter.name]
+        if limiter.persist:
+            limiter._restore(self._sessions())
+        self._limiters[limiter.name] = limiter
+        return limiter
+
+    def __getitem__(self, name: str) -> Limiter:
+        return self._limiters[name]
+
+
+def format_wait(seconds: float) -> str:
+    """
+    h:mm:ss, for telling people how long until they can try again.
+    """
+    seconds = int(seconds + 0.999)
+    hours, rem = divmod(seconds, 3600)
+    mins, secs = divmod(rem, 60)
+    return f"{hours}:{mins:02}:{secs:02}"
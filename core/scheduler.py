@@ -0,0 +1,168 @@
+import asyncio
+import heapq
+import json
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from discord.ext import commands
+from sqlalchemy import Column, DateTime, Integer, String, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+DB_DIR = "databases"
+DB_FILE = f"{DB_DIR}/scheduler.db"
+
+# A failed job is retried after RETRY_DELAY, doubling each time, and dropped after MAX_ATTEMPTS.
+RETRY_DELAY = timedelta(minutes=1)
+MAX_ATTEMPTS = 5
+
+Base = declarative_base()
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class ScheduledJob(Base):
+    __tablename__ = 'ScheduledJob'
+    id = Column(Integer, primary_key=True)
+    kind = Column(String)  # name the handler was registered under
+    due = Column(DateTime, index=True)  # use utc timezone internally
+    payload = Column(String)  # JSON, passed to the handler
+    attempts = Column(Integer, default=0)  # failed runs so far
+
+    # IDs must never be reused, or a cancelled job's heap entry could fire whatever job took its ID.
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    def __repr__(self):
+        return (
+            f'<ScheduledJob id={self.id}, '
+            f'kind={self.kind}, '
+            f'due={self.due}, '
+            f'payload={self.payload}, '
+            f'attempts={self.attempts}>'
+        )
+
+
+class Scheduler:
+    """
+    Persistent timers, serviced by a single task.
+
+    Jobs are stored in SQLite and mirrored in a heap ordered by due time, so pending jobs cost a row and a tuple each
+    rather than a sleeping coroutine, and survive restarts: anything that came due while the bot was down runs as
+    soon as it's back up.
+
+    Cogs register a handler for a job kind when they load, then schedule jobs of that kind with a JSON-able payload.
+    Jobs whose handler isn't registered (e.g. their cog isn't loaded) wait until it is. A job whose handler raises is
+    kept and retried with backoff, up to MAX_ATTEMPTS runs in all.
+    """
+
+    def __init__(self, bot: commands.Bot, db_file: str = DB_FILE):
+        self.bot = bot
+        Path(db_file).parent.mkdir(exist_ok=True)
+        engine = create_engine(f"sqlite:///{db_file}")
+        Base.metadata.create_all(engine)
+        self._session_maker = sessionmaker(bind=engine)
+
+        self._handlers = {}  # type: Dict[str, Handler]
+        self._heap = []  # type: List[Tuple[datetime, int, str]]
+        self._unclaimed = {}  # type: Dict[str, List[Tuple[datetime, int, str]]]  # jobs waiting on a handler
+        self._wakeup = asyncio.Event()
+        self._task = None  # type: Optional[asyncio.Task]
+
+    def start(self):
+        """
+        Re-arm every pending job from the database and start servicing them.
+        """
+        session = self._session_maker()
+        self._heap = [(job.due, job.id, job.kind) for job in session.query(ScheduledJob).all()]
+        heapq.heapify(self._heap)
+        session.close()
+        self._task = self.bot.loop.create_task(self._run())
+
+    def register(self, kind: str, handler: Handler):
+        self._handlers[kind] = handler
+        for entry in self._unclaimed.pop(kind, []):
+            heapq.heappush(self._heap, entry)
+        self._wakeup.set()
+
+    def schedule(self, kind: str, due: datetime, payload: Dict[str, Any]) -> int:
+        """
+        Run the <kind> handler with <payload> at <due> (utc). Returns the job ID, for cancelling.
+        """
+        session = self._session_maker()
+        job = ScheduledJob(kind=kind, due=due, payload=json.dumps(payload))
+        session.add(job)
+        session.commit()
+        job_id = job.id
+        session.close()
+
+        heapq.heappush(self._heap, (due, job_id, kind))
+        # Wake the timer in case this job is due before whatever it's currently waiting on.
+        self._wakeup.set()
+        return job_id
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a pending job. Its heap entry is just skipped when it comes up.
+        """
+        session = self._session_maker()
+        deleted = session.query(ScheduledJob).filter_by(id=job_id).delete()
+        session.commit()
+        session.close()
+        return deleted > 0
+
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            due, job_id, kind = self._heap[0]
+            delay = (due - datetime.utcnow()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            if kind not in self._handlers:
+                self._unclaimed.setdefault(kind, []).append((due, job_id, kind))
+                continue
+            # Run handlers in their own task so a slow one doesn't hold up the timer.
+            self.bot.loop.create_task(self._fire(job_id))
+
+    async def _fire(self, job_id: int):
+        session = self._session_maker()
+        job = session.query(ScheduledJob).filter_by(id=job_id).one_or_none()  # type: Optional[ScheduledJob]
+        if job is None:
+            # cancelled
+            session.close()
+            return
+        kind, payload, attempts = job.kind, job.payload, (job.attempts or 0) + 1
+        session.close()
+        try:
+            await self._handlers[kind](json.loads(payload))
+        except Exception:
+            logging.exception(f"scheduled job {job} failed (attempt {attempts} of {MAX_ATTEMPTS})")
+            if attempts < MAX_ATTEMPTS:
+                self._retry(job_id, kind, attempts)
+                return
+            logging.error(f"giving up on scheduled job {job}")
+        session = self._session_maker()
+        session.query(ScheduledJob).filter_by(id=job_id).delete()
+        session.commit()
+        session.close()
+
+    def _retry(self, job_id: int, kind: str, attempts: int):
+        due = datetime.utcnow() + RETRY_DELAY * 2 ** (attempts - 1)
+        session = self._session_maker()
+        # Matches nothing if the job was cancelled while it ran.
+        updated = session.query(ScheduledJob).filter_by(id=job_id).update({"due": due, "attempts": attempts})
+        session.commit()
+        session.close()
+        if updated:
+            heapq.heappush(self._heap, (due, job_id, kind))
+            self._wakeup.set()
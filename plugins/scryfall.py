@@ -18,6 +18,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSessio
 from sqlalchemy.future import select
 from sqlalchemy.orm import sessionmaker
 
+from core import ratelimit
 from core.bot import Bot
 from schemas.scryfall_schema import ScryfallText, Base
 
@@ -26,6 +27,9 @@ SCRYFALL_SEARCH_ENDPOINT = "https://api.scryfall.com/cards/search"
 SCRYFALL_CARD_ID_ENDPOINT = "https://api.scryfall.com/cards"
 YGOPRO_ENDPOINT = "https://db.ygoprodeck.com/api/v7/cardinfo.php"
 
+INLINE_BURST = 5  # inline card lookups allowed per channel in a burst...
+INLINE_PER = 60.0  # ...refilling over this many seconds
+
 
 # NOTE: You probably don't want to be running this module on your instance. It has a bit of
 #  custom code that really doesn't serve any purposes but my own. It won't hurt you if you do
@@ -74,6 +78,7 @@ class Cards(commands.Cog):
         self.bot = bot
         self.session = session
         self.db: AsyncEngine = create_async_engine(f"sqlite+aiosqlite:///{db_file}")
+        self.inline_limit = bot.ratelimits.declare(ratelimit.TokenBucket("card_inline", INLINE_BURST, INLINE_PER))
 
     def db_session(self):
         return sessionmaker(self.db, expire_on_commit=False, class_=AsyncSession)
@@ -108,6 +113,9 @@ class Cards(commands.Cog):
             expr = match.group(1)
         else:
             return False
+        if self.inline_limit.hit(message.channel.id) > 0:
+            # Over the limit; swallow it quietly rather than adding to the spam.
+            return True
         resp = scryfall_search(expr)
         if len(resp.cards) == 0:
             return False
@@ -128,6 +136,8 @@ class Cards(commands.Cog):
         match = re.search(ygo_regex, message.content)
         if not match:
             return False
+        if self.inline_limit.hit(message.channel.id) > 0:
+            return True
         ctx = await self.bot.get_context(message)
         return await self._ygo(ctx, match.group(1), text_only=True)
 
@@ -0,0 +1,62 @@
+import io
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Union
+
+import zstandard
+
+COMPRESSION_LEVEL = 10
+
+
+def _dumps(row: Dict[str, Any]) -> bytes:
+    return (json.dumps(row, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def write_jsonl(path: Union[str, Path], rows: Iterable[Dict[str, Any]]) -> int:
+    """
+    Write rows as zstd-compressed JSON Lines, replacing anything already at <path>.
+
+    Written to a temporary file first so a crash never leaves a half-written archive behind.
+    Returns the number of rows written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    n_rows = 0
+    with open(tmp_path, "wb") as fp:
+        with zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).stream_writer(fp, closefd=False) as writer:
+            for row in rows:
+                writer.write(_dumps(row))
+                n_rows += 1
+    os.replace(tmp_path, path)
+    return n_rows
+
+
+def append_jsonl(path: Union[str, Path], rows: Iterable[Dict[str, Any]]) -> int:
+    """
+    Append rows to a zstd-compressed JSON Lines file as a new zstd frame.
+
+    Frames are independent, so appending never rewrites what's already on disk; read_jsonl() reads across them.
+    Returns the number of rows written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n_rows = 0
+    with open(path, "ab") as fp:
+        with zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).stream_writer(fp, closefd=False) as writer:
+            for row in rows:
+                writer.write(_dumps(row))
+                n_rows += 1
+    return n_rows
+
+
+def read_jsonl(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily read rows back out of a file written by write_jsonl() or append_jsonl().
+    """
+    with open(path, "rb") as fp:
+        reader = zstandard.ZstdDecompressor().stream_reader(fp, read_across_frames=True)
+        for line in io.TextIOWrapper(reader, encoding="utf-8"):
+            if line.strip():
+                yield json.loads(line)
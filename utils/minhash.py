@@ -0,0 +1,146 @@
+import hashlib
+import random
+import re
+from typing import Dict, Hashable, List, Set, Tuple
+
+NUM_PERM = 64  # hash functions per signature
+BANDS = 16  # LSH bands; NUM_PERM must divide evenly into them
+SHINGLE_SIZE = 3  # characters per shingle
+THRESHOLD = 0.5  # estimated Jaccard similarity above which two texts count as near-duplicates
+
+_PRIME = (1 << 61) - 1  # Mersenne prime for the universal hash family
+_MAX_HASH = (1 << 32) - 1
+
+# Words that carry no meaning in a question. Without dropping these, "what is your favorite X?" matches every other
+# "what is your favorite Y?" on the template alone.
+STOP_WORDS = frozenset(
+    "a about am an and any are at be been but can could did do does ever for had has have how i if in is it its me "
+    "my of on or our should that the there this to u ur was we were what whats when where which who whom why will "
+    "with would you your yours".split()
+)
+
+Signature = Tuple[int, ...]
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """
+    Character n-grams of each meaningful word in <text>, casefolded and padded so word boundaries count.
+
+    Characters rather than whole words, since questions are short and a single respelled word (favorite/favourite)
+    would otherwise sink the similarity of the whole thing.
+    """
+    words = re.findall(r"\w+", text.casefold().replace("'", ""))
+    words = [word for word in words if word not in STOP_WORDS] or words
+    result = set()
+    for word in words:
+        word = f" {word} "
+        result.update(word[i : i + size] for i in range(len(word) - size + 1))
+    return result
+
+
+class MinHasher:
+    """
+    Makes MinHash signatures. Two signatures agree at each position with probability equal to the Jaccard
+    similarity of the texts' shingle sets, so the fraction that agree is an estimate of it.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, text: str) -> Signature:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+            for shingle in shingles(text)
+        ]
+        if not hashes:
+            return (_MAX_HASH,) * self.num_perm
+        return tuple(min((a * h + b) % _PRIME & _MAX_HASH for h in hashes) for a, b in self._perms)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class LSHIndex:
+    """
+    Locality-sensitive hashing index over MinHash signatures.
+
+    Signatures are split into bands, and each band is a dict key; texts that share any band are candidates, which
+    are then checked against the threshold. Adding and looking up are a handful of dict operations, so there's no
+    comparing every pair as the index grows. With 16 bands of 4, pairs at 0.5 similarity are caught ~65% of the time
+    and pairs at 0.7 ~98%, which is the right side to err on for flagging repeats.
+    """
+
+    def __init__(self, hasher: MinHasher = None, bands: int = BANDS, threshold: float = THRESHOLD):
+        self.hasher = hasher or MinHasher()
+        if self.hasher.num_perm % bands != 0:
+            raise ValueError(f"{self.hasher.num_perm} hash functions can't be split into {bands} bands")
+        self.bands = bands
+        self.rows = self.hasher.num_perm // bands
+        self.threshold = threshold
+        self._signatures = {}  # type: Dict[Hashable, Signature]
+        self._buckets = {}  # type: Dict[Tuple[int, Signature], List[Hashable]]
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, key: Hashable):
+        return key in self._signatures
+
+    def _band_keys(self, signature: Signature) -> List[Tuple[int, Signature]]:
+        return [(i, signature[i * self.rows : (i + 1) * self.rows]) for i in range(self.bands)]
+
+    def query(self, text: str) -> List[Tuple[Hashable, float]]:
+        """
+        Keys of indexed texts that are near-duplicates of <text>, with their estimated similarity, best first.
+        """
+        return self._query(self.hasher.signature(text))
+
+    def _query(self, signature: Signature) -> List[Tuple[Hashable, float]]:
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+        matches = []
+        for key in candidates:
+            score = similarity(signature, self._signatures[key])
+            if score >= self.threshold:
+                matches.append((key, score))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+    def add(self, key: Hashable, text: str) -> List[Tuple[Hashable, float]]:
+        """
+        Index <text> under <key>, returning what it's a near-duplicate of (as from query()) from before it was added.
+        """
+        if key in self._signatures:
+            raise KeyError(f"{key} is already indexed")
+        signature = self.hasher.signature(text)
+        matches = self._query(signature)
+        self._signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, []).append(key)
+        return matches
+
+    def clusters(self) -> List[List[Hashable]]:
+        """
+        Groups of two or more keys linked by near-duplicate pairs, largest first. Keys keep their insertion order.
+        """
+        parents = {key: key for key in self._signatures}
+
+        def find(key):
+            while parents[key] != key:
+                parents[key] = parents[parents[key]]
+                key = parents[key]
+            return key
+
+        for key, signature in self._signatures.items():
+            for other, _ in self._query(signature):
+                if other != key:
+                    parents[find(other)] = find(key)
+
+        groups = {}  # type: Dict[Hashable, List[Hashable]]
+        for key in self._signatures:
+            groups.setdefault(find(key), []).append(key)
+        return sorted((group for group in groups.values() if len(group) > 1), key=len, reverse=True)
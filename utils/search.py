@@ -0,0 +1,68 @@
+import functools
+import heapq
+from typing import Callable, Dict, Hashable, Iterable, List, Set, Tuple
+
+from fuzzywuzzy import fuzz
+from fuzzywuzzy import utils as fuzz_utils
+
+CANDIDATES = 50  # best trigram matches that get fully scored
+QUERY_CACHE_SIZE = 512  # distinct recent queries whose results are kept
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Character trigrams of <text>, casefolded and padded so the start and end of it count for more.
+    """
+    text = f"  {text.casefold()} "
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def default_scorer(query: str, choice: str) -> int:
+    """
+    Same scoring as fuzzywuzzy's process.extractBests() uses by default.
+    """
+    return fuzz.WRatio(fuzz_utils.full_process(query), fuzz_utils.full_process(choice))
+
+
+class SearchIndex:
+    """
+    Fuzzy search over a fixed set of names.
+
+    Scoring every name against every query with fuzzywuzzy is slow in pure Python, so a trigram index picks out the
+    <candidates> names sharing the most trigrams with the query, and only those get scored. Results are memoized per
+    query; build a new index when the names change.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[Tuple[Hashable, str]],
+        scorer: Callable[[str, str], int] = default_scorer,
+        candidates: int = CANDIDATES,
+    ):
+        self.scorer = scorer
+        self.candidates = candidates
+        self._names = {}  # type: Dict[Hashable, str]
+        self._grams = {}  # type: Dict[str, List[Hashable]]
+        for key, name in entries:
+            self._names[key] = name
+            for gram in trigrams(name):
+                self._grams.setdefault(gram, []).append(key)
+        self.search = functools.lru_cache(maxsize=QUERY_CACHE_SIZE)(self._search)
+
+    def __len__(self):
+        return len(self._names)
+
+    def _search(self, query: str, limit: int = 10) -> List[Tuple[Hashable, str, int]]:
+        """
+        Use self.search(), which is this but memoized. Returns up to <limit> (key, name, score) tuples, best first,
+        with scores out of 100 as from the scorer.
+        """
+        shared = {}  # type: Dict[Hashable, int]
+        for gram in trigrams(query):
+            for key in self._grams.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+        # Ties go to the shorter name, which more of the query covers.
+        candidates = heapq.nsmallest(self.candidates, shared, key=lambda key: (-shared[key], len(self._names[key])))
+        results = [(key, self._names[key], self.scorer(query, self._names[key])) for key in candidates]
+        results.sort(key=lambda result: -result[2])
+        return results[:limit]
@@ -1,9 +1,17 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 
 import gspread
 from gspread import Worksheet
+from gspread.exceptions import APIError
 from oauth2client.service_account import ServiceAccountCredentials
 
+DRIVE_CHANGES_URL = "https://www.googleapis.com/drive/v3/changes"
+DRIVE_FILES_URL = "https://www.googleapis.com/drive/v3/files"
+SPREADSHEET_MIME_TYPE = "application/vnd.google-apps.spreadsheet"
+
 
 class SheetConnection:
     def __init__(self, secret: str, scope: List[str]):
@@ -23,6 +31,111 @@ class SheetConnection:
         return gspread.authorize(self.creds)
 
 
+class SheetIndex:
+    """
+    Cached name -> ID index of every spreadsheet shared with the service account.
+
+    The first load lists every spreadsheet; after that, refreshes only apply the Drive changes feed since the last
+    one, falling back to a full listing if the feed is unavailable. Lookups are dict lookups.
+    """
+
+    def __init__(self, connection: SheetConnection, ttl: timedelta = timedelta(minutes=10)):
+        self.connection = connection
+        self.ttl = ttl
+        self._names = {}  # type: Dict[str, str]  # spreadsheet ID -> name
+        self._ids = {}  # type: Dict[str, str]  # spreadsheet name -> ID
+        self._page_token = None  # type: Optional[str]
+        self._refreshed = None  # type: Optional[datetime]
+        self._refreshing = None  # type: Optional[asyncio.Future]
+
+    @property
+    def stale(self) -> bool:
+        return self._refreshed is None or datetime.utcnow() - self._refreshed > self.ttl
+
+    def get_id(self, name: str) -> Optional[str]:
+        return self._ids.get(name)
+
+    async def contains(self, loop: asyncio.AbstractEventLoop, name: str) -> bool:
+        """
+        Check whether a spreadsheet called <name> is shared with the service account.
+
+        A stale hit is answered from the cache while a refresh runs in the background. A miss always refreshes first,
+        since the sheet may have only just been shared; that's usually just one cheap changes request.
+        """
+        if self._refreshed is None or name not in self._ids:
+            await self.refresh(loop)
+        elif self.stale:
+            self.refresh(loop)
+        return name in self._ids
+
+    def refresh(self, loop: asyncio.AbstractEventLoop) -> asyncio.Future:
+        """
+        Refresh the index in an executor thread. Concurrent callers share one refresh.
+        """
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = loop.run_in_executor(None, self._refresh)
+            self._refreshing.add_done_callback(self._log_failure)
+        return self._refreshing
+
+    @staticmethod
+    def _log_failure(future: asyncio.Future):
+        # Background refreshes are never awaited, so this is the only place their errors would show up.
+        if not future.cancelled() and future.exception() is not None:
+            logging.error("spreadsheet index refresh failed", exc_info=future.exception())
+
+    def _refresh(self):
+        client = self.connection.client()
+        if self._page_token is not None:
+            try:
+                self._sync_changes(client)
+            except (APIError, KeyError) as e:
+                logging.warning(f"drive changes sync failed, relisting spreadsheets: {e}")
+                self._full_sync(client)
+        else:
+            self._full_sync(client)
+        self._ids = {name: file_id for file_id, name in self._names.items()}
+        self._refreshed = datetime.utcnow()
+
+    def _full_sync(self, client: gspread.Client):
+        # Grab the changes token *before* listing, so nothing that changes during the listing is missed.
+        self._page_token = client.request("get", f"{DRIVE_CHANGES_URL}/startPageToken").json()["startPageToken"]
+        self._names = {file["id"]: file["name"] for file in client.list_spreadsheet_files()}
+
+    def _sync_changes(self, client: gspread.Client):
+        page_token = self._page_token
+        while page_token is not None:
+            response = client.request(
+                "get",
+                DRIVE_CHANGES_URL,
+                params={
+                    "pageToken": page_token,
+                    "pageSize": 1000,
+                    "fields": "nextPageToken,newStartPageToken,changes(fileId,removed,file(name,mimeType,trashed))",
+                },
+            ).json()
+            for change in response["changes"]:
+                file = change.get("file")
+                if (
+                    change.get("removed")
+                    or file is None
+                    or file.get("trashed")
+                    or file.get("mimeType") != SPREADSHEET_MIME_TYPE
+                ):
+                    self._names.pop(change["fileId"], None)
+                else:
+                    self._names[change["fileId"]] = file["name"]
+            if "newStartPageToken" in response:
+                self._page_token = response["newStartPageToken"]
+            page_token = response.get("nextPageToken")
+
+
+def get_revision(client: gspread.Client, file_id: str) -> str:
+    """
+    Drive's version number for a file, which goes up on every change to it. Much cheaper to check than the contents.
+    """
+    return client.request("get", f"{DRIVE_FILES_URL}/{file_id}", params={"fields": "version"}).json()["version"]
+
+
 def get_headings(ws: Worksheet) -> List[str]:
     return ws.row_values(1)
 